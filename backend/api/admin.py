@@ -0,0 +1,61 @@
+"""
+Admin API endpoints.
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from core.profiler import profiler
+
+router = APIRouter()
+
+
+@router.post("/profiler/arm")
+async def arm_profiler(ticks: int = 1, interval: Optional[float] = None, top: Optional[int] = None):
+    """Sample the next ``ticks`` engine ticks and write a profile report."""
+    if profiler.armed:
+        raise HTTPException(status_code=409, detail="Profiler is already armed")
+    
+    try:
+        return profiler.arm(ticks, interval=interval, top=top)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/profiler/disarm")
+async def disarm_profiler():
+    """Cancel an armed profile."""
+    return profiler.disarm()
+
+
+@router.get("/profiler")
+async def get_profiler_status():
+    """Get profiler state."""
+    return profiler.get_status()
+
+
+@router.get("/profiler/report")
+async def get_profiler_report():
+    """
+    Get the hotspot summary of the last profile.
+    
+    Bot and per-symbol scanner time is attributed per symbol. Panel scanners
+    analyze all symbols in one vectorized pass, so their attribution is per
+    scanner only, under the symbol ``(panel)``.
+    """
+    if profiler.last_report is None:
+        raise HTTPException(status_code=404, detail="No profile recorded yet")
+    
+    return profiler.last_report
+
+
+@router.get("/profiler/report/collapsed", response_class=PlainTextResponse)
+async def get_profiler_collapsed():
+    """Get the last profile's collapsed stacks, ready for flamegraph.pl or speedscope."""
+    if profiler.last_report is None:
+        raise HTTPException(status_code=404, detail="No profile recorded yet")
+    
+    try:
+        with open(profiler.last_report['collapsed_file']) as f:
+            return PlainTextResponse(f.read())
+    except OSError:
+        raise HTTPException(status_code=404, detail="Profile file no longer exists")
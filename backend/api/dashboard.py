@@ -3,6 +3,7 @@ Dashboard API endpoints.
 """
 from fastapi import APIRouter
 from core.engine import engine
+from utils.market_data import market_data
 from core.portfolio import portfolio
 from governance.risk_manager import risk_manager
 
@@ -65,3 +66,10 @@ async def get_portfolio():
         "stats": stats,
         "positions": positions
     }
+
+
+@router.get("/market-data")
+async def get_market_data(symbols: str = None):
+    """Get intraday snapshots for comma-separated symbols (default: the universe)."""
+    symbol_list = [s.strip() for s in symbols.split(",")] if symbols else engine.symbols
+    return await market_data.get_realtime_data(symbol_list)
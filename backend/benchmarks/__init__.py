@@ -0,0 +1,5 @@
+"""
+Reproducible benchmarks for indicators, scanners, bots and engine ticks.
+
+Run with ``python -m benchmarks`` from the backend directory.
+"""
@@ -0,0 +1,67 @@
+"""
+Command line for the benchmark suite.
+
+    python -m benchmarks run [--groups indicators,volume_profile,components,engine] [--out ./data/benchmarks/latest.json]
+    python -m benchmarks compare baseline.json current.json [--threshold 0.1]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+
+def _ints(text: str):
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run = commands.add_parser("run", help="run benchmarks and save the results")
+    run.add_argument("--groups", default="indicators,volume_profile,components,engine")
+    run.add_argument("--sizes", type=_ints, default=[1000, 10000, 100000], help="indicator bar counts")
+    run.add_argument("--universes", type=_ints, default=[10, 100, 1000], help="engine tick symbol counts")
+    run.add_argument("--repeat", type=int, default=20, help="max timed calls per case")
+    run.add_argument("--ticks", type=int, default=3, help="timed engine ticks per universe")
+    run.add_argument("--budget", type=float, default=5.0, help="seconds per case before stopping early")
+    run.add_argument("--out", default="./data/benchmarks/latest.json")
+    
+    compare = commands.add_parser("compare", help="flag regressions between two result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10, help="relative slowdown flagged as a regression")
+    compare.add_argument("--metric", default="p50_ms", help="result field, e.g. p50_ms or peak_alloc_mb")
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == "run":
+        # Keep benchmark trades and signals out of the real database and
+        # candle store; settings are read when the backend is first imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+        os.environ["ENABLE_CANDLE_STORE"] = "false"
+        os.environ["GOOGLE_SHEET_ID"] = ""
+    
+    from benchmarks import suite
+    
+    if args.command == "run":
+        groups = [g.strip() for g in args.groups.split(",") if g.strip()]
+        report = suite.run(groups, args.sizes, args.universes, args.repeat, args.ticks, args.budget)
+        suite.save(report, args.out)
+        print(f"Results written to {args.out} (peak RSS {report['meta']['peak_rss_mb']:.0f} MB)")
+        return 0
+    
+    rows = suite.compare(suite.load(args.baseline), suite.load(args.current), args.threshold, args.metric)
+    unit = "MB" if args.metric.endswith("_mb") else "ms"
+    for row in rows:
+        change = f"{row['change'] * 100:+7.1f}%" if row['change'] is not None else "      -"
+        baseline = f"{row['baseline']:.3f}" if row['baseline'] is not None else "-"
+        current = f"{row['current']:.3f}" if row['current'] is not None else "-"
+        print(f"{row['status']:11s} {row['group']:10s} {row['name']:32s} {row['size']:>7d}  {baseline:>10s} -> {current:>10s} {unit}  {change}")
+    regressions = sum(1 for row in rows if row['status'] == 'regression')
+    print(f"{regressions} regression(s) over {args.threshold * 100:.0f}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
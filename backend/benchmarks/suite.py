@@ -0,0 +1,465 @@
+"""
+Benchmark runners, result files and run comparison.
+
+The engine benchmark writes signals, positions and trades through the
+configured database; ``python -m benchmarks`` points it at a temporary
+SQLite file before anything is imported.
+"""
+import asyncio
+import contextlib
+import inspect
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config.settings import settings
+from utils import indicators
+from utils.market_data import market_data, async_market_data
+from benchmarks.synthetic import SyntheticProvider, synthetic_frame
+
+
+# Arguments for indicators without defaults for every parameter
+INDICATOR_ARGS = {
+    'calculate_ema': {'period': 20},
+    'calculate_sma': {'period': 20}
+}
+
+# Bars in the frames scanners and bots see (one month of hourly bars)
+COMPONENT_BARS = 720
+
+# Largest frame the row-by-row volume profile reference is timed on
+REFERENCE_MAX_BARS = 10000
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far.
+    
+    This is a high-water mark for the whole run, so it is reported once in
+    the report's meta rather than per case (see ``peak_alloc_mb``).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def peak_alloc_mb(func: Callable[[], object]) -> float:
+    """
+    Peak memory allocated during one call, traced with ``tracemalloc``.
+    
+    The call is untimed: tracing slows Python code down severalfold. NumPy
+    and pandas buffers are traced too, so this covers the frames and arrays
+    a case builds.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def measure(func: Callable[[], object], repeat: int, budget: float = 5.0, warmup: int = 1) -> List[float]:
+    """
+    Time repeated calls.
+    
+    Args:
+        func: Call to time
+        repeat: Maximum number of timed calls
+        budget: Stop early once this many seconds were spent (after at
+            least three calls)
+        warmup: Untimed calls first
+    
+    Returns:
+        Seconds per call
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    spent = 0.0
+    while len(samples) < repeat and (len(samples) < 3 or spent < budget):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        samples.append(elapsed)
+        spent += elapsed
+    return samples
+
+
+def summarize(
+    group: str,
+    name: str,
+    size: int,
+    samples: List[float],
+    items: float,
+    unit: str,
+    alloc_mb: Optional[float] = None
+) -> Dict:
+    """
+    Latency percentiles and throughput of one benchmark case.
+    
+    Args:
+        group: Benchmark group ('indicators', 'volume_profile', 'scanners', 'bots', 'engine')
+        name: Case name
+        size: Problem size (bars or symbols)
+        samples: Seconds per call
+        items: Units of work per call, for throughput
+        unit: Name of the unit of work
+        alloc_mb: Peak memory allocated by one call (``peak_alloc_mb``)
+    """
+    ms = np.asarray(samples) * 1000
+    mean = float(ms.mean())
+    return {
+        'group': group,
+        'name': name,
+        'size': size,
+        'runs': len(samples),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p90_ms': float(np.percentile(ms, 90)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': mean,
+        'min_ms': float(ms.min()),
+        'max_ms': float(ms.max()),
+        'throughput': items / (mean / 1000) if mean > 0 else None,
+        'unit': f"{unit}/s",
+        'peak_alloc_mb': alloc_mb
+    }
+
+
+def _report(result: Dict):
+    alloc = f"{result['peak_alloc_mb']:.2f} MB" if result['peak_alloc_mb'] is not None else "-"
+    print(
+        f"{result['group']:10s} {result['name']:32s} {result['size']:>7d}  "
+        f"p50 {result['p50_ms']:9.3f} ms  p99 {result['p99_ms']:9.3f} ms  "
+        f"{result['throughput'] or 0:12.1f} {result['unit']}  alloc {alloc}"
+    )
+
+
+def bench_indicators(sizes: List[int], repeat: int, budget: float) -> List[Dict]:
+    """Each ``calculate_*`` in ``utils.indicators`` on frames of each size."""
+    functions = [
+        (name, func) for name, func in inspect.getmembers(indicators, inspect.isfunction)
+        if name.startswith('calculate_') and func.__module__ == indicators.__name__
+    ]
+    results = []
+    for size in sizes:
+        # Untagged frames bypass the indicator cache
+        df = synthetic_frame(size, seed=size)
+        for name, func in functions:
+            kwargs = INDICATOR_ARGS.get(name, {})
+            call = lambda: func(df, **kwargs)
+            samples = measure(call, repeat, budget)
+            results.append(summarize('indicators', name, size, samples, size, 'bars', peak_alloc_mb(call)))
+            _report(results[-1])
+    return results
+
+
+def _volume_profile_iterrows(df: pd.DataFrame, bins: int = 50) -> Dict:
+    """Row-by-row volume profile that ``calculate_volume_profile`` replaced, kept as a reference."""
+    price_range = df['High'].max() - df['Low'].min()
+    bin_size = price_range / bins
+    volume_at_price = {}
+    for _, row in df.iterrows():
+        price_bin = int((row['Close'] - df['Low'].min()) / bin_size)
+        if price_bin not in volume_at_price:
+            volume_at_price[price_bin] = 0
+        volume_at_price[price_bin] += row['Volume']
+    
+    poc_bin = max(volume_at_price, key=volume_at_price.get)
+    total_volume = sum(volume_at_price.values())
+    cumulative_volume = 0
+    value_area_bins = []
+    for bin_num, volume in sorted(volume_at_price.items(), key=lambda x: x[1], reverse=True):
+        cumulative_volume += volume
+        value_area_bins.append(bin_num)
+        if cumulative_volume >= total_volume * 0.7:
+            break
+    
+    return {
+        'poc': float(df['Low'].min() + poc_bin * bin_size),
+        'vah': float(df['Low'].min() + max(value_area_bins) * bin_size),
+        'val': float(df['Low'].min() + min(value_area_bins) * bin_size),
+        'volume_distribution': volume_at_price
+    }
+
+
+def bench_volume_profile(sizes: List[int], repeat: int, budget: float) -> List[Dict]:
+    """
+    ``calculate_volume_profile`` in both modes against the row-by-row reference.
+    
+    The reference is only timed up to ``REFERENCE_MAX_BARS``; beyond that
+    a single call takes tens of seconds.
+    """
+    cases = [
+        ('calculate_volume_profile', lambda df: indicators.calculate_volume_profile(df)),
+        ('calculate_volume_profile/dist', lambda df: indicators.calculate_volume_profile(df, distribute=True)),
+        ('volume_profile_iterrows', _volume_profile_iterrows)
+    ]
+    results = []
+    for size in sizes:
+        df = synthetic_frame(size, seed=size)
+        for name, func in cases:
+            if func is _volume_profile_iterrows and size > REFERENCE_MAX_BARS:
+                continue
+            call = lambda: func(df)
+            samples = measure(call, repeat, budget)
+            results.append(summarize('volume_profile', name, size, samples, size, 'bars', peak_alloc_mb(call)))
+            _report(results[-1])
+    return results
+
+
+def _cycle(items: List, func: Callable) -> Callable[[], object]:
+    """Call ``func`` on the next item each time, so no call sees a cached frame."""
+    state = {'i': 0}
+    
+    def call():
+        item = items[state['i'] % len(items)]
+        state['i'] += 1
+        return func(*item)
+    
+    return call
+
+
+def bench_components(repeat: int, budget: float, symbols: int = 50) -> List[Dict]:
+    """Each scanner's ``analyze`` and each bot's ``should_enter``/``should_exit``."""
+    from core.engine import TradingEngine
+    
+    frames = [(f"SYM{i}", synthetic_frame(COMPONENT_BARS, seed=i)) for i in range(symbols)]
+    engine = TradingEngine()
+    results = []
+    
+    for scanner in engine.scanners:
+        call = _cycle(frames, scanner.analyze)
+        samples = measure(call, repeat, budget)
+        results.append(summarize(
+            'scanners', f"{scanner.scanner_id}.analyze", COMPONENT_BARS, samples, 1, 'calls', peak_alloc_mb(call)))
+        _report(results[-1])
+    
+    exits = [(symbol, df, float(df['Close'].iloc[-1]) * 0.99) for symbol, df in frames]
+    for bot in engine.bots:
+        call = _cycle(frames, bot.should_enter)
+        samples = measure(call, repeat, budget)
+        results.append(summarize(
+            'bots', f"{bot.bot_id}.should_enter", COMPONENT_BARS, samples, 1, 'calls', peak_alloc_mb(call)))
+        _report(results[-1])
+        call = _cycle(exits, bot.should_exit)
+        samples = measure(call, repeat, budget)
+        results.append(summarize(
+            'bots', f"{bot.bot_id}.should_exit", COMPONENT_BARS, samples, 1, 'calls', peak_alloc_mb(call)))
+        _report(results[-1])
+    
+    engine.executor.shutdown()
+    return results
+
+
+def install_provider(provider) -> tuple:
+    """Route market data through ``provider``; returns what to pass to ``restore_provider``."""
+    previous = (market_data.provider, async_market_data.provider, market_data.store)
+    market_data.provider = provider
+    async_market_data.provider = provider
+    market_data.store = None
+    market_data.clear_cache()
+    return previous
+
+
+def restore_provider(previous: tuple):
+    market_data.provider, async_market_data.provider, market_data.store = previous
+    market_data.clear_cache()
+
+
+def bench_engine(universes: List[int], ticks: int) -> List[Dict]:
+    """
+    Full ``TradingEngine.tick`` on synthetic universes, a new bar per tick.
+    
+    One extra tick after the timed ones is traced for ``peak_alloc_mb``.
+    Work in pool threads is traced as well; worker processes are not.
+    """
+    from bots.base_bot import BotStatus
+    from core.engine import TradingEngine
+    from models.database import init_db
+    import models.position, models.trade, models.signal, models.portfolio_snapshot  # noqa: F401 (tables)
+    
+    init_db()
+    results = []
+    for size in universes:
+        symbols = [f"SYM{i}" for i in range(size)]
+        provider = SyntheticProvider(symbols, bars=COMPONENT_BARS, ahead=ticks + 2)
+        previous = install_provider(provider)
+        market_symbols = settings.market_symbols
+        settings.market_symbols = ",".join(symbols)
+        try:
+            engine = TradingEngine()
+            for bot in engine.bots:
+                bot.status = BotStatus.ACTIVE
+            
+            async def run() -> tuple:
+                samples = []
+                # The first tick fills caches and is not timed
+                for tick in range(ticks + 1):
+                    provider.advance()
+                    # Frames cached by the last tick are stale by now in live runs
+                    market_data.clear_cache()
+                    started = time.perf_counter()
+                    await engine.tick()
+                    if tick:
+                        samples.append(time.perf_counter() - started)
+                
+                # One more tick, untimed and traced, for the allocation peak
+                provider.advance()
+                market_data.clear_cache()
+                tracemalloc.start()
+                try:
+                    await engine.tick()
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                return samples, peak / (1024 * 1024)
+            
+            # Bots and risk checks print every order; keep the report readable
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                samples, alloc_mb = asyncio.run(run())
+            engine.executor.shutdown()
+        finally:
+            settings.market_symbols = market_symbols
+            restore_provider(previous)
+        
+        results.append(summarize('engine', 'tick', size, samples, size, 'symbols', alloc_mb))
+        _report(results[-1])
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(
+    groups: List[str],
+    sizes: List[int],
+    universes: List[int],
+    repeat: int = 20,
+    ticks: int = 3,
+    budget: float = 5.0
+) -> Dict:
+    """
+    Run the selected benchmark groups.
+    
+    Args:
+        groups: Any of 'indicators', 'volume_profile', 'components', 'engine'
+        sizes: Bar counts for indicator and volume profile benchmarks
+        universes: Symbol counts for engine ticks
+        repeat: Maximum timed calls per indicator/component case
+        ticks: Timed engine ticks per universe
+        budget: Seconds per case after which repetitions stop early
+    
+    Returns:
+        {'meta': {...}, 'results': [...]} ready for ``save``
+    """
+    results = []
+    if 'indicators' in groups:
+        results += bench_indicators(sizes, repeat, budget)
+    if 'volume_profile' in groups:
+        results += bench_volume_profile(sizes, repeat, budget)
+    if 'components' in groups:
+        results += bench_components(repeat, budget)
+    if 'engine' in groups:
+        results += bench_engine(universes, ticks)
+    
+    return {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'groups': groups,
+            'sizes': sizes,
+            'universes': universes,
+            'repeat': repeat,
+            'ticks': ticks,
+            'peak_rss_mb': peak_rss_mb()
+        },
+        'results': results
+    }
+
+
+def save(report: Dict, path: str):
+    """Write a benchmark report as JSON."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load(path: str) -> Dict:
+    """Read a benchmark report."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.10, metric: str = 'p50_ms') -> List[Dict]:
+    """
+    Compare two reports case by case.
+    
+    Args:
+        baseline: Earlier report
+        current: Report to check
+        threshold: Relative slowdown (0.10 = 10%) flagged as a regression;
+            the same speedup counts as an improvement
+        metric: Field to compare, e.g. 'p50_ms' or 'peak_alloc_mb'
+    
+    Returns:
+        One row per case with both values, the relative change and a status
+        of 'regression', 'improvement', 'ok', 'new' or 'missing'; a case
+        that lacks the metric (reports from before it existed) counts as
+        new or missing
+    """
+    def key(result: Dict) -> tuple:
+        return (result['group'], result['name'], result['size'])
+    
+    before = {key(r): r for r in baseline['results']}
+    after = {key(r): r for r in current['results']}
+    rows = []
+    for k in list(before) + [k for k in after if k not in before]:
+        old, new = before.get(k), after.get(k)
+        old_value = old.get(metric) if old else None
+        new_value = new.get(metric) if new else None
+        row = {
+            'group': k[0],
+            'name': k[1],
+            'size': k[2],
+            'baseline': old_value,
+            'current': new_value,
+            'change': None
+        }
+        if old_value is None:
+            row['status'] = 'new'
+        elif new_value is None:
+            row['status'] = 'missing'
+        else:
+            row['change'] = new_value / old_value - 1 if old_value > 0 else 0.0
+            if row['change'] > threshold:
+                row['status'] = 'regression'
+            elif row['change'] < -threshold:
+                row['status'] = 'improvement'
+            else:
+                row['status'] = 'ok'
+        rows.append(row)
+    return rows
@@ -4,8 +4,12 @@ Base bot class for trading strategies.
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
 from datetime import datetime
+import threading
 from core.portfolio import portfolio
+from core.bar_tracker import bar_tracker, bar_key
+from config.settings import settings
 from utils.market_data import market_data
+import numpy as np
 import pandas as pd
 
 
@@ -19,6 +23,17 @@ class BotStatus:
 class BaseBot(ABC):
     """Abstract base class for all trading bots."""
     
+    # Bots that read live parent-process state (risk, portfolio) can't be
+    # evaluated in shard workers and always run in the engine process
+    runs_in_parent = False
+    
+    # Decisions that depend only on the bars and the entry price can be
+    # reused while a symbol's latest bar is unchanged
+    cacheable_decisions = True
+    
+    # Entries need more confidence than this
+    entry_confidence = 60
+    
     def __init__(
         self,
         bot_id: str,
@@ -70,6 +85,59 @@ class BaseBot(ABC):
         """
         pass
     
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Evaluate ``should_enter`` and ``should_exit`` at every bar at once.
+        
+        Used by the backtester, which otherwise replays both methods bar by
+        bar. Bar ``i`` must see only ``df.iloc[:i + 1]``, exactly as the live
+        methods would, so indicators are computed once over the whole frame
+        and read at each bar.
+        
+        Args:
+            symbol: Stock symbol
+            df: DataFrame with the full OHLCV history
+        
+        Returns:
+            None if the bot has no vectorized form, else a dict of arrays
+            aligned with ``df``:
+            {
+                'enter': should_enter result,
+                'confidence': entry confidence,
+                'exit': exits regardless of the entry price,
+                'upper': exit when upper > entry price,
+                'lower': exit when lower < entry price
+            }
+        """
+        return None
+    
+    @staticmethod
+    def pnl_triggers(close: np.ndarray, above: Optional[float] = None, below: Optional[float] = None) -> tuple:
+        """
+        Express P&L thresholds as ``vector_signals`` exit triggers.
+        
+        Args:
+            close: Close prices
+            above: Exit once the P&L percentage exceeds this (take profit)
+            below: Exit once the P&L percentage falls under this (stop loss,
+                negative)
+        
+        Returns:
+            (upper, lower) arrays
+        """
+        upper = close / (1 + above / 100) if above is not None else np.full(len(close), -np.inf)
+        lower = close / (1 + below / 100) if below is not None else np.full(len(close), np.inf)
+        return upper, lower
+    
+    def allocation_pct(self) -> float:
+        """Default percentage of the portfolio per position, by risk level."""
+        if self.risk_level == "LOW":
+            return 3.0
+        elif self.risk_level == "MEDIUM":
+            return 4.0
+        else:  # HIGH
+            return 5.0
+    
     def calculate_position_size(self, price: float, capital_pct: float = None) -> float:
         """
         Calculate position size based on risk and available capital.
@@ -82,13 +150,7 @@ class BaseBot(ABC):
             Number of shares to buy
         """
         if capital_pct is None:
-            # Default allocation based on risk level
-            if self.risk_level == "LOW":
-                capital_pct = 3.0
-            elif self.risk_level == "MEDIUM":
-                capital_pct = 4.0
-            else:  # HIGH
-                capital_pct = 5.0
+            capital_pct = self.allocation_pct()
         
         portfolio_value = portfolio.get_portfolio_value()
         position_value = portfolio_value * (capital_pct / 100)
@@ -96,59 +158,186 @@ class BaseBot(ABC):
         
         return quantity
     
-    def execute(self):
-        """Execute bot strategy on all symbols."""
+    def decide(self, symbol: str, df: pd.DataFrame, entry_price: Optional[float]) -> Optional[Dict]:
+        """
+        Decide what to do with one symbol without touching the portfolio.
+        
+        Args:
+            symbol: Stock symbol
+            df: DataFrame with OHLCV data
+            entry_price: Entry price of the open position, or None if flat
+        
+        Returns:
+            Order intent dict or None
+            {
+                'action': 'open' | 'close',
+                'symbol': symbol,
+                'price': current_price,
+                'reason': 'description',
+                'confidence': 0-100 (open only)
+            }
+        """
+        current_price = float(df['Close'].iloc[-1])
+        
+        if entry_price is not None:
+            # Check exit conditions
+            should_exit, reason = self.should_exit(symbol, df, entry_price)
+            if should_exit:
+                return {'action': 'close', 'symbol': symbol, 'price': current_price, 'reason': reason}
+        else:
+            # Check entry conditions
+            should_enter, confidence, reason = self.should_enter(symbol, df)
+            if should_enter and confidence > self.entry_confidence:
+                return {
+                    'action': 'open',
+                    'symbol': symbol,
+                    'price': current_price,
+                    'reason': reason,
+                    'confidence': confidence
+                }
+        
+        return None
+    
+    def decide_cached(
+        self,
+        symbol: str,
+        df: pd.DataFrame,
+        entry_price: Optional[float],
+        interval: str
+    ) -> Optional[Dict]:
+        """
+        ``decide``, reusing the previous decision while the input is unchanged.
+        
+        Args:
+            symbol: Symbol the frame belongs to
+            df: OHLCV frame
+            entry_price: Entry price of the open position, if any
+            interval: Bar interval of ``df``
+        """
+        if not self.cacheable_decisions:
+            return self.decide(symbol, df, entry_price)
+        
+        key = (bar_key(df), entry_price)
+        hit, intent = bar_tracker.lookup(self.bot_id, symbol, interval, key)
+        if not hit:
+            intent = self.decide(symbol, df, entry_price)
+            bar_tracker.store(self.bot_id, symbol, interval, key, intent)
+        return intent
+    
+    def apply_intent(self, intent: Dict):
+        """
+        Apply an order intent from ``decide`` to the portfolio.
+        
+        Intents are decided against the positions at the start of the tick,
+        so one applied after another bot already opened or closed the same
+        symbol is dropped.
+        """
+        symbol = intent['symbol']
+        current_price = intent['price']
+        reason = intent['reason']
+        
+        if (intent['action'] == 'close') != (symbol in portfolio.positions):
+            return
+        
+        if intent['action'] == 'close':
+            trade = portfolio.close_position(symbol, current_price, reason)
+            
+            if trade:
+                self.trades_executed += 1
+                if trade.realized_pnl > 0:
+                    self.winning_trades += 1
+                self.total_pnl += trade.realized_pnl
+                self.last_trade_time = datetime.utcnow()
+                print(f"[{self.name}] Closed {symbol} at ${current_price:.2f}: {reason}")
+        
+        else:
+            quantity = self.calculate_position_size(current_price)
+            
+            position = portfolio.open_position(
+                symbol=symbol,
+                quantity=quantity,
+                price=current_price,
+                bot_id=self.bot_id,
+                strategy=self.strategy
+            )
+            
+            if position:
+                print(f"[{self.name}] Opened {symbol} at ${current_price:.2f}: {reason}")
+    
+    def evaluate(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        entry_prices: Dict[str, float],
+        cancel_event: Optional[threading.Event] = None
+    ) -> List[Dict]:
+        """
+        Decide on every symbol from prefetched data without touching the portfolio.
+        
+        Args:
+            frames: OHLCV frames by symbol; symbols without one are skipped
+            entry_prices: Entry price of each open position by symbol
+            cancel_event: Stops evaluation at the next symbol once set
+        
+        Returns:
+            List of order intents in ``self.symbols`` order
+        """
+        intents = []
+        
+        for symbol in self.symbols:
+            if cancel_event is not None and cancel_event.is_set():
+                print(f"[{self.name}] Evaluation cancelled")
+                break
+            
+            df = frames.get(symbol)
+            if df is None or df.empty:
+                continue
+            
+            try:
+                intent = self.decide_cached(
+                    symbol, df, entry_prices.get(symbol), df.attrs.get('interval', settings.engine_interval))
+                if intent:
+                    intents.append(intent)
+            except Exception as e:
+                print(f"Error evaluating {self.name} on {symbol}: {e}")
+        
+        return intents
+    
+    def apply_intents(self, intents: List[Dict]):
+        """Apply order intents to the portfolio in order."""
+        for intent in intents:
+            try:
+                self.apply_intent(intent)
+            except Exception as e:
+                print(f"Error executing {self.name} on {intent['symbol']}: {e}")
+    
+    def execute(self, cancel_event: Optional[threading.Event] = None):
+        """
+        Execute bot strategy on all symbols.
+        
+        Args:
+            cancel_event: Stops execution at the next symbol once set
+        """
         if self.status != BotStatus.ACTIVE:
             return
         
         for symbol in self.symbols:
+            if cancel_event is not None and cancel_event.is_set():
+                print(f"[{self.name}] Execution cancelled")
+                break
+            
             try:
+                df = market_data.get_historical_data(symbol, period="1mo", interval=settings.engine_interval)
+                
+                if df.empty:
+                    continue
+                
                 # Check if we already have a position
-                if symbol in portfolio.positions:
-                    # Check exit conditions
-                    position = portfolio.positions[symbol]
-                    df = market_data.get_historical_data(symbol, period="1mo", interval="1h")
-                    
-                    if df.empty:
-                        continue
-                    
-                    should_exit, reason = self.should_exit(symbol, df, position.entry_price)
-                    
-                    if should_exit:
-                        current_price = df['Close'].iloc[-1]
-                        trade = portfolio.close_position(symbol, current_price, reason)
-                        
-                        if trade:
-                            self.trades_executed += 1
-                            if trade.realized_pnl > 0:
-                                self.winning_trades += 1
-                            self.total_pnl += trade.realized_pnl
-                            self.last_trade_time = datetime.utcnow()
-                            print(f"[{self.name}] Closed {symbol} at ${current_price:.2f}: {reason}")
+                position = portfolio.positions.get(symbol)
+                entry_price = position.entry_price if position is not None else None
                 
-                else:
-                    # Check entry conditions
-                    df = market_data.get_historical_data(symbol, period="1mo", interval="1h")
-                    
-                    if df.empty:
-                        continue
-                    
-                    should_enter, confidence, reason = self.should_enter(symbol, df)
-                    
-                    if should_enter and confidence > 60:
-                        current_price = df['Close'].iloc[-1]
-                        quantity = self.calculate_position_size(current_price)
-                        
-                        position = portfolio.open_position(
-                            symbol=symbol,
-                            quantity=quantity,
-                            price=current_price,
-                            bot_id=self.bot_id,
-                            strategy=self.strategy
-                        )
-                        
-                        if position:
-                            print(f"[{self.name}] Opened {symbol} at ${current_price:.2f}: {reason}")
+                intent = self.decide_cached(symbol, df, entry_price, settings.engine_interval)
+                if intent:
+                    self.apply_intent(intent)
                             
             except Exception as e:
                 print(f"Error executing {self.name} on {symbol}: {e}")
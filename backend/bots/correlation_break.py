@@ -1,7 +1,8 @@
 """
 Correlation Break Bot - Trades leader when assets decouple
 """
-from typing import List
+from typing import Dict, List
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
 
@@ -48,3 +49,18 @@ class CorrelationBreakBot(BaseBot):
             return True, f"Coupling/Trend exit ({pnl_pct:.1f}%)"
             
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Entry and exit conditions at every bar (see ``BaseBot.vector_signals``)."""
+        close = df['Close'].to_numpy(dtype=float)
+        close_9 = df['Close'].shift(9).to_numpy(dtype=float)
+        symbol_move = ((close - close_9) / close_9) * 100
+        
+        upper, lower = self.pnl_triggers(close, above=3.0, below=-2.0)
+        return {
+            'enter': (symbol != self.leader) & (np.arange(len(df)) >= 19) & (symbol_move > 2.5),
+            'confidence': np.full(len(df), 78.0),
+            'exit': np.zeros(len(df), dtype=bool),
+            'upper': upper,
+            'lower': lower
+        }
@@ -1,7 +1,8 @@
 """
 Funding Extremes Bot - Fades market crowd when sentiment (funding) is at extremes
 """
-from typing import List
+from typing import Dict, List
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
 
@@ -52,3 +53,26 @@ class FundingExtremesBot(BaseBot):
             return True, f"Sentiment reversal exit ({profit_pct:.1f}%)"
             
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Entry and exit conditions at every bar (see ``BaseBot.vector_signals``)."""
+        open_ = df['Open'].to_numpy(dtype=float)
+        high = df['High'].to_numpy(dtype=float)
+        low = df['Low'].to_numpy(dtype=float)
+        close = df['Close'].to_numpy(dtype=float)
+        volume = df['Volume'].to_numpy(dtype=float)
+        
+        low_4 = df['Low'].shift(4).to_numpy(dtype=float)
+        recent_move = ((close - low_4) / low_4) * 100
+        avg_v = df['Volume'].shift(1).rolling(window=9).mean().to_numpy(dtype=float)
+        deceleration = np.abs(close - open_) < (high - low) * 0.3
+        extreme = ((recent_move > 3.0) | (recent_move < -3.0)) & (volume > avg_v * 2) & deceleration
+        
+        upper, lower = self.pnl_triggers(close, above=1.5, below=-1.5)
+        return {
+            'enter': (np.arange(len(df)) >= 9) & extreme,
+            'confidence': np.full(len(df), 82.0),
+            'exit': np.zeros(len(df), dtype=bool),
+            'upper': upper,
+            'lower': lower
+        }
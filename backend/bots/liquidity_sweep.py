@@ -1,7 +1,8 @@
 """
 Liquidity Sweep Bot - Reversals after clearing equal highs/lows
 """
-from typing import List
+from typing import Dict, List
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
 
@@ -50,3 +51,24 @@ class LiquiditySweepBot(BaseBot):
             return True, f"Target/Stop reached ({pnl_pct:.1f}%)"
             
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Entry and exit conditions at every bar (see ``BaseBot.vector_signals``)."""
+        high = df['High'].to_numpy(dtype=float)
+        low = df['Low'].to_numpy(dtype=float)
+        close = df['Close'].to_numpy(dtype=float)
+        
+        # Extremes of the 19 bars before each bar
+        recent_highs = df['High'].shift(1).rolling(window=19).max().to_numpy(dtype=float)
+        recent_lows = df['Low'].shift(1).rolling(window=19).min().to_numpy(dtype=float)
+        bearish = (high > recent_highs) & (close < recent_highs)
+        bullish = (low < recent_lows) & (close > recent_lows)
+        
+        upper, lower = self.pnl_triggers(close, above=2.0, below=-2.0)
+        return {
+            'enter': (np.arange(len(df)) >= 19) & (bearish | bullish),
+            'confidence': np.full(len(df), 80.0),
+            'exit': np.zeros(len(df), dtype=bool),
+            'upper': upper,
+            'lower': lower
+        }
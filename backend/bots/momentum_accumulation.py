@@ -1,7 +1,8 @@
 """
 Momentum Accumulation Bot - Accumulates positions in strong trends
 """
-from typing import List
+from typing import Dict, List
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
 from utils.indicators import calculate_rsi, calculate_macd, calculate_ema
@@ -70,3 +71,20 @@ class MomentumAccumulationBot(BaseBot):
             return True, f"Stop loss ({pnl_pct:.1f}%)"
         
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Entry and exit conditions at every bar (see ``BaseBot.vector_signals``)."""
+        close = df['Close'].to_numpy(dtype=float)
+        rsi = calculate_rsi(df).to_numpy(dtype=float)
+        histogram = calculate_macd(df)['histogram'].to_numpy(dtype=float)
+        ema_20 = calculate_ema(df, 20).to_numpy(dtype=float)
+        ema_50 = calculate_ema(df, 50).to_numpy(dtype=float)
+        
+        upper, lower = self.pnl_triggers(close, below=-5)
+        return {
+            'enter': (np.arange(len(df)) >= 49) & (50 < rsi) & (rsi < 70) & (histogram > 0) & (ema_20 > ema_50),
+            'confidence': np.minimum(75, 55 + rsi * 0.3),
+            'exit': (rsi > 75) | (histogram < 0),
+            'upper': upper,
+            'lower': lower
+        }
@@ -1,7 +1,9 @@
 """
 No-Trade Guardian Bot - The ultimate safety switch
 """
-from typing import List
+from typing import Dict, List, Optional
+import threading
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
 from governance.risk_manager import risk_manager
@@ -10,6 +12,8 @@ from governance.risk_manager import risk_manager
 class NoTradeGuardianBot(BaseBot):
     """Safety bot that enforces NO-TRADE state when health is critical."""
     
+    runs_in_parent = True  # reads the live health score
+    
     def __init__(self, symbols: List[str]):
         super().__init__(
             bot_id="no_trade_guardian",
@@ -28,8 +32,19 @@ class NoTradeGuardianBot(BaseBot):
         if risk_manager.health_score < 30:
             return True, f"GUARDIAN FORCE EXIT: Health Score Critical ({risk_manager.health_score:.1f})"
         return False, "Monitoring"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Never enters, so history has nothing to replay."""
+        n = len(df)
+        return {
+            'enter': np.zeros(n, dtype=bool),
+            'confidence': np.zeros(n),
+            'exit': np.zeros(n, dtype=bool),
+            'upper': np.full(n, -np.inf),
+            'lower': np.full(n, np.inf)
+        }
         
-    def execute(self):
+    def execute(self, cancel_event: Optional[threading.Event] = None):
         """Override execute to enforce safety rules."""
         if risk_manager.health_score < 40:
             self.status = "active"
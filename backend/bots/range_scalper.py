@@ -1,15 +1,17 @@
 """
 Range Scalper Bot - Fades extremes of a established range
 """
-from typing import List
+from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
+from config.settings import settings
 
 
 class RangeScalperBot(BaseBot):
     """Strategy that fades extremes of a established range (e.g., Asian Session)."""
     
-    def __init__(self, symbols: List[str]):
+    def __init__(self, symbols: List[str], lookback: Optional[int] = None):
         super().__init__(
             bot_id="range_scalper",
             name="Range Scalper",
@@ -17,7 +19,9 @@ class RangeScalperBot(BaseBot):
             risk_level="LOW",
             symbols=symbols
         )
-        self.lookback = 48  # Approx 4 hours of 5m data if Asian range
+        if lookback is None:
+            lookback = settings.range_scalper_lookback
+        self.lookback = int(lookback)  # Approx 4 hours of 5m data if Asian range
     
     def should_enter(self, symbol: str, df: pd.DataFrame) -> tuple[bool, float, str]:
         """Enter when price is at range extremes with low volatility."""
@@ -66,3 +70,27 @@ class RangeScalperBot(BaseBot):
             return True, f"Range breakout stop loss ({pnl_pct:.1f}%)"
             
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Entry and exit conditions at every bar (see ``BaseBot.vector_signals``)."""
+        close = df['Close'].to_numpy(dtype=float)
+        high = df['High'].rolling(window=self.lookback).max().to_numpy(dtype=float)
+        low = df['Low'].rolling(window=self.lookback).min().to_numpy(dtype=float)
+        range_size = high - low
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position_in_range = np.where(range_size > 0, (close - low) / range_size, 0.5)
+        mean = (high + low) / 2
+        ready = np.arange(len(df)) >= self.lookback - 1
+        
+        # At or above the mean a position is a winning long when close > entry;
+        # at or below it, a losing one is exited when close <= entry
+        upper, lower = self.pnl_triggers(close, above=1.5, below=-1.5)
+        upper = np.maximum(upper, np.where(close >= mean, close, -np.inf))
+        lower = np.minimum(lower, np.where(close <= mean, np.nextafter(close, -np.inf), np.inf))
+        return {
+            'enter': ready & ((position_in_range > 0.90) | (position_in_range < 0.10)),
+            'confidence': np.full(len(df), 75.0),
+            'exit': np.zeros(len(df), dtype=bool),
+            'upper': np.where(ready, upper, -np.inf),
+            'lower': np.where(ready, lower, np.inf)
+        }
@@ -1,8 +1,9 @@
 """
 Session Open Bot - Trades the break or fade of the first move in NY/London open
 """
-from typing import List
+from typing import Dict, List
 from datetime import datetime
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
 
@@ -10,6 +11,8 @@ from bots.base_bot import BaseBot
 class SessionOpenBot(BaseBot):
     """Strategy that trades session openings by detecting initial direction."""
     
+    cacheable_decisions = False  # entries depend on the wall clock
+    
     def __init__(self, symbols: List[str]):
         super().__init__(
             bot_id="session_open",
@@ -54,3 +57,29 @@ class SessionOpenBot(BaseBot):
             return True, f"Session move target reached ({pnl_pct:.1f}%)"
             
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Entry and exit conditions at every bar (see ``BaseBot.vector_signals``).
+        
+        History has no wall clock, so each bar's own timestamp stands in for
+        ``datetime.utcnow()``.
+        """
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC')
+        hour = index.hour.to_numpy()
+        session_open = ((hour == 8) | (hour == 13)) & (index.minute.to_numpy() < 30)
+        
+        close = df['Close'].to_numpy(dtype=float)
+        first_open = df['Open'].shift(4).to_numpy(dtype=float)
+        move_pct = ((close - first_open) / first_open) * 100
+        
+        upper, lower = self.pnl_triggers(close, above=1.0, below=-1.0)
+        return {
+            'enter': session_open & (np.arange(len(df)) >= 4) & (np.abs(move_pct) > 0.5),
+            'confidence': np.full(len(df), 85.0),
+            'exit': np.zeros(len(df), dtype=bool),
+            'upper': upper,
+            'lower': lower
+        }
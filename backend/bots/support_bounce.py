@@ -1,10 +1,11 @@
 """
 Support Bounce Bot - Enters at support level bounces
 """
-from typing import List
+from typing import Dict, List
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
-from utils.indicators import calculate_support_resistance
+from utils.indicators import calculate_support_resistance, cluster_levels
 
 
 class SupportBounceBot(BaseBot):
@@ -67,3 +68,43 @@ class SupportBounceBot(BaseBot):
             return True, f"Stop loss ({pnl_pct:.1f}%)"
         
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Entry and exit conditions at every bar (see ``BaseBot.vector_signals``).
+        
+        A pivot low needs ``window`` later bars before it appears in
+        ``calculate_support_resistance``, so the support levels only change
+        on the bars where a pivot is confirmed. Levels are re-clustered once
+        per confirmation and applied to the bars until the next one.
+        """
+        window = 20
+        n = len(df)
+        low = df['Low']
+        close = df['Close'].to_numpy(dtype=float)
+        prev_close = np.concatenate(([np.nan], close[:-1]))
+        volume = df['Volume'].to_numpy(dtype=float)
+        avg_volume = df['Volume'].rolling(window=20).mean().to_numpy(dtype=float)
+        
+        pivots = np.flatnonzero((low == low.rolling(window=2 * window + 1, center=True).min()).to_numpy())
+        pivot_prices = low.to_numpy(dtype=float)[pivots]
+        confirmed = pivots + window
+        
+        near_support = np.zeros(n, dtype=bool)
+        starts = np.unique(confirmed)
+        for k, start in enumerate(starts):
+            end = starts[k + 1] if k + 1 < len(starts) else n
+            supports = cluster_levels(pivot_prices[confirmed <= start], 0.25)[:5]
+            if len(supports) == 0:
+                continue
+            segment = close[start:end, None]
+            near_support[start:end] = (np.abs((segment - supports) / supports) * 100 < 1.0).any(axis=1)
+        
+        upper, lower = self.pnl_triggers(close, above=3, below=-2)
+        return {
+            'enter': (np.arange(n) >= 49) & near_support & (close > prev_close),
+            'confidence': np.where(volume > avg_volume * 1.1, 60.0, 50.0),
+            'exit': np.zeros(n, dtype=bool),
+            'upper': upper,
+            'lower': lower
+        }
@@ -1,7 +1,8 @@
 """
 Trend Following PRO Bot - Follows established trends
 """
-from typing import List
+from typing import Dict, List
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
 from utils.indicators import calculate_ema, calculate_adx, detect_trend
@@ -72,3 +73,23 @@ class TrendFollowingBot(BaseBot):
             return True, f"Stop loss ({pnl_pct:.1f}%)"
         
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Entry and exit conditions at every bar (see ``BaseBot.vector_signals``)."""
+        close = df['Close'].to_numpy(dtype=float)
+        adx = calculate_adx(df)['adx'].to_numpy(dtype=float)
+        ema_20 = calculate_ema(df, 20).to_numpy(dtype=float)
+        ema_50 = calculate_ema(df, 50).to_numpy(dtype=float)
+        ema_200 = calculate_ema(df, 200).to_numpy(dtype=float)
+        
+        # detect_trend(df) == "BULLISH"
+        bullish_trend = (ema_20 > ema_50) & (ema_50 > ema_200)
+        
+        upper, lower = self.pnl_triggers(close, below=-7)
+        return {
+            'enter': (np.arange(len(df)) >= 199) & (adx > 25) & bullish_trend & (ema_20 > ema_50),
+            'confidence': np.minimum(80, 50 + adx * 0.8),
+            'exit': (adx < 20) | (ema_20 < ema_50),
+            'upper': upper,
+            'lower': lower
+        }
@@ -1,7 +1,8 @@
 """
 Volatility Breakout Bot - Enters on squeeze breakouts
 """
-from typing import List
+from typing import Dict, List
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
 from utils.indicators import calculate_bollinger_bands, calculate_atr
@@ -73,3 +74,26 @@ class VolatilityBreakoutBot(BaseBot):
             return True, "Stop loss triggered"
         
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Entry and exit conditions at every bar (see ``BaseBot.vector_signals``)."""
+        bb = calculate_bollinger_bands(df)
+        close = df['Close'].to_numpy(dtype=float)
+        prev_close = np.concatenate(([np.nan], close[:-1]))
+        upper_band = bb['upper'].to_numpy(dtype=float)
+        lower_band = bb['lower'].to_numpy(dtype=float)
+        width = bb['width']
+        atr = calculate_atr(df).to_numpy(dtype=float)
+        
+        is_squeezed = width.to_numpy(dtype=float) < width.rolling(window=50).mean().to_numpy(dtype=float) * 0.7
+        breakout_up = (prev_close <= upper_band) & (close > upper_band)
+        breakout_down = (prev_close >= lower_band) & (close < lower_band)
+        
+        return {
+            'enter': (np.arange(len(df)) >= 49) & is_squeezed & (breakout_up | breakout_down),
+            'confidence': np.where(breakout_up, 65.0, 45.0),
+            'exit': np.zeros(len(df), dtype=bool),
+            # Profit target at 3x ATR, stop at 1.5x ATR
+            'upper': close - atr * 3,
+            'lower': close + atr * 1.5
+        }
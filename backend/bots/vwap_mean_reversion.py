@@ -1,16 +1,18 @@
 """
 VWAP Mean Reversion Bot - Trades when price deviates from VWAP
 """
-from typing import List
+from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 from bots.base_bot import BaseBot
+from config.settings import settings
 from utils.indicators import calculate_vwap
 
 
 class VWAPMeanReversionBot(BaseBot):
     """Mean reversion strategy based on VWAP."""
     
-    def __init__(self, symbols: List[str]):
+    def __init__(self, symbols: List[str], deviation_threshold: Optional[float] = None):
         super().__init__(
             bot_id="vwap_mean_reversion",
             name="VWAP Mean Reversion",
@@ -18,7 +20,9 @@ class VWAPMeanReversionBot(BaseBot):
             risk_level="LOW",
             symbols=symbols
         )
-        self.deviation_threshold = 2.0  # Standard deviations
+        if deviation_threshold is None:
+            deviation_threshold = settings.vwap_deviation_threshold
+        self.deviation_threshold = deviation_threshold  # % below VWAP
     
     def should_enter(self, symbol: str, df: pd.DataFrame) -> tuple[bool, float, str]:
         """Enter when price is significantly below VWAP."""
@@ -61,3 +65,18 @@ class VWAPMeanReversionBot(BaseBot):
             return True, f"Stop loss triggered ({pnl_pct:.1f}%)"
         
         return False, "Holding"
+    
+    def vector_signals(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Entry and exit conditions at every bar (see ``BaseBot.vector_signals``)."""
+        close = df['Close'].to_numpy(dtype=float)
+        vwap = calculate_vwap(df).to_numpy(dtype=float)
+        deviation = ((close - vwap) / vwap) * 100
+        
+        upper, lower = self.pnl_triggers(close, below=-3)
+        return {
+            'enter': (np.arange(len(df)) >= 49) & (deviation < -self.deviation_threshold),
+            'confidence': np.minimum(90, 60 + np.abs(deviation) * 5),
+            'exit': close >= vwap,
+            'upper': upper,
+            'lower': lower
+        }
@@ -23,21 +23,81 @@ class Settings(BaseSettings):
     max_drawdown_pct: float = 10.0
     
     # Market Data
+    market_data_provider: str = "yfinance"  # "yfinance" or "file"
+    market_data_dir: str = "./data/market"  # CSV bars for the file provider
     data_update_interval: int = 60  # seconds
     market_symbols: str = "AAPL,MSFT,GOOGL,AMZN,TSLA,NVDA,META,SPY,QQQ"
+    data_fetch_batch_size: int = 200  # symbols per bulk download request
+    enable_candle_store: bool = True
+    candle_store_dir: str = "./data/candles"
+    indicator_cache_size: int = 4096  # max cached indicator results
+    data_cache_ttl: float = 60.0  # seconds a cached frame is fresh
+    data_stale_ttl: float = 300.0  # seconds past the TTL a stale frame is served while refreshing
+    data_cache_max_entries: int = 2048
+    data_cache_max_mb: int = 512
+    data_refresh_workers: int = 4  # background stale-while-revalidate refreshes
+    data_flight_timeout: float = 120.0  # seconds a caller waits for another caller's fetch of the same key
+    data_max_concurrency: int = 8  # concurrent async provider requests
+    data_rate_limit: float = 5.0  # async provider requests per second
+    data_request_timeout: float = 20.0  # seconds per async request attempt
+    data_max_retries: int = 3
+    data_backoff_base: float = 0.5  # seconds, doubled per retry (plus jitter)
+    enable_bar_tracking: bool = True  # skip re-analysis of unchanged bars
+    
+    # Engine Execution
+    engine_executor: str = "thread"  # "thread" or "process" (scanners only)
+    engine_max_workers: int = 16
+    engine_task_timeout: float = 120.0  # seconds per scanner/bot task
+    engine_shards: int = 0  # >0 evaluates symbol shards in worker processes
+    engine_interval: str = "1h"  # bar interval scanners and bots analyze
+    profiler_sample_interval: float = 0.005  # seconds between stack samples while the profiler is armed
+    profiler_max_ticks: int = 20  # ticks one profiler arm request may cover
+    profiler_top: int = 25  # entries per profiler hotspot list
+    profiler_output_dir: str = "./data/profiles"
     
     # Risk Management
     enable_paper_trading: bool = True
     enable_risk_checks: bool = True
+    portfolio_consistency_check: bool = False  # verify running portfolio totals after every change
+    stats_bucket_seconds: float = 3600.0  # equity return bucket for rolling statistics
+    stats_window_buckets: int = 168  # buckets in the rolling statistics window
+    trade_ledger_window: int = 10000  # closed trades kept in memory (all stay in the DB)
+    portfolio_snapshot_interval: float = 300.0  # seconds between portfolio snapshots for restarts
+    
+    # Strategy Parameters
+    vwap_deviation_threshold: float = 2.0  # % below VWAP for a mean reversion entry
+    range_scalper_lookback: int = 48  # bars defining the scalped range
+    momentum_rsi_oversold: float = 30.0
+    momentum_rsi_overbought: float = 70.0
+    momentum_macd_histogram_min: float = 0.0  # |MACD histogram| beyond which MACD confirms
+    volatility_squeeze_ratio: float = 0.7  # BB width vs its 50-bar mean that counts as a squeeze
+    
+    # Backtesting
+    backtest_fee_bps: float = 5.0  # per fill, in basis points of notional
+    backtest_slippage_bps: float = 2.0  # fill price moved against the trade
+    optimizer_results_file: str = "./data/optimizer_results.jsonl"
+    optimizer_workers: int = 0  # parameter sweep processes (0 = one per CPU)
     
     # Google Sheets Integration
     google_sheet_id: str = ""
     google_sheets_credentials_file: str = "backend/config/credentials.json"
+    sheets_flush_interval: float = 300.0  # seconds between batchUpdate calls
+    sheets_max_backoff: float = 1800.0  # seconds, cap on quota-error backoff
+    sheets_max_pending_rows: int = 10000  # staged signal rows kept while backing off
     
     # Messaging Integrations
     telegram_bot_token: str = ""
     telegram_chat_id: str = ""
     discord_webhook_url: str = ""
+    telegram_api_url: str = "https://api.telegram.org"
+    notify_queue_size: int = 1000  # signals waiting for dispatch
+    notify_coalesce_window: float = 2.0  # seconds to gather a burst into one digest
+    notify_max_digest: int = 50  # signals per digest
+    notify_max_retries: int = 5
+    notify_backoff_base: float = 1.0  # seconds, doubled per retry
+    notify_timeout: float = 10.0  # seconds per HTTP request
+    notify_telegram_rate: float = 1.0  # messages per second
+    notify_discord_rate: float = 0.5  # messages per second
     
     class Config:
         env_file = ".env"
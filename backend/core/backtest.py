@@ -0,0 +1,411 @@
+"""
+Vectorized backtesting of trading bots on stored candles.
+"""
+import heapq
+import time
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config.settings import settings
+from core.performance import RunningMoments, sharpe_ratio, sortino_ratio
+from bots.base_bot import BaseBot
+from utils.market_data import market_data
+
+
+class _VectorSignals:
+    """Entries and exits of one symbol from a bot's ``vector_signals`` arrays."""
+    
+    def __init__(self, signals: Dict[str, np.ndarray], min_confidence: float):
+        self.confidence = np.asarray(signals['confidence'], dtype=float)
+        enter = np.asarray(signals['enter'], dtype=bool) & (self.confidence > min_confidence)
+        self.entries = np.flatnonzero(enter)
+        self.exit = np.asarray(signals['exit'], dtype=bool)
+        self.upper = np.asarray(signals['upper'], dtype=float)
+        self.lower = np.asarray(signals['lower'], dtype=float)
+    
+    def next_exit(self, entry: int, entry_price: float) -> Optional[int]:
+        """First bar after ``entry`` whose exit conditions hold for ``entry_price``."""
+        n = len(self.exit)
+        start, size = entry + 1, 64
+        # Most trades are short; search in growing chunks instead of to the end
+        while start < n:
+            end = min(n, start + size)
+            hit = (
+                self.exit[start:end]
+                | (self.upper[start:end] > entry_price)
+                | (self.lower[start:end] < entry_price)
+            )
+            found = np.flatnonzero(hit)
+            if len(found):
+                return start + int(found[0])
+            start, size = end, size * 4
+        return None
+
+
+class _ReplaySignals:
+    """
+    Entries and exits of one symbol by calling ``should_enter`` and
+    ``should_exit`` on each growing prefix of the history.
+    
+    Used for bots without ``vector_signals``; correct but slow.
+    """
+    
+    def __init__(self, bot: BaseBot, symbol: str, df: pd.DataFrame):
+        self.bot = bot
+        self.symbol = symbol
+        self.df = df
+        self.confidence = np.zeros(len(df))
+        entries = []
+        for i in range(len(df)):
+            try:
+                should_enter, confidence, _ = bot.should_enter(symbol, df.iloc[:i + 1])
+            except Exception:
+                continue
+            if should_enter and confidence > bot.entry_confidence:
+                self.confidence[i] = confidence
+                entries.append(i)
+        self.entries = np.array(entries, dtype=np.int64)
+    
+    def next_exit(self, entry: int, entry_price: float) -> Optional[int]:
+        for i in range(entry + 1, len(self.df)):
+            try:
+                should_exit, _ = self.bot.should_exit(self.symbol, self.df.iloc[:i + 1], entry_price)
+            except Exception:
+                continue
+            if should_exit:
+                return i
+        return None
+
+
+class BacktestResult:
+    """Equity curve, trades and portfolio statistics of one backtest."""
+    
+    def __init__(
+        self,
+        bot_id: str,
+        equity: pd.Series,
+        trades: List[Dict],
+        open_trades: List[Dict],
+        stats: Dict,
+        timings: Dict[str, float]
+    ):
+        self.bot_id = bot_id
+        self.equity = equity
+        self.trades = trades
+        self.open_trades = open_trades
+        self.stats = stats
+        self.timings = timings
+    
+    def to_dict(self, include_equity: bool = False) -> Dict:
+        """Get the result as JSON-friendly data."""
+        result = {
+            'bot_id': self.bot_id,
+            'stats': self.stats,
+            'trades': self.trades,
+            'open_trades': self.open_trades,
+            'timings': self.timings
+        }
+        if include_equity:
+            result['equity'] = [[ts.isoformat(), float(v)] for ts, v in self.equity.items()]
+        return result
+
+
+class Backtester:
+    """
+    Replays bots over historical candles with simulated fills.
+    
+    Each bot trades its own paper portfolio, sized and limited like the
+    live one (``BaseBot.allocation_pct`` of equity per position, the
+    position size, exposure and cash checks of ``can_open_position``, one
+    position per symbol, long only). Signals are evaluated at each bar's
+    close and filled at that close moved against the trade by
+    ``slippage_bps``; each fill pays ``fee_bps`` of its notional.
+    
+    Indicators are computed once over each symbol's full history through
+    ``BaseBot.vector_signals``. The simulation then visits only bars with
+    entry signals, plus one exit per trade, in time order across symbols,
+    so its cost grows with the number of signals rather than bars. Bots without ``vector_signals`` fall
+    back to a bar-by-bar replay of ``should_enter``/``should_exit``.
+    
+    Indicators see the whole stored history rather than the live one-month
+    window, so values still warming up in live trading can differ.
+    """
+    
+    def __init__(
+        self,
+        initial_capital: Optional[float] = None,
+        fee_bps: Optional[float] = None,
+        slippage_bps: Optional[float] = None,
+        enforce_limits: bool = True
+    ):
+        self.initial_capital = initial_capital or settings.initial_capital
+        self.fee_bps = settings.backtest_fee_bps if fee_bps is None else fee_bps
+        self.slippage_bps = settings.backtest_slippage_bps if slippage_bps is None else slippage_bps
+        self.enforce_limits = enforce_limits
+    
+    @staticmethod
+    def signal_source(bot: BaseBot, symbol: str, df: pd.DataFrame):
+        """Get the entry/exit source for one symbol (vectorized when the bot supports it)."""
+        # Untagged copy: full-history indicators stay out of the live indicator cache
+        df = df.copy(deep=False)
+        df.attrs = {}
+        signals = bot.vector_signals(symbol, df)
+        if signals is None:
+            return _ReplaySignals(bot, symbol, df)
+        return _VectorSignals(signals, bot.entry_confidence)
+    
+    def run(
+        self,
+        bot: BaseBot,
+        frames: Dict[str, pd.DataFrame],
+        start: Optional[pd.Timestamp] = None
+    ) -> BacktestResult:
+        """
+        Backtest one bot.
+        
+        Args:
+            bot: Bot to replay
+            frames: OHLCV history by symbol; symbols are processed in this
+                order when events coincide, like the bot's symbol loop
+            start: Only trade from this time on; earlier bars only warm up
+                the indicators
+        
+        Returns:
+            BacktestResult with stats shaped like ``Portfolio.get_stats``
+        """
+        started = time.perf_counter()
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        symbols = list(frames)
+        
+        # Common timeline; each symbol's bars map to rows of it
+        stamps = [_epoch_ns(frames[s].index) for s in symbols]
+        times = np.unique(np.concatenate(stamps)) if stamps else np.array([], dtype=np.int64)
+        rows = [np.searchsorted(times, ts) for ts in stamps]
+        closes = [frames[s]['Close'].to_numpy(dtype=float) for s in symbols]
+        
+        marks = np.full((len(times), len(symbols)), np.nan)
+        for col, (r, close) in enumerate(zip(rows, closes)):
+            marks[r, col] = close
+        marks = pd.DataFrame(marks).ffill().to_numpy()
+        first = 0
+        if start is not None:
+            first = int(np.searchsorted(times, _epoch_ns(pd.DatetimeIndex([start]))[0]))
+        
+        sources = [self.signal_source(bot, s, frames[s]) for s in symbols]
+        signal_time = time.perf_counter() - started
+        
+        trades, open_trades, cash_delta, holdings = self._simulate(bot, symbols, sources, rows, closes, times, marks, first)
+        simulate_time = time.perf_counter() - started - signal_time
+        
+        cash = self.initial_capital + np.cumsum(cash_delta[first:])
+        positions_value = np.nansum(holdings[first:] * marks[first:], axis=1)
+        equity = pd.Series(cash + positions_value, index=pd.to_datetime(times[first:], unit='ns', utc=True), name=bot.bot_id)
+        
+        stats = self._stats(trades, equity, cash, positions_value, len(open_trades))
+        timings = {
+            'signals': signal_time,
+            'simulate': simulate_time,
+            'total': time.perf_counter() - started
+        }
+        return BacktestResult(bot.bot_id, equity, trades, open_trades, stats, timings)
+    
+    def run_all(
+        self,
+        bots: List[BaseBot],
+        frames: Dict[str, pd.DataFrame],
+        start: Optional[pd.Timestamp] = None
+    ) -> Dict[str, BacktestResult]:
+        """Backtest several bots on the same history, each on its own portfolio."""
+        return {bot.bot_id: self.run(bot, frames, start) for bot in bots}
+    
+    def _simulate(self, bot, symbols, sources, rows, closes, times, marks, first) -> tuple:
+        slippage = self.slippage_bps / 10000
+        fee_rate = self.fee_bps / 10000
+        allocation = bot.allocation_pct()
+        
+        cash = self.initial_capital
+        cash_delta = np.zeros(len(times))
+        holdings = np.zeros((len(times), len(symbols)))
+        open_positions: Dict[int, Dict] = {}
+        last_exit = [-1] * len(symbols)
+        trades: List[Dict] = []
+        iso: Dict[int, str] = {}
+        
+        # Entry candidates grouped by timeline row, in symbol order within a row
+        entry_rows = np.concatenate([rows[c][src.entries] for c, src in enumerate(sources)] or [[]]).astype(np.int64)
+        entry_cols = np.concatenate([np.full(len(src.entries), c) for c, src in enumerate(sources)] or [[]]).astype(np.int64)
+        entry_bars = np.concatenate([src.entries for src in sources] or [[]]).astype(np.int64)
+        order = np.lexsort((entry_cols, entry_rows))
+        entry_rows, entry_cols, entry_bars = entry_rows[order], entry_cols[order], entry_bars[order]
+        keep = entry_rows >= first
+        entry_rows, entry_cols, entry_bars = entry_rows[keep], entry_cols[keep], entry_bars[keep]
+        starts = np.flatnonzero(np.diff(entry_rows, prepend=-1)).tolist() + [len(entry_rows)]
+        entry_cols, entry_bars = entry_cols.tolist(), entry_bars.tolist()
+        
+        # Pending exits as (row, column, bar)
+        exits = []
+        
+        def close_position(row: int, col: int, i: int):
+            nonlocal cash
+            position = open_positions.pop(col)
+            fill = closes[col][i] * (1 - slippage)
+            proceeds = position['quantity'] * fill
+            fee = proceeds * fee_rate
+            cash += proceeds - fee
+            cash_delta[row] += proceeds - fee
+            holdings[row, col] -= position['quantity']
+            last_exit[col] = row
+            trades.append(self._trade_record(bot, symbols[col], position, times[row], fill, fee, iso))
+        
+        for g in range(len(starts) - 1):
+            row = int(entry_rows[starts[g]])
+            # Exits on a row are filled before its entries
+            while exits and exits[0][0] <= row:
+                close_position(*heapq.heappop(exits))
+            
+            mark = marks[row]
+            for k in range(starts[g], starts[g + 1]):
+                col, i = entry_cols[k], entry_bars[k]
+                if col in open_positions or last_exit[col] >= row:
+                    continue
+                
+                # Portfolio value and exposure at this bar, as can_open_position sees them
+                positions_value = sum(p['quantity'] * mark[c] for c, p in open_positions.items())
+                portfolio_value = cash + positions_value
+                price = closes[col][i]
+                quantity = portfolio_value * (allocation / 100) / price
+                fill = price * (1 + slippage)
+                cost = quantity * fill
+                fee = cost * fee_rate
+                
+                allowed = portfolio_value > 0 and cost + fee <= cash
+                if allowed and self.enforce_limits:
+                    position_pct = quantity * price / portfolio_value * 100
+                    exposure_pct = positions_value / portfolio_value * 100
+                    allowed = (
+                        position_pct <= settings.max_position_size_pct
+                        and exposure_pct + position_pct <= settings.max_portfolio_exposure_pct
+                    )
+                if not allowed:
+                    # Sizing is a fixed share of equity, so the checks do not
+                    # depend on the symbol: every later candidate here fails too
+                    break
+                
+                cash -= cost + fee
+                cash_delta[row] -= cost + fee
+                holdings[row, col] += quantity
+                source = sources[col]
+                open_positions[col] = {
+                    'quantity': quantity,
+                    'fill': fill,
+                    'fee': fee,
+                    'entry_time': times[row],
+                    'confidence': float(source.confidence[i])
+                }
+                
+                # Exit rules see the price the live portfolio would have recorded
+                x = source.next_exit(i, price)
+                if x is not None:
+                    heapq.heappush(exits, (int(rows[col][x]), col, x))
+        
+        while exits:
+            close_position(*heapq.heappop(exits))
+        
+        holdings = np.cumsum(holdings, axis=0)
+        open_trades = [
+            {
+                'symbol': symbols[col],
+                'quantity': p['quantity'],
+                'entry_time': _isoformat(p['entry_time'], iso),
+                'entry_price': p['fill'],
+                'current_price': float(marks[-1, col])
+            }
+            for col, p in open_positions.items()
+        ]
+        return trades, open_trades, cash_delta, holdings
+    
+    @staticmethod
+    def _trade_record(bot: BaseBot, symbol: str, position: Dict, exit_time: int, fill: float, fee: float, iso: Dict[int, str]) -> Dict:
+        fees = position['fee'] + fee
+        return {
+            'symbol': symbol,
+            'bot_id': bot.bot_id,
+            'strategy': bot.strategy,
+            'quantity': position['quantity'],
+            'entry_time': _isoformat(position['entry_time'], iso),
+            'exit_time': _isoformat(exit_time, iso),
+            'entry_price': position['fill'],
+            'exit_price': fill,
+            'confidence': position['confidence'],
+            'fees': fees,
+            'realized_pnl': (fill - position['fill']) * position['quantity'] - fees
+        }
+    
+    def _stats(self, trades: List[Dict], equity: pd.Series, cash: np.ndarray, positions_value: np.ndarray, open_count: int) -> Dict:
+        returns = RunningMoments()
+        downside = RunningMoments()
+        wins = 0
+        total_pnl = 0.0
+        for trade in trades:
+            pnl = trade['realized_pnl']
+            total_pnl += pnl
+            wins += pnl > 0
+            r = pnl / self.initial_capital
+            returns.add(r)
+            if r < 0:
+                downside.add(r)
+        
+        values = equity.to_numpy()
+        if len(values):
+            peaks = np.maximum.accumulate(values)
+            max_drawdown = float(((peaks - values) / peaks).max() * 100)
+            final_cash, final_value, final_positions = float(cash[-1]), float(values[-1]), float(positions_value[-1])
+        else:
+            max_drawdown = 0.0
+            final_cash = final_value = self.initial_capital
+            final_positions = 0.0
+        
+        return {
+            'cash': final_cash,
+            'portfolio_value': final_value,
+            'total_pnl': total_pnl,
+            'total_pnl_pct': (total_pnl / self.initial_capital) * 100,
+            'max_drawdown': max_drawdown,
+            'sharpe_ratio': sharpe_ratio(returns, 0.02),
+            'sortino_ratio': sortino_ratio(returns, downside, 0.02),
+            'win_rate': (wins / len(trades) * 100) if trades else 0.0,
+            'total_trades': len(trades),
+            'open_positions': open_count,
+            'exposure_pct': (final_positions / final_value * 100) if final_value else 0.0,
+            'total_fees': sum(t['fees'] for t in trades)
+        }
+
+
+def _epoch_ns(index) -> np.ndarray:
+    """
+    Epoch nanoseconds of a datetime index, whatever its unit.
+    
+    Naive timestamps are taken as UTC, like ``CandleStore`` does.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.tz_convert('UTC').as_unit('ns').asi8
+
+
+def _isoformat(stamp: int, cache: Dict[int, str]) -> str:
+    """ISO timestamp of an epoch-nanosecond timeline value (memoized per bar)."""
+    text = cache.get(stamp)
+    if text is None:
+        text = cache[stamp] = pd.Timestamp(int(stamp), unit='ns', tz='UTC').isoformat()
+    return text
+
+
+def load_frames(symbols: List[str], period: str = "1y", interval: str = "1h") -> Dict[str, pd.DataFrame]:
+    """
+    Load stored candles for a backtest.
+    
+    Reads through ``market_data`` so the candle store and cache are used
+    and only missing bars are downloaded.
+    """
+    return market_data.get_historical_data_many(symbols, period=period, interval=interval)
@@ -0,0 +1,145 @@
+"""
+Tracking of the last processed bar per (component, symbol, interval).
+"""
+import threading
+import pandas as pd
+from typing import Any, Dict, Iterable, Tuple
+from config.settings import settings
+
+
+OHLCV_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def bar_key(df: pd.DataFrame) -> tuple:
+    """
+    Fingerprint a frame by its length and latest bar.
+    
+    The key changes when a new bar is added and when the forming bar's
+    values move, so equal keys mean the analysis input is unchanged.
+    Matches ``Panel.bar_keys`` for the same data.
+    """
+    return (
+        len(df),
+        pd.Timestamp(df.index[-1]),
+        tuple(float(df[col].iat[-1]) for col in OHLCV_COLUMNS)
+    )
+
+
+class BarTracker:
+    """
+    Remembers the last bar each component analyzed for each symbol.
+    
+    Scanners and bots look up a symbol's current ``bar_key`` before
+    analyzing it. If the key matches the one they last processed, the
+    stored result is reused instead of recomputing it. Per-tick counts of
+    evaluated and skipped symbols show how much work was saved.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._entries: Dict[Tuple[str, str, str], Tuple[tuple, Any]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self.last_tick: Dict[str, Dict[str, int]] = {}
+        self.total_evaluated = 0
+        self.total_skipped = 0
+    
+    def lookup(self, component: str, symbol: str, interval: str, key: tuple) -> Tuple[bool, Any]:
+        """
+        Look up the stored result for an unchanged bar.
+        
+        Returns:
+            (hit, result); on a hit the caller should skip its analysis
+        """
+        with self._lock:
+            entry = self._entries.get((component, symbol, interval)) if self.enabled else None
+            hit = entry is not None and entry[0] == key
+            counts = self._counts.setdefault(component, {'evaluated': 0, 'skipped': 0})
+            counts['skipped' if hit else 'evaluated'] += 1
+            return hit, (entry[1] if hit else None)
+    
+    def store(self, component: str, symbol: str, interval: str, key: tuple, result: Any):
+        """Record the result of analyzing the bar identified by ``key``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[(component, symbol, interval)] = (key, result)
+    
+    def export_entries(self, components: Iterable[str], symbols: Iterable[str]) -> Dict[Tuple[str, str, str], Tuple[tuple, Any]]:
+        """
+        Copy out the processed bars of some components and symbols.
+        
+        Worker processes don't share this tracker, so the parent sends each
+        task the entries it needs and takes the updated ones back with
+        ``import_entries``.
+        """
+        components = set(components)
+        symbols = set(symbols)
+        with self._lock:
+            return {
+                entry_id: entry for entry_id, entry in self._entries.items()
+                if entry_id[0] in components and entry_id[1] in symbols
+            }
+    
+    def import_entries(self, entries: Dict[Tuple[str, str, str], Tuple[tuple, Any]], replace: bool = False):
+        """
+        Take in entries from ``export_entries``.
+        
+        Args:
+            entries: Processed bars by (component, symbol, interval)
+            replace: Forget all other entries first (used by pool workers,
+                which must not reuse what an earlier task left behind)
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if replace:
+                self._entries.clear()
+            self._entries.update(entries)
+    
+    def merge(self, counts: Dict[str, Dict[str, int]]):
+        """Add per-component counts collected in a worker process."""
+        with self._lock:
+            for component, worker_counts in counts.items():
+                totals = self._counts.setdefault(component, {'evaluated': 0, 'skipped': 0})
+                for name, value in worker_counts.items():
+                    totals[name] += value
+    
+    def end_tick(self) -> Dict[str, Dict[str, int]]:
+        """
+        Close the current tick's counts and start new ones.
+        
+        Returns:
+            Dict mapping component to {'evaluated', 'skipped'} for the tick
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        self.last_tick = counts
+        self.total_evaluated += sum(c['evaluated'] for c in counts.values())
+        self.total_skipped += sum(c['skipped'] for c in counts.values())
+        return counts
+    
+    def clear(self):
+        """Forget all processed bars so everything is re-evaluated."""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        """Get last-tick and cumulative skip statistics."""
+        evaluated = sum(c['evaluated'] for c in self.last_tick.values())
+        skipped = sum(c['skipped'] for c in self.last_tick.values())
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'last_tick': {
+                'evaluated': evaluated,
+                'skipped': skipped,
+                'components': self.last_tick
+            },
+            'total_evaluated': self.total_evaluated,
+            'total_skipped': self.total_skipped
+        }
+
+
+# Global bar tracker instance
+bar_tracker = BarTracker(settings.enable_bar_tracking)
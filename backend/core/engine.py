@@ -2,14 +2,23 @@
 Trading engine - orchestrates scanners, bots, and risk management.
 """
 import asyncio
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional
 from datetime import datetime
 from config.settings import settings
+from core.executor import TaskExecutor
+from core.sharding import SharedCandleBlock, evaluate_shard, shard_symbols
+from core.signal_writer import signal_writer
+from core.bar_tracker import bar_tracker
 from core.portfolio import portfolio
+from core.profiler import profiler
 from governance.risk_manager import risk_manager
-from utils.market_data import market_data
+from utils.market_data import market_data, async_market_data
+from utils.indicators import indicator_cache
+from utils.panel import Panel
 from utils.google_sheets import sheets_sync
 from utils.notifications import notifier
+from utils.metrics import metrics, component_seconds, tick_seconds, signals_total
 
 # Import scanners
 from scanners.trend_alignment import TrendAlignmentScanner
@@ -31,6 +40,19 @@ from bots.correlation_break import CorrelationBreakBot
 from bots.no_trade_guardian import NoTradeGuardianBot
 
 
+def _scan_in_process(scanner, block: SharedCandleBlock, bar_entries: Dict):
+    """
+    Run a scanner's analysis in a worker process; the parent records the results.
+    
+    Returns:
+        (results, bar counts, processed bars after this tick)
+    """
+    bar_tracker.end_tick()
+    bar_tracker.import_entries(bar_entries, replace=True)
+    results = scanner.evaluate(frames=block.read(scanner.symbols))
+    return results, bar_tracker.end_tick(), bar_tracker.export_entries([scanner.scanner_id], scanner.symbols)
+
+
 class TradingEngine:
     """Main trading engine that coordinates all components."""
     
@@ -63,26 +85,173 @@ class TradingEngine:
         ]
         
         self.last_update = datetime.utcnow()
+        self.last_snapshot = time.monotonic()
+        self.last_tick_finished: Optional[float] = None
+        self.last_tick_seconds = 0.0
+        self._loop_task: Optional[asyncio.Task] = None
+        
+        # Worker pool for scanners, bots and blocking data fetches
+        self.executor = TaskExecutor(
+            mode=settings.engine_executor,
+            max_workers=settings.engine_max_workers,
+            task_timeout=settings.engine_task_timeout
+        )
     
     async def run_scanners(self):
-        """Run all active scanners."""
+        """Run all active scanners concurrently."""
         all_signals = []
-        for scanner in self.scanners:
-            if scanner.active:
-                signals = scanner.scan()
-                all_signals.extend(signals)
+        active = [s for s in self.scanners if s.active]
+        
+        if self.executor.mode == "process":
+            return await self._run_scanners_in_processes(active)
+        
+        # Build the universe panel once and share it between panel-capable scanners
+        panel = None
+        if any(s.supports_panel for s in active):
+            frames = await self.executor.run_blocking(
+                market_data.get_historical_data_many, self.symbols, period="1mo", interval=settings.engine_interval
+            )
+            panel = await self.executor.run_blocking(Panel.from_frames, frames)
+        
+        tasks = [(s.scanner_id, s.scan, (panel,)) for s in active]
+        results = await self.executor.run_tasks(tasks, component="scanner")
+        for scanner in active:
+            all_signals.extend(results.get(scanner.scanner_id, []))
+        return all_signals
+    
+    async def _run_scanners_in_processes(self, active: List) -> List:
+        """
+        Run scanners in the process pool.
+        
+        Candles go to the workers through one shared memory block instead of
+        a pickled panel per task; each worker reads its scanner's symbols.
+        """
+        all_signals = []
+        frames = await self.executor.run_blocking(
+            market_data.get_historical_data_many, self.symbols, period="1mo", interval=settings.engine_interval
+        )
+        block = await self.executor.run_blocking(SharedCandleBlock.create, frames, settings.engine_interval)
+        try:
+            tasks = [
+                (s.scanner_id, _scan_in_process, (s, block, bar_tracker.export_entries([s.scanner_id], s.symbols)))
+                for s in active
+            ]
+            results = await self.executor.run_tasks(tasks, use_processes=True, component="scanner")
+        finally:
+            block.unlink()
+        
+        for scanner in active:
+            if scanner.scanner_id in results:
+                scanner_results, bar_counts, bar_entries = results[scanner.scanner_id]
+                bar_tracker.merge(bar_counts)
+                bar_tracker.import_entries(bar_entries)
+                all_signals.extend(scanner.record_signals(scanner_results))
         return all_signals
     
     async def run_bots(self):
-        """Execute all active bots."""
+        """
+        Evaluate all active bots concurrently, then apply their orders.
+        
+        Every bot decides against the same positions and frames in the
+        thread pool; the resulting intents are applied one bot at a time in
+        ``self.bots`` order, so a tick's trades don't depend on thread timing.
+        """
         # Check if trading should be paused
         if risk_manager.should_pause_trading():
             print("Trading paused due to risk limits")
             return
         
-        for bot in self.bots:
-            if bot.status == "active":
-                bot.execute()
+        bots = [b for b in self.bots if b.status == "active"]
+        frames = await self.executor.run_blocking(
+            market_data.get_historical_data_many, self.symbols, period="1mo", interval=settings.engine_interval
+        )
+        entry_prices = {symbol: pos.entry_price for symbol, pos in portfolio.positions.items()}
+        
+        # Bots always run in threads: the portfolio lives in this process
+        tasks = [(b.bot_id, b.evaluate, (frames, entry_prices)) for b in bots if not b.runs_in_parent]
+        local_tasks = [(b.bot_id, b.execute, ()) for b in bots if b.runs_in_parent]
+        results, _ = await asyncio.gather(
+            self.executor.run_tasks(tasks, component="bot"),
+            self.executor.run_tasks(local_tasks, component="bot")
+        )
+        
+        await self.executor.run_blocking(self._apply_intents, bots, results)
+    
+    def _apply_intents(self, bots: List, intents: Dict[str, List[Dict]]):
+        """Apply each bot's order intents in bot order."""
+        for bot in bots:
+            bot.apply_intents(intents.get(bot.bot_id, []))
+    
+    async def run_shards(self):
+        """
+        Evaluate scanners and bots per symbol shard in worker processes.
+        
+        Candles go to the workers through shared memory; workers return
+        signal dicts and order intents, which are recorded and applied here
+        so signals, portfolio and risk state keep a single writer.
+        """
+        scanners = [s for s in self.scanners if s.active]
+        bots = []
+        if risk_manager.should_pause_trading():
+            print("Trading paused due to risk limits")
+        else:
+            bots = [b for b in self.bots if b.status == "active"]
+        shard_bots = [b for b in bots if not b.runs_in_parent]
+        
+        frames = await self.executor.run_blocking(
+            market_data.get_historical_data_many, self.symbols, period="1mo", interval=settings.engine_interval
+        )
+        block = await self.executor.run_blocking(SharedCandleBlock.create, frames, settings.engine_interval)
+        try:
+            entry_prices = {symbol: pos.entry_price for symbol, pos in portfolio.positions.items()}
+            components = [s.scanner_id for s in scanners] + [b.bot_id for b in shard_bots]
+            tasks = [
+                (
+                    f"shard-{i}",
+                    evaluate_shard,
+                    (block, shard, scanners, shard_bots, entry_prices, bar_tracker.export_entries(components, shard))
+                )
+                for i, shard in enumerate(shard_symbols(self.symbols, settings.engine_shards))
+            ]
+            local_tasks = [(b.bot_id, b.execute, ()) for b in bots if b.runs_in_parent]
+            results, _ = await asyncio.gather(
+                self.executor.run_tasks(tasks, use_processes=True, component="shard"),
+                self.executor.run_tasks(local_tasks, component="bot")
+            )
+        finally:
+            block.unlink()
+        
+        return await self.executor.run_blocking(self._merge_shards, list(results.values()), scanners, shard_bots)
+    
+    def _merge_shards(self, results: List[Dict], scanners: List, bots: List) -> List:
+        """Record shard signals and apply shard order intents in universe order."""
+        order = {symbol: i for i, symbol in enumerate(self.symbols)}
+        all_signals = []
+        
+        for result in results:
+            bar_tracker.merge(result['bar_counts'])
+            bar_tracker.import_entries(result['bar_entries'])
+        
+        for scanner in scanners:
+            merged = {}
+            for result in results:
+                merged.update(result['signals'].get(scanner.scanner_id, {}))
+            merged = dict(sorted(merged.items(), key=lambda item: order.get(item[0], len(order))))
+            all_signals.extend(scanner.record_signals(merged))
+        
+        intents = {}
+        for bot in bots:
+            intents[bot.bot_id] = [i for result in results for i in result['intents'].get(bot.bot_id, [])]
+            intents[bot.bot_id].sort(key=lambda intent: order.get(intent['symbol'], len(order)))
+        self._apply_intents(bots, intents)
+        
+        return all_signals
+    
+    async def warm_market_data(self):
+        """Prefetch candles for the whole universe in batched requests."""
+        await self.executor.run_blocking(
+            market_data.get_historical_data_many, self.symbols, period="1mo", interval=settings.engine_interval
+        )
     
     async def update_market_data(self):
         """Update market prices for all positions."""
@@ -90,59 +259,113 @@ class TradingEngine:
             return
         
         symbols = list(portfolio.positions.keys())
-        prices = market_data.get_multiple_prices(symbols)
+        prices = await self.executor.run_blocking(market_data.get_multiple_prices, symbols)
+        if len(prices) < len(symbols):
+            print(f"No price for {len(symbols) - len(prices)} positions, keeping their last prices")
         portfolio.update_positions(prices)
     
     async def update_health_score(self):
         """Update system health score."""
         risk_manager.calculate_health_score()
     
+    async def tick(self) -> List:
+        """
+        Run one engine iteration: prices, scanners and bots, persistence,
+        health score and outbound syncs.
+        
+        Returns:
+            Signals recorded this tick
+        """
+        started = time.perf_counter()
+        
+        # Update market data
+        with component_seconds.time(component="data_fetch", name="prices"):
+            await self.update_market_data()
+        
+        # Warm the candle cache before scanners and bots read it
+        with component_seconds.time(component="data_fetch", name="candles"):
+            await self.warm_market_data()
+        
+        # Run scanners and execute bots side by side
+        if settings.engine_shards > 0:
+            all_signals = await self.run_shards()
+        else:
+            all_signals, _ = await asyncio.gather(self.run_scanners(), self.run_bots())
+        
+        # Persist this tick's signals in one transaction
+        with component_seconds.time(component="db", name="signals"):
+            await self.executor.run_blocking(signal_writer.flush)
+        
+        # Update health score
+        with component_seconds.time(component="risk", name="health_score"):
+            await self.update_health_score()
+        
+        # Checkpoint portfolio aggregates so restarts only replay recent trades
+        if time.monotonic() - self.last_snapshot >= settings.portfolio_snapshot_interval:
+            with component_seconds.time(component="db", name="snapshot"):
+                await self.executor.run_blocking(portfolio.save_snapshot)
+            self.last_snapshot = time.monotonic()
+        
+        for sig in all_signals:
+            signals_total.inc(scanner=sig.scanner_id)
+        
+        self.last_update = datetime.utcnow()
+        
+        # Close this tick's evaluated/skipped counts
+        bar_tracker.end_tick()
+        
+        # Stage Google Sheets changes; the sync worker writes them in batches
+        sync_started = time.perf_counter()
+        try:
+            scanners_status = [s.get_status() for s in self.scanners]
+            sheets_sync.sync_scanners(scanners_status)
+            
+            if all_signals:
+                # Convert signal objects to dicts for sync
+                signals_data = []
+                for sig in all_signals:
+                    signals_data.append({
+                        'timestamp': sig.timestamp.isoformat() if hasattr(sig, 'timestamp') else datetime.utcnow().isoformat(),
+                        'symbol': sig.symbol,
+                        'signal_type': sig.signal_type,
+                        'confidence': sig.confidence,
+                        'price': sig.price,
+                        'condition': sig.condition
+                    })
+                    # Queue for Telegram/Discord; the dispatcher sends in the background
+                    notifier.enqueue_signal({
+                        'symbol': sig.symbol,
+                        'signal_type': sig.signal_type,
+                        'confidence': sig.confidence,
+                        'price': sig.price,
+                        'condition': sig.condition
+                    })
+                sheets_sync.sync_signals(signals_data)
+        except Exception as sync_err:
+            print(f"Error during Google Sheets sync: {sync_err}")
+        component_seconds.observe(time.perf_counter() - sync_started, component="sheets", name="stage")
+        
+        self.last_tick_seconds = time.perf_counter() - started
+        self.last_tick_finished = time.monotonic()
+        tick_seconds.observe(self.last_tick_seconds)
+        return all_signals
+    
     async def main_loop(self):
         """Main trading loop."""
+        notifier.start()
+        sheets_sync.start()
+        
         while self.running:
             try:
-                # Update market data
-                await self.update_market_data()
-                
-                # Run scanners
-                await self.run_scanners()
-                
-                # Execute bots
-                await self.run_bots()
-                
-                # Update health score
-                await self.update_health_score()
-                
-                self.last_update = datetime.utcnow()
-                
-                # Sync to Google Sheets
+                # Sampling only runs for ticks armed through the admin API
+                profiling = profiler.armed
+                if profiling:
+                    profiler.tick_started()
                 try:
-                    scanners_status = [s.get_status() for s in self.scanners]
-                    sheets_sync.sync_scanners(scanners_status)
-                    
-                    if all_signals:
-                        # Convert signal objects to dicts for sync
-                        signals_data = []
-                        for sig in all_signals:
-                            signals_data.append({
-                                'timestamp': sig.timestamp.isoformat() if hasattr(sig, 'timestamp') else datetime.utcnow().isoformat(),
-                                'symbol': sig.symbol,
-                                'signal_type': sig.signal_type,
-                                'confidence': sig.confidence,
-                                'price': sig.price,
-                                'condition': sig.condition
-                            })
-                            # Broadcast to Telegram/Discord
-                            notifier.broadcast_signal({
-                                'symbol': sig.symbol,
-                                'signal_type': sig.signal_type,
-                                'confidence': sig.confidence,
-                                'price': sig.price,
-                                'condition': sig.condition
-                            })
-                        sheets_sync.sync_signals(signals_data)
-                except Exception as sync_err:
-                    print(f"Error during Google Sheets sync: {sync_err}")
+                    await self.tick()
+                finally:
+                    if profiling:
+                        profiler.tick_finished()
                 
                 # Wait before next iteration
                 await asyncio.sleep(settings.data_update_interval)
@@ -152,13 +375,26 @@ class TradingEngine:
                 await asyncio.sleep(10)
     
     def start(self):
-        """Start the trading engine."""
+        """Start the trading engine and run ``main_loop`` on the current event loop."""
+        portfolio.restore()
         self.running = True
+        self._loop_task = asyncio.create_task(self.main_loop())
         print("Trading engine started")
     
-    def stop(self):
+    async def stop(self):
         """Stop the trading engine."""
         self.running = False
+        # The loop submits work to the pools, so it must be gone before they close
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        self.executor.shutdown()
+        signal_writer.flush()
+        portfolio.save_snapshot()
         print("Trading engine stopped")
     
     def get_scanner_by_id(self, scanner_id: str):
@@ -189,9 +425,68 @@ class TradingEngine:
             'total_bots': len(self.bots),
             'health_score': risk_manager.health_score,
             'portfolio_value': portfolio.get_portfolio_value(),
-            'open_positions': len(portfolio.positions)
+            'open_positions': len(portfolio.positions),
+            'indicator_cache': indicator_cache.get_stats(),
+            'market_data_cache': market_data.get_cache_stats(),
+            'market_data_requests': async_market_data.get_stats(),
+            'signal_writer': signal_writer.get_stats(),
+            'notifications': notifier.get_stats(),
+            'sheets_sync': sheets_sync.get_stats(),
+            'bar_tracker': bar_tracker.get_stats()
         }
 
 
 # Global engine instance
 engine = TradingEngine()
+
+
+def _engine_metrics():
+    """Scrape-time view of the statistics engine components already keep."""
+    lag = None
+    if engine.last_tick_finished is not None:
+        idle = time.monotonic() - engine.last_tick_finished
+        lag = max(0.0, idle - settings.data_update_interval)
+    
+    indicators = indicator_cache.get_stats()
+    frames = market_data.get_cache_stats()
+    requests = async_market_data.get_stats()
+    bars = bar_tracker.get_stats()
+    writer = signal_writer.get_stats()
+    notifications = notifier.get_stats()
+    sheets = sheets_sync.get_stats()
+    
+    return [
+        ("scantrade_tick_last_seconds", "gauge", "Duration of the most recent engine tick",
+         [({}, engine.last_tick_seconds)]),
+        ("scantrade_tick_lag_seconds", "gauge", "Seconds the next tick is overdue beyond the update interval",
+         [({}, lag)]),
+        ("scantrade_cache_hits_total", "counter", "Cache lookups served from memory",
+         [({'cache': 'indicators'}, indicators['hits']), ({'cache': 'frames'}, frames['hits'])]),
+        ("scantrade_cache_misses_total", "counter", "Cache lookups that had to compute or fetch",
+         [({'cache': 'indicators'}, indicators['misses']), ({'cache': 'frames'}, frames['misses'])]),
+        ("scantrade_data_requests_total", "counter", "Market data provider requests",
+         [({}, requests['requests'])]),
+        ("scantrade_data_failures_total", "counter", "Market data requests that failed",
+         [({'client': 'async'}, requests['failures']), ({'client': 'fetcher'}, frames['fetch_failures'])]),
+        ("scantrade_bars_total", "counter", "Symbol bars evaluated or skipped as unchanged",
+         [({'result': 'evaluated'}, bars['total_evaluated']), ({'result': 'skipped'}, bars['total_skipped'])]),
+        ("scantrade_signal_rows_written_total", "counter", "Signal rows written to the database",
+         [({}, writer['rows_written'])]),
+        ("scantrade_signal_flush_failures_total", "counter", "Failed signal database flushes",
+         [({}, writer['failed_flushes'])]),
+        ("scantrade_notifications_total", "counter", "Notification outcomes",
+         [({'result': key}, notifications[key]) for key in ('sent', 'failed', 'dropped', 'retries')]),
+        ("scantrade_notifications_pending", "gauge", "Notifications waiting in the queue",
+         [({}, notifications['pending'])]),
+        ("scantrade_sheets_flushes_total", "counter", "Google Sheets flushes",
+         [({'result': 'ok'}, sheets['flushes']), ({'result': 'failed'}, sheets['failed_flushes'])]),
+        ("scantrade_portfolio_value", "gauge", "Portfolio value including open positions",
+         [({}, portfolio.get_portfolio_value())]),
+        ("scantrade_open_positions", "gauge", "Open positions",
+         [({}, len(portfolio.positions))]),
+        ("scantrade_health_score", "gauge", "Risk manager health score",
+         [({}, risk_manager.health_score)])
+    ]
+
+
+metrics.register_collector(_engine_metrics)
@@ -0,0 +1,153 @@
+"""
+Task executor for running blocking engine work off the event loop.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.metrics import component_seconds
+
+
+def process_context():
+    """
+    Multiprocessing context for worker pools.
+    
+    Workers start from a clean forkserver process (spawn where forkserver is
+    unavailable) instead of forking the engine, which holds running threads,
+    locks and database connections that a forked child would inherit.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+class TaskExecutor:
+    """
+    Runs scanners, bots and data fetches in a worker pool.
+    
+    Every task gets a timeout measured from submission. Tasks that time out
+    are cancelled: queued ones never start, and running thread tasks are
+    sent a ``cancel_event`` they check between symbols. Results are
+    collected back on the event loop, which stays free to serve the API.
+    """
+    
+    def __init__(self, mode: str = "thread", max_workers: int = 8, task_timeout: float = 120.0):
+        self.mode = mode  # "thread" or "process"
+        self.max_workers = max_workers
+        self.task_timeout = task_timeout
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._closed = False
+    
+    def _check_open(self):
+        # Pools are created lazily; never bring one back after shutdown
+        if self._closed:
+            raise RuntimeError("Task executor has been shut down")
+    
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        self._check_open()
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="engine"
+            )
+        return self._thread_pool
+    
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        self._check_open()
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=process_context())
+        return self._process_pool
+    
+    async def run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run one blocking call in the thread pool and await its result.
+        
+        Raises:
+            RuntimeError: If the executor has been shut down
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.thread_pool, partial(func, *args, **kwargs))
+    
+    async def run_tasks(
+        self,
+        tasks: List[Tuple[str, Callable, tuple]],
+        timeout: Optional[float] = None,
+        use_processes: bool = False,
+        component: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run named tasks concurrently.
+        
+        Args:
+            tasks: List of (name, func, args). Thread tasks are also passed a
+                ``cancel_event`` keyword; process tasks must be picklable
+            timeout: Per-task timeout in seconds (defaults to ``task_timeout``)
+            use_processes: Run in the process pool instead of threads
+            component: Record each task's duration (including time queued
+                for a worker) under this component, labelled with its name
+        
+        Returns:
+            Dict mapping task name to result for tasks that completed;
+            failed and timed-out tasks are reported and left out
+        
+        Raises:
+            RuntimeError: If the executor has been shut down
+        """
+        timeout = timeout or self.task_timeout
+        loop = asyncio.get_running_loop()
+        pool: Executor = self.process_pool if use_processes else self.thread_pool
+        
+        cancel_events: Dict[str, threading.Event] = {}
+        
+        async def run_one(name: str, func: Callable, args: tuple) -> Any:
+            if pool is self.thread_pool:
+                cancel_events[name] = threading.Event()
+                call = partial(func, *args, cancel_event=cancel_events[name])
+            else:
+                call = partial(func, *args)
+            started = time.perf_counter()
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(pool, call), timeout)
+            except asyncio.TimeoutError:
+                # Tell a running thread task to stop at its next checkpoint
+                if name in cancel_events:
+                    cancel_events[name].set()
+                raise
+            finally:
+                if component is not None:
+                    component_seconds.observe(time.perf_counter() - started, component=component, name=name)
+        
+        try:
+            outcomes = await asyncio.gather(
+                *(run_one(name, func, args) for name, func, args in tasks),
+                return_exceptions=True
+            )
+        except asyncio.CancelledError:
+            for event in cancel_events.values():
+                event.set()
+            raise
+        
+        results = {}
+        for (name, _, _), outcome in zip(tasks, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                print(f"Task {name} timed out after {timeout:.0f}s and was cancelled")
+            elif isinstance(outcome, BaseException):
+                print(f"Task {name} failed: {outcome}")
+            else:
+                results[name] = outcome
+        return results
+    
+    def shutdown(self):
+        """Stop the worker pools without waiting for running tasks; later submissions raise."""
+        self._closed = True
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = None
+        self._process_pool = None
@@ -0,0 +1,414 @@
+"""
+Parallel parameter sweeps and walk-forward optimization of bots.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Type, Union
+import pandas as pd
+from config.settings import settings
+from core.backtest import Backtester, load_frames
+from core.executor import process_context
+from core.sharding import SharedCandleBlock
+from bots.base_bot import BaseBot
+
+
+# Metrics results can be ranked by, and whether higher is better
+METRICS = {
+    'sharpe_ratio': True,
+    'sortino_ratio': True,
+    'total_pnl': True,
+    'total_pnl_pct': True,
+    'win_rate': True,
+    'max_drawdown': False
+}
+
+
+def grid(space: Dict[str, Sequence]) -> List[Dict]:
+    """
+    Every combination of a parameter grid.
+    
+    Args:
+        space: Values to try per parameter, e.g. {'lookback': [24, 48, 96]}
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_samples(space: Dict[str, Union[Sequence, Tuple]], samples: int, seed: Optional[int] = None) -> List[Dict]:
+    """
+    Random parameter sets.
+    
+    Args:
+        space: Per parameter either a ``(low, high)`` tuple, sampled
+            uniformly (as integers when both bounds are ints), or a list of
+            values to choose from
+        samples: Number of parameter sets
+        seed: Random seed for reproducible sweeps
+    """
+    rng = random.Random(seed)
+    
+    def draw(values):
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return rng.uniform(low, high)
+        return rng.choice(list(values))
+    
+    return [{name: draw(values) for name, values in space.items()} for _ in range(samples)]
+
+
+def walk_forward_windows(
+    index: pd.DatetimeIndex,
+    train_bars: int,
+    test_bars: int,
+    step: Optional[int] = None
+) -> List[Tuple[pd.Timestamp, pd.Timestamp, Optional[pd.Timestamp]]]:
+    """
+    Rolling train/test windows over a timeline.
+    
+    Args:
+        index: Bar timestamps
+        train_bars: Bars in each training window
+        test_bars: Bars in each test window, right after its training window
+        step: Bars between window starts (defaults to ``test_bars``, so the
+            test windows tile the history)
+    
+    Returns:
+        (train_start, test_start, test_end) per fold; windows are half-open,
+        so training covers [train_start, test_start) and testing
+        [test_start, test_end); the last test_end is None when the final
+        window runs to the end of the history
+    """
+    step = step or test_bars
+    windows = []
+    start = 0
+    while start + train_bars + test_bars <= len(index):
+        test_start = start + train_bars
+        test_end = test_start + test_bars
+        end = index[test_end] if test_end < len(index) else None
+        windows.append((index[start], index[test_start], end))
+        start += step
+    return windows
+
+
+def _finite(stats: Dict) -> Dict:
+    # JSON has no infinity (e.g. a Sortino ratio with no losing trades)
+    return {
+        k: (None if isinstance(v, float) and not math.isfinite(v) else v)
+        for k, v in stats.items()
+    }
+
+
+# Candles of the sweep, read once per worker process from shared memory
+_worker_frames: Dict[str, pd.DataFrame] = {}
+
+
+def _init_worker(block: SharedCandleBlock, symbols: List[str]):
+    global _worker_frames
+    _worker_frames = block.read(symbols)
+
+
+def _evaluate(
+    bot_class: Type[BaseBot],
+    params: Dict,
+    start: Optional[pd.Timestamp],
+    end: Optional[pd.Timestamp],
+    backtester: Dict
+) -> Dict:
+    """Backtest one parameter set on [start, end) in a worker process."""
+    frames = _worker_frames
+    if end is not None:
+        frames = {s: df[df.index < end] for s, df in frames.items()}
+    bot = bot_class(list(frames), **params)
+    return _finite(Backtester(**backtester).run(bot, frames, start).stats)
+
+
+def rank_results(results: List[Dict], metric: str = 'sharpe_ratio', top: Optional[int] = None) -> List[Dict]:
+    """
+    Order results best first by one of ``METRICS``.
+    
+    Results without a value for the metric rank last.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric} (expected one of {', '.join(METRICS)})")
+    higher_is_better = METRICS[metric]
+    
+    def key(result: Dict):
+        value = result['stats'].get(metric)
+        if value is None:
+            return (1, 0.0)
+        return (0, -value if higher_is_better else value)
+    
+    ranked = sorted(results, key=key)
+    return ranked[:top] if top else ranked
+
+
+def load_results(path: Optional[str] = None, run_id: Optional[str] = None) -> List[Dict]:
+    """
+    Read results written by ``Optimizer``.
+    
+    Args:
+        path: Results file (defaults to ``settings.optimizer_results_file``)
+        run_id: Only return this run's results
+    """
+    path = path or settings.optimizer_results_file
+    if not os.path.exists(path):
+        return []
+    results = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if run_id is None or record.get('run_id') == run_id:
+                results.append(record)
+    return results
+
+
+class Optimizer:
+    """
+    Backtests a bot over many parameter sets in a process pool.
+    
+    Candles are packed once into a ``SharedCandleBlock``; each worker reads
+    them from shared memory when it starts, so only parameter sets and
+    stats cross process boundaries. Parameters are passed to the bot's
+    constructor (e.g. ``RangeScalperBot(symbols, lookback=24)``), which
+    falls back to the configured defaults for anything not being swept.
+    
+    Every evaluation is appended as a JSON line to the results file,
+    tagged with this optimizer's ``run_id``, for later ranking with
+    ``load_results`` and ``rank_results``.
+    """
+    
+    def __init__(
+        self,
+        bot_class: Type[BaseBot],
+        frames: Dict[str, pd.DataFrame],
+        interval: str = "1h",
+        workers: Optional[int] = None,
+        results_file: Optional[str] = None,
+        **backtester
+    ):
+        """
+        Args:
+            bot_class: Bot to optimize
+            frames: OHLCV history by symbol
+            interval: Bar interval of ``frames``
+            workers: Worker processes (defaults to ``settings.optimizer_workers``,
+                or one per CPU when that is 0)
+            results_file: JSON lines output (defaults to ``settings.optimizer_results_file``)
+            **backtester: ``Backtester`` options (initial_capital, fee_bps, ...)
+        """
+        self.bot_class = bot_class
+        self.frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        self.interval = interval
+        self.workers = workers or settings.optimizer_workers or os.cpu_count() or 1
+        self.results_file = results_file or settings.optimizer_results_file
+        self.backtester = backtester
+        self.run_id = uuid.uuid4().hex[:12]
+        self.bot_id = bot_class([]).bot_id
+        
+        stamps = [df.index for df in self.frames.values()]
+        self.index = stamps[0].append(stamps[1:]).unique().sort_values() if stamps else pd.DatetimeIndex([])
+    
+    def _evaluate_all(self, jobs: List[Tuple[Dict, Optional[pd.Timestamp], Optional[pd.Timestamp]]]) -> List[Dict]:
+        """Run (params, start, end) jobs across the pool, in order."""
+        if not jobs:
+            return []
+        block = SharedCandleBlock.create(self.frames, self.interval)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(jobs)),
+                mp_context=process_context(),
+                initializer=_init_worker,
+                initargs=(block, list(self.frames))
+            ) as pool:
+                futures = [
+                    pool.submit(_evaluate, self.bot_class, params, start, end, self.backtester)
+                    for params, start, end in jobs
+                ]
+                return [f.result() for f in futures]
+        finally:
+            block.unlink()
+    
+    def _record(self, mode: str, params: Dict, stats: Dict, start, end, fold: Optional[int] = None) -> Dict:
+        return {
+            'run_id': self.run_id,
+            'timestamp': datetime.utcnow().isoformat(),
+            'bot_id': self.bot_id,
+            'mode': mode,
+            'fold': fold,
+            'start': pd.Timestamp(start).isoformat() if start is not None else None,
+            'end': pd.Timestamp(end).isoformat() if end is not None else None,
+            'params': params,
+            'stats': stats
+        }
+    
+    def _write(self, records: List[Dict]):
+        directory = os.path.dirname(self.results_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.results_file, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+    
+    def sweep(
+        self,
+        candidates: List[Dict],
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None
+    ) -> List[Dict]:
+        """
+        Backtest every parameter set on one window.
+        
+        Args:
+            candidates: Parameter sets (from ``grid`` or ``random_samples``)
+            start: Only trade from this time on (defaults to the first bar)
+            end: Ignore bars from this time on (defaults to all)
+        
+        Returns:
+            One result record per candidate, in candidate order
+        """
+        stats = self._evaluate_all([(params, start, end) for params in candidates])
+        records = [self._record('sweep', params, s, start, end) for params, s in zip(candidates, stats)]
+        self._write(records)
+        return records
+    
+    def walk_forward(
+        self,
+        candidates: List[Dict],
+        train_bars: int,
+        test_bars: int,
+        metric: str = 'sharpe_ratio',
+        step: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Walk-forward optimization.
+        
+        In each fold every candidate is backtested on the training window,
+        the best one by ``metric`` is then backtested on the following test
+        window. Earlier bars only warm up indicators, so test results are
+        out of sample.
+        
+        Args:
+            candidates: Parameter sets (from ``grid`` or ``random_samples``)
+            train_bars: Bars per training window
+            test_bars: Bars per test window
+            metric: Selection metric (one of ``METRICS``)
+            step: Bars between folds (defaults to ``test_bars``)
+        
+        Returns:
+            Test result records, one per fold; each holds the training
+            stats of its chosen parameters under ``train_stats``
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric} (expected one of {', '.join(METRICS)})")
+        windows = walk_forward_windows(self.index, train_bars, test_bars, step)
+        
+        # All training runs of all folds go to the pool at once
+        jobs = [(params, train_start, test_start) for train_start, test_start, _ in windows for params in candidates]
+        stats = self._evaluate_all(jobs)
+        
+        train_records = []
+        best = []
+        for fold, (train_start, test_start, _) in enumerate(windows):
+            fold_stats = stats[fold * len(candidates):(fold + 1) * len(candidates)]
+            records = [
+                self._record('train', params, s, train_start, test_start, fold)
+                for params, s in zip(candidates, fold_stats)
+            ]
+            train_records.extend(records)
+            best.append(rank_results(records, metric, top=1)[0])
+        
+        test_stats = self._evaluate_all([
+            (chosen['params'], test_start, end)
+            for chosen, (_, test_start, end) in zip(best, windows)
+        ])
+        test_records = []
+        for fold, (chosen, s, (_, test_start, end)) in enumerate(zip(best, test_stats, windows)):
+            record = self._record('test', chosen['params'], s, test_start, end, fold)
+            record['train_stats'] = chosen['stats']
+            test_records.append(record)
+        
+        self._write(train_records + test_records)
+        return test_records
+
+
+def _parse_space(specs: List[str]) -> Dict:
+    """Parse ``name=v1,v2,...`` (values to try) or ``name=low:high`` (range to sample)."""
+    space = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if ':' in values:
+            low, high = (json.loads(v) for v in values.split(':', 1))
+            space[name] = (low, high)
+        else:
+            space[name] = [json.loads(v) for v in values.split(',')]
+    return space
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: ``python -m core.optimizer {run,rank} ...``."""
+    parser = argparse.ArgumentParser(prog="python -m core.optimizer", description=__doc__.strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run = commands.add_parser("run", help="sweep a bot's parameters")
+    run.add_argument("bot_id")
+    run.add_argument("--param", action="append", default=[], help="name=v1,v2,... or name=low:high")
+    run.add_argument("--samples", type=int, default=0, help="random parameter sets instead of the full grid")
+    run.add_argument("--seed", type=int)
+    run.add_argument("--symbols", default=settings.market_symbols)
+    run.add_argument("--period", default="1y")
+    run.add_argument("--interval", default="1h")
+    run.add_argument("--train-bars", type=int, default=0, help="walk-forward training window (0 = single sweep)")
+    run.add_argument("--test-bars", type=int, default=0)
+    run.add_argument("--metric", default="sharpe_ratio", choices=list(METRICS))
+    run.add_argument("--workers", type=int)
+    
+    rank = commands.add_parser("rank", help="rank stored results")
+    rank.add_argument("--metric", default="sharpe_ratio", choices=list(METRICS))
+    rank.add_argument("--run-id")
+    rank.add_argument("--mode", help="sweep, train or test")
+    rank.add_argument("--top", type=int, default=10)
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == "rank":
+        results = load_results(run_id=args.run_id)
+        if args.mode:
+            results = [r for r in results if r['mode'] == args.mode]
+        for r in rank_results(results, args.metric, args.top):
+            print(f"{r['run_id']} {r['bot_id']} {r['mode']} fold={r['fold']} {args.metric}={r['stats'].get(args.metric)} {json.dumps(r['params'])}")
+        return
+    
+    from core.engine import engine
+    bot_classes = {bot.bot_id: type(bot) for bot in engine.bots}
+    if args.bot_id not in bot_classes:
+        parser.error(f"unknown bot {args.bot_id} (expected one of {', '.join(bot_classes)})")
+    
+    space = _parse_space(args.param)
+    candidates = random_samples(space, args.samples, args.seed) if args.samples else grid(space)
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+    frames = load_frames(symbols, period=args.period, interval=args.interval)
+    
+    optimizer = Optimizer(bot_classes[args.bot_id], frames, interval=args.interval, workers=args.workers)
+    if args.train_bars:
+        results = optimizer.walk_forward(candidates, args.train_bars, args.test_bars or args.train_bars // 4, args.metric)
+    else:
+        results = optimizer.sweep(candidates)
+    
+    print(f"Run {optimizer.run_id}: {len(results)} results written to {optimizer.results_file}")
+    for r in rank_results(results, args.metric, 10):
+        print(f"fold={r['fold']} {args.metric}={r['stats'].get(args.metric)} {json.dumps(r['params'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Streaming performance statistics (Sharpe, Sortino, drawdown).
+"""
+import math
+import time
+from collections import deque
+from typing import Dict, Optional
+import numpy as np
+
+
+class RunningMoments:
+    """
+    Welford running mean and variance.
+    
+    Values can also be removed, which turns the estimator into a sliding
+    window when paired with a queue of the values that are in it.
+    """
+    
+    __slots__ = ('count', 'mean', 'm2')
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def add(self, x: float):
+        """Add one observation."""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+    
+    def remove(self, x: float):
+        """Remove an observation that was previously added."""
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        mean = (self.count * self.mean - x) / (self.count - 1)
+        self.m2 = max(self.m2 - (x - self.mean) * (x - mean), 0.0)
+        self.mean = mean
+        self.count -= 1
+    
+    @property
+    def variance(self) -> float:
+        """Population variance (``np.var`` with ddof=0)."""
+        return self.m2 / self.count if self.count else 0.0
+    
+    @property
+    def std(self) -> float:
+        """Population standard deviation."""
+        return math.sqrt(self.variance)
+
+
+def sharpe_ratio(returns: RunningMoments, risk_free_rate: float = 0.0) -> float:
+    """Sharpe ratio of the observed returns (0.0 with fewer than two or no spread)."""
+    if returns.count < 2 or returns.std == 0:
+        return 0.0
+    return (returns.mean - risk_free_rate) / returns.std
+
+
+def sortino_ratio(returns: RunningMoments, downside: RunningMoments, risk_free_rate: float = 0.0) -> float:
+    """
+    Sortino ratio of the observed returns.
+    
+    Args:
+        returns: Moments of all returns
+        downside: Moments of the negative returns only
+        risk_free_rate: Return per observation to subtract from the mean
+    
+    Returns:
+        0.0 with fewer than two returns, inf when none were negative
+    """
+    if returns.count < 2:
+        return 0.0
+    if downside.count == 0:
+        return float('inf')
+    if downside.std == 0:
+        return 0.0
+    return (returns.mean - risk_free_rate) / downside.std
+
+
+class RollingReturns:
+    """
+    Sharpe, Sortino and drawdown over the last ``window`` time buckets.
+    
+    Equity is sampled with ``update``; the last sample in each bucket of
+    ``bucket_seconds`` is that bucket's close. When a bucket closes its
+    return against the previous close enters the window, and the oldest
+    return leaves it once the window is full. Every statistic is updated
+    at bucket close, so reads are constant-time.
+    """
+    
+    def __init__(self, bucket_seconds: float = 3600.0, window: int = 168):
+        self.bucket_seconds = bucket_seconds
+        self.window = window
+        self.returns = RunningMoments()
+        self.downside = RunningMoments()
+        self._returns = deque()
+        self._closes = deque(maxlen=window + 1)
+        self._bucket: Optional[int] = None
+        self._last_equity: Optional[float] = None
+        self.max_drawdown = 0.0
+    
+    def update(self, equity: float, now: Optional[float] = None):
+        """
+        Record an equity sample.
+        
+        Args:
+            equity: Current portfolio value
+            now: Sample time in epoch seconds (defaults to now)
+        """
+        bucket = int((time.time() if now is None else now) // self.bucket_seconds)
+        if self._bucket is not None and bucket > self._bucket:
+            self._close_bucket(self._last_equity)
+        self._bucket = bucket
+        self._last_equity = equity
+    
+    def _close_bucket(self, close: float):
+        if self._closes and self._closes[-1] > 0:
+            r = close / self._closes[-1] - 1
+            self._returns.append(r)
+            self.returns.add(r)
+            if r < 0:
+                self.downside.add(r)
+            
+            if len(self._returns) > self.window:
+                old = self._returns.popleft()
+                self.returns.remove(old)
+                if old < 0:
+                    self.downside.remove(old)
+        self._closes.append(close)
+        
+        # Bounded by the window, not by history
+        closes = np.fromiter(self._closes, dtype=float, count=len(self._closes))
+        peaks = np.maximum.accumulate(closes)
+        self.max_drawdown = float(((peaks - closes) / peaks).max() * 100)
+    
+    def sharpe_ratio(self, risk_free_rate: float = 0.0) -> float:
+        """Sharpe ratio of bucket returns in the window (per bucket, not annualized)."""
+        return sharpe_ratio(self.returns, risk_free_rate)
+    
+    def sortino_ratio(self, risk_free_rate: float = 0.0) -> float:
+        """Sortino ratio of bucket returns in the window (per bucket, not annualized)."""
+        return sortino_ratio(self.returns, self.downside, risk_free_rate)
+    
+    def get_stats(self) -> Dict:
+        """Get the window's statistics."""
+        sortino = self.sortino_ratio()
+        return {
+            'bucket_seconds': self.bucket_seconds,
+            'buckets': self.returns.count,
+            'mean_return': self.returns.mean,
+            'volatility': self.returns.std,
+            'sharpe_ratio': self.sharpe_ratio(),
+            # JSON has no infinity (no losing bucket yet)
+            'sortino_ratio': sortino if math.isfinite(sortino) else None,
+            'max_drawdown': self.max_drawdown
+        }
@@ -1,23 +1,47 @@
 """
 Portfolio management system for tracking positions, P&L, and metrics.
 """
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 from datetime import datetime
+from functools import wraps
+import threading
+from sqlalchemy import func
 from models.position import Position
 from models.trade import Trade, TradeDirection, TradeStatus
+from models.portfolio_snapshot import PortfolioSnapshot
 from models.database import SessionLocal
+from core.trade_ledger import TradeLedger
+from core.performance import RunningMoments, RollingReturns, sharpe_ratio, sortino_ratio
 from config.settings import settings
+from utils.metrics import trades_total
 import numpy as np
 
 
+def synchronized(method):
+    """Serialize access to portfolio state across engine worker threads."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Portfolio:
-    """Manages portfolio positions, capital, and performance metrics."""
+    """
+    Manages portfolio positions, capital, and performance metrics.
+    
+    Market value and trade statistics are kept as running totals that are
+    adjusted in place on open, close and price updates, so value, exposure,
+    win rate and the Sharpe/Sortino inputs are constant-time reads. With
+    ``settings.portfolio_consistency_check`` on, every mutation is followed
+    by a full recompute that reports and repairs any drift.
+    """
     
     def __init__(self, initial_capital: float = None):
         self.initial_capital = initial_capital or settings.initial_capital
         self.cash = self.initial_capital
         self.positions: Dict[str, Position] = {}
-        self.closed_trades: List[Trade] = []
+        self.trades = TradeLedger(settings.trade_ledger_window)
         
         # Performance tracking
         self.total_pnl = 0.0
@@ -25,24 +49,118 @@ class Portfolio:
         self.peak_value = self.initial_capital
         self.max_drawdown = 0.0
         
+        # Running totals (see verify_totals)
+        self._positions_value = 0.0
+        self._winning_trades = 0
+        self._returns = RunningMoments()
+        self._downside = RunningMoments()
+        
+        # Equity statistics over recent time buckets
+        self.rolling = RollingReturns(settings.stats_bucket_seconds, settings.stats_window_buckets)
+        
+        self._lock = threading.RLock()
+    
+    def _position_arrays(self) -> tuple:
+        """Get (positions, quantities, entry prices, current prices) as aligned arrays."""
+        positions = list(self.positions.values())
+        n = len(positions)
+        quantity = np.fromiter((p.quantity for p in positions), dtype=float, count=n)
+        entry = np.fromiter((p.entry_price for p in positions), dtype=float, count=n)
+        current = np.fromiter((p.current_price for p in positions), dtype=float, count=n)
+        return positions, quantity, entry, current
+    
+    def _record_trade(self, pnl: float):
+        """Add a closed trade's return to the running trade statistics."""
+        r = pnl / self.initial_capital
+        if pnl > 0:
+            self._winning_trades += 1
+        self._returns.add(r)
+        if r < 0:
+            self._downside.add(r)
+    
+    def _totals(self) -> Dict[str, float]:
+        """Get the running totals."""
+        return {
+            'positions_value': self._positions_value,
+            'trade_count': self._returns.count,
+            'winning_trades': self._winning_trades,
+            'return_mean': self._returns.mean,
+            'return_variance': self._returns.variance,
+            'downside_count': self._downside.count,
+            'downside_mean': self._downside.mean,
+            'downside_variance': self._downside.variance
+        }
+    
+    def _recompute_totals(self) -> Dict[str, float]:
+        """Recompute every running total from positions and closed trades."""
+        _, quantity, _, current = self._position_arrays()
+        returns = self.trades.all_pnl() / self.initial_capital
+        downside = returns[returns < 0]
+        return {
+            'positions_value': float(quantity @ current),
+            'trade_count': len(returns),
+            'winning_trades': int((returns > 0).sum()),
+            'return_mean': float(returns.mean()) if len(returns) else 0.0,
+            'return_variance': float(returns.var()) if len(returns) else 0.0,
+            'downside_count': len(downside),
+            'downside_mean': float(downside.mean()) if len(downside) else 0.0,
+            'downside_variance': float(downside.var()) if len(downside) else 0.0
+        }
+    
+    def _rebuild_totals(self):
+        """Rebuild the running totals from positions and closed trades."""
+        _, quantity, _, current = self._position_arrays()
+        self._positions_value = float(quantity @ current)
+        self._winning_trades = 0
+        self._returns = RunningMoments()
+        self._downside = RunningMoments()
+        for pnl in self.trades.all_pnl():
+            self._record_trade(float(pnl))
+    
+    @synchronized
+    def verify_totals(self) -> bool:
+        """
+        Check the running totals against a full recompute.
+        
+        Mismatches are reported and the totals are rebuilt from scratch.
+        
+        Returns:
+            True if every total matched
+        """
+        running = self._totals()
+        drifted = [
+            (name, running[name], expected)
+            for name, expected in self._recompute_totals().items()
+            if not np.isclose(running[name], expected, rtol=1e-9, atol=1e-9)
+        ]
+        for name, actual, expected in drifted:
+            print(f"Portfolio total {name} drifted: running {actual}, recomputed {expected}")
+        if drifted:
+            self._rebuild_totals()
+        return not drifted
+    
+    def _check_totals(self):
+        if settings.portfolio_consistency_check:
+            self.verify_totals()
+    
+    @synchronized
+    def get_positions_value(self) -> float:
+        """Get the market value of all open positions."""
+        return self._positions_value
+    
+    @synchronized
     def get_portfolio_value(self) -> float:
         """Calculate total portfolio value (cash + positions)."""
-        positions_value = sum(
-            pos.quantity * pos.current_price 
-            for pos in self.positions.values()
-        )
-        return self.cash + positions_value
+        return self.cash + self.get_positions_value()
     
+    @synchronized
     def get_total_exposure(self) -> float:
         """Get total portfolio exposure as percentage."""
-        portfolio_value = self.get_portfolio_value()
+        positions_value = self.get_positions_value()
+        portfolio_value = self.cash + positions_value
         if portfolio_value == 0:
             return 0.0
         
-        positions_value = sum(
-            pos.quantity * pos.current_price 
-            for pos in self.positions.values()
-        )
         return (positions_value / portfolio_value) * 100
     
     def can_open_position(self, symbol: str, quantity: float, price: float) -> tuple[bool, str]:
@@ -77,6 +195,7 @@ class Portfolio:
         
         return True, "OK"
     
+    @synchronized
     def open_position(
         self,
         symbol: str,
@@ -106,6 +225,7 @@ class Portfolio:
         
         # Store position
         self.positions[symbol] = position
+        self._positions_value += quantity * price
         
         # Save to database
         db = SessionLocal()
@@ -116,8 +236,11 @@ class Portfolio:
         finally:
             db.close()
         
+        trades_total.inc(bot=bot_id or "none", action="open")
+        self._check_totals()
         return position
     
+    @synchronized
     def close_position(
         self,
         symbol: str,
@@ -153,10 +276,11 @@ class Portfolio:
         
         # Update totals
         self.total_pnl += pnl
-        self.closed_trades.append(trade)
+        self._record_trade(pnl)
         
         # Remove position
         del self.positions[symbol]
+        self._positions_value -= position.quantity * position.current_price
         
         # Save to database
         db = SessionLocal()
@@ -166,71 +290,181 @@ class Portfolio:
             # Add trade
             db.add(trade)
             db.commit()
+            db.refresh(trade)
         finally:
             db.close()
         
+        # Keep a compact copy in memory
+        self.trades.add_trade(trade)
+        
+        trades_total.inc(bot=position.bot_id or "none", action="close")
+        self._check_totals()
         return trade
     
+    @synchronized
     def update_positions(self, prices: Dict[str, float]):
-        """Update all positions with current prices."""
-        for symbol, position in self.positions.items():
-            if symbol in prices:
-                position.update_pnl(prices[symbol])
+        """
+        Mark all positions to market in one vectorized pass.
+        
+        Args:
+            prices: Dict mapping symbol to current price; positions whose
+                symbol is missing, or whose price is not a positive finite
+                number, keep their previous price
+        """
+        positions, quantity, entry, current = self._position_arrays()
+        if positions:
+            quoted = np.fromiter(
+                (prices.get(p.symbol, np.nan) for p in positions),
+                dtype=float,
+                count=len(positions)
+            )
+            valid = np.isfinite(quoted) & (quoted > 0)
+            marked = np.where(valid, quoted, current)
+            self._positions_value += float(quantity @ (marked - current))
+            current = marked
+            pnl = (current - entry) * quantity
+            pnl_pct = (current - entry) / entry * 100
+            
+            now = datetime.utcnow()
+            for i in np.flatnonzero(valid):
+                position = positions[i]
+                position.current_price = float(current[i])
+                position.unrealized_pnl = float(pnl[i])
+                position.unrealized_pnl_pct = float(pnl_pct[i])
+                position.updated_at = now
         
         # Update drawdown
-        current_value = self.get_portfolio_value()
+        current_value = self.cash + self._positions_value
+        self.rolling.update(current_value)
         if current_value > self.peak_value:
             self.peak_value = current_value
         
         drawdown = ((self.peak_value - current_value) / self.peak_value) * 100
         if drawdown > self.max_drawdown:
             self.max_drawdown = drawdown
+        
+        self._check_totals()
     
-    def calculate_sharpe_ratio(self, risk_free_rate: float = 0.02) -> float:
-        """Calculate Sharpe ratio from closed trades."""
-        if not self.closed_trades:
-            return 0.0
+    @synchronized
+    def save_snapshot(self) -> PortfolioSnapshot:
+        """
+        Persist the portfolio aggregates and position marks for ``restore``.
         
-        returns = [trade.realized_pnl / self.initial_capital for trade in self.closed_trades]
-        if len(returns) < 2:
-            return 0.0
+        Only the latest snapshot is kept. ``update_positions`` marks
+        positions in memory only; their current prices and unrealized P&L
+        are written here, in the same transaction.
+        """
+        snapshot = PortfolioSnapshot(
+            last_trade_id=self.trades.last_id,
+            total_pnl=self.total_pnl,
+            peak_value=self.peak_value,
+            max_drawdown=self.max_drawdown,
+            winning_trades=self._winning_trades,
+            return_count=self._returns.count,
+            return_mean=self._returns.mean,
+            return_m2=self._returns.m2,
+            downside_count=self._downside.count,
+            downside_mean=self._downside.mean,
+            downside_m2=self._downside.m2
+        )
         
-        avg_return = np.mean(returns)
-        std_return = np.std(returns)
+        marks = [
+            {
+                'id': p.id,
+                'current_price': p.current_price,
+                'unrealized_pnl': p.unrealized_pnl,
+                'unrealized_pnl_pct': p.unrealized_pnl_pct,
+                'updated_at': p.updated_at
+            }
+            for p in self.positions.values()
+        ]
         
-        if std_return == 0:
-            return 0.0
+        db = SessionLocal()
+        try:
+            db.bulk_update_mappings(Position, marks)
+            db.add(snapshot)
+            db.flush()
+            db.query(PortfolioSnapshot).filter(PortfolioSnapshot.id < snapshot.id).delete()
+            db.commit()
+            db.refresh(snapshot)
+        finally:
+            db.close()
         
-        return (avg_return - risk_free_rate) / std_return
+        return snapshot
     
-    def calculate_sortino_ratio(self, risk_free_rate: float = 0.02) -> float:
-        """Calculate Sortino ratio (downside deviation only)."""
-        if not self.closed_trades:
-            return 0.0
-        
-        returns = [trade.realized_pnl / self.initial_capital for trade in self.closed_trades]
-        if len(returns) < 2:
-            return 0.0
-        
-        avg_return = np.mean(returns)
-        downside_returns = [r for r in returns if r < 0]
+    @synchronized
+    def restore(self):
+        """
+        Rebuild the portfolio from the database after a restart.
         
-        if not downside_returns:
-            return float('inf')
+        Aggregates come from the latest snapshot, and only trades closed
+        after it are replayed, so startup cost doesn't grow with history.
+        Open positions are loaded with the marks of that snapshot, and cash
+        follows from realized P&L and the capital tied up in them.
         
-        downside_std = np.std(downside_returns)
-        if downside_std == 0:
-            return 0.0
+        Peak value and max drawdown resume from the snapshot and move again
+        with the first ``update_positions``; nothing here revalues them, so
+        a restart can't raise the drawdown the risk manager sees. ``rolling``
+        is not persisted and restarts empty.
+        """
+        db = SessionLocal()
+        try:
+            snapshot = db.query(PortfolioSnapshot).order_by(PortfolioSnapshot.id.desc()).first()
+            since = snapshot.last_trade_id if snapshot else 0
+            replay = db.query(Trade.realized_pnl).filter(Trade.id > since).order_by(Trade.id).all()
+            recent = db.query(Trade).order_by(Trade.id.desc()).limit(self.trades.capacity).all()
+            first_id = db.query(func.min(Trade.id)).scalar()
+            positions = db.query(Position).all()
+        finally:
+            db.close()
         
-        return (avg_return - risk_free_rate) / downside_std
+        self._winning_trades = 0
+        self._returns = RunningMoments()
+        self._downside = RunningMoments()
+        self.total_pnl = 0.0
+        if snapshot:
+            self._winning_trades = snapshot.winning_trades
+            self._returns.count, self._returns.mean, self._returns.m2 = (
+                snapshot.return_count, snapshot.return_mean, snapshot.return_m2)
+            self._downside.count, self._downside.mean, self._downside.m2 = (
+                snapshot.downside_count, snapshot.downside_mean, snapshot.downside_m2)
+            self.total_pnl = snapshot.total_pnl
+            self.peak_value = snapshot.peak_value
+            self.max_drawdown = snapshot.max_drawdown
+        
+        for (pnl,) in replay:
+            pnl = pnl or 0.0
+            self.total_pnl += pnl
+            self._record_trade(pnl)
+        
+        self.trades.restore(recent[::-1], self._returns.count, first_id)
+        self.positions = {p.symbol: p for p in positions}
+        _, quantity, entry, current = self._position_arrays()
+        self._positions_value = float(quantity @ current)
+        self.cash = self.initial_capital + self.total_pnl - float(quantity @ entry)
+        
+        print(
+            f"Portfolio restored: {len(self.positions)} positions, {self._returns.count} trades "
+            f"({len(replay)} replayed since snapshot), cash ${self.cash:,.2f}"
+        )
+        self._check_totals()
+    
+    @synchronized
+    def calculate_sharpe_ratio(self, risk_free_rate: float = 0.02) -> float:
+        """Calculate Sharpe ratio from closed trades."""
+        return sharpe_ratio(self._returns, risk_free_rate)
+    
+    @synchronized
+    def calculate_sortino_ratio(self, risk_free_rate: float = 0.02) -> float:
+        """Calculate Sortino ratio (downside deviation only)."""
+        return sortino_ratio(self._returns, self._downside, risk_free_rate)
     
     def get_win_rate(self) -> float:
         """Calculate win rate from closed trades."""
-        if not self.closed_trades:
+        if self._returns.count == 0:
             return 0.0
         
-        winning_trades = sum(1 for trade in self.closed_trades if trade.realized_pnl > 0)
-        return (winning_trades / len(self.closed_trades)) * 100
+        return (self._winning_trades / self._returns.count) * 100
     
     def get_stats(self) -> Dict:
         """Get portfolio statistics."""
@@ -243,9 +477,11 @@ class Portfolio:
             'sharpe_ratio': self.calculate_sharpe_ratio(),
             'sortino_ratio': self.calculate_sortino_ratio(),
             'win_rate': self.get_win_rate(),
-            'total_trades': len(self.closed_trades),
+            'total_trades': self._returns.count,
             'open_positions': len(self.positions),
-            'exposure_pct': self.get_total_exposure()
+            'exposure_pct': self.get_total_exposure(),
+            'rolling': self.rolling.get_stats(),
+            'ledger': self.trades.get_stats()
         }
 
 
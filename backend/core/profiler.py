@@ -0,0 +1,314 @@
+"""
+On-demand stack sampling profiler for engine ticks.
+
+Armed through the admin API for the next N ticks. While a tick runs, a
+background thread samples every thread's Python stack; when the last tick
+finishes it writes a collapsed-stack file (``flamegraph.pl``/speedscope
+format) and a JSON hotspot summary. Time spent in scanners and bots is
+attributed to the scanner or bot and the symbol it was processing when
+sampled. Panel scanners analyze the whole universe in one vectorized pass,
+so their time is attributed per scanner only, under the symbol ``(panel)``.
+
+Disarmed, the only cost is the engine checking ``profiler.armed`` once per
+tick. Work done in worker processes (``ENGINE_EXECUTOR=process`` or
+``ENGINE_SHARDS``) is not visible to the sampler; it shows up as the
+parent waiting on the pool.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from config.settings import settings
+from scanners.base_scanner import BaseScanner
+from bots.base_bot import BaseBot
+
+
+# Backend root, for short file names in frame labels
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Leaf frames of threads that are parked rather than working
+IDLE_LEAVES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker')
+}
+
+# Methods whose frames attribute a sample to a scanner or bot
+OWNER_METHODS = {'scan', 'evaluate', 'analyze', 'analyze_panel', 'execute', 'decide_cached'}
+
+# Symbol recorded for time spent in a scanner's vectorized panel pass
+PANEL_SYMBOL = '(panel)'
+
+
+def _thread_label(name: str) -> str:
+    # Pool threads differ only by number; merge them in the flame graph
+    return re.sub(r'[_-]\d+$', '', name)
+
+
+class SamplingProfiler:
+    """Samples Python stacks of all threads while armed engine ticks run."""
+    
+    def __init__(self):
+        self.ticks_remaining = 0
+        self.interval = settings.profiler_sample_interval
+        self.top = settings.profiler_top
+        self.last_report: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._sampling = threading.Event()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+        self._reset()
+    
+    def _reset(self):
+        self._stacks: Counter = Counter()
+        self._attribution: Counter = Counter()
+        self._ticks: List[Dict] = []
+        self._tick_started = 0.0
+        self._tick_samples = 0
+        self._samples = 0
+        self._started_at: Optional[datetime] = None
+    
+    @property
+    def armed(self) -> bool:
+        return self.ticks_remaining > 0
+    
+    def arm(self, ticks: int, interval: Optional[float] = None, top: Optional[int] = None) -> Dict:
+        """
+        Profile the next ``ticks`` engine ticks.
+        
+        Args:
+            ticks: Number of ticks to sample (1 to ``PROFILER_MAX_TICKS``)
+            interval: Seconds between samples (default ``PROFILER_SAMPLE_INTERVAL``)
+            top: Entries per hotspot list (default ``PROFILER_TOP``)
+        
+        Returns:
+            Profiler status
+        
+        Raises:
+            ValueError: If already armed or an argument is out of range
+        """
+        if not 1 <= ticks <= settings.profiler_max_ticks:
+            raise ValueError(f"ticks must be between 1 and {settings.profiler_max_ticks}")
+        if interval is not None and interval <= 0:
+            raise ValueError("interval must be positive")
+        if top is not None and top < 1:
+            raise ValueError("top must be at least 1")
+        
+        with self._lock:
+            if self.armed:
+                raise ValueError("Profiler is already armed")
+            self._reset()
+            self.interval = interval or settings.profiler_sample_interval
+            self.top = top or settings.profiler_top
+            self.ticks_remaining = ticks
+        return self.get_status()
+    
+    def disarm(self) -> Dict:
+        """Cancel an armed profile without writing a report."""
+        with self._lock:
+            self.ticks_remaining = 0
+        self._stop_sampler()
+        self._reset()
+        return self.get_status()
+    
+    def tick_started(self):
+        """Start sampling; called by the engine when ``armed``."""
+        if self._thread is None:
+            self._stop = False
+            self._started_at = datetime.utcnow()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+        self._tick_samples = self._samples
+        self._tick_started = time.perf_counter()
+        self._sampling.set()
+    
+    def tick_finished(self):
+        """Pause sampling, and write the report after the last armed tick."""
+        self._sampling.clear()
+        if self._thread is None:
+            return
+        self._ticks.append({
+            'seconds': time.perf_counter() - self._tick_started,
+            'samples': self._samples - self._tick_samples
+        })
+        
+        with self._lock:
+            self.ticks_remaining = max(0, self.ticks_remaining - 1)
+            done = self.ticks_remaining == 0
+        if done:
+            self._stop_sampler()
+            try:
+                self.last_report = self._write_report()
+                print(f"Profile written to {self.last_report['collapsed_file']}")
+            except Exception as e:
+                print(f"Error writing profile: {e}")
+            self._reset()
+    
+    def _stop_sampler(self):
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop = True
+        self._sampling.set()
+        thread.join()
+        self._sampling.clear()
+        self._thread = None
+    
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            self._sampling.wait()
+            if self._stop:
+                return
+            self._sample(own)
+            time.sleep(self.interval)
+    
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(ROOT):
+                filename = os.path.relpath(filename, ROOT)
+            else:
+                filename = os.path.join(*filename.split(os.sep)[-2:])
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self._labels[code] = f"{name} ({filename})"
+        return label
+    
+    def _owner(self, frame) -> Optional[Tuple[str, str, str]]:
+        """(kind, id, symbol) for frames of scanner and bot methods."""
+        name = frame.f_code.co_name
+        if name not in OWNER_METHODS:
+            return None
+        local = frame.f_locals
+        owner = local.get('self')
+        if isinstance(owner, BaseScanner) and name in ('scan', 'evaluate', 'analyze', 'analyze_panel'):
+            # Panel work covers every symbol at once and cannot be split per symbol
+            if name == 'analyze_panel':
+                return 'scanner', owner.scanner_id, PANEL_SYMBOL
+            symbol = local.get('symbol') or (PANEL_SYMBOL if name == 'evaluate' else '(record)')
+            return 'scanner', owner.scanner_id, symbol
+        if isinstance(owner, BaseBot) and name in ('evaluate', 'execute', 'decide_cached'):
+            return 'bot', owner.bot_id, local.get('symbol') or '(all)'
+        return None
+    
+    def _sample(self, own: int):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            leaf = frame.f_code
+            if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+                continue
+            
+            stack = []
+            owner = None
+            while frame is not None:
+                if owner is None:
+                    owner = self._owner(frame)
+                    if owner is not None:
+                        stack.append(f"[{owner[0]} {owner[1]} {owner[2]}]")
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(_thread_label(names.get(ident, str(ident))))
+            stack.reverse()
+            
+            self._stacks[tuple(stack)] += 1
+            if owner is not None:
+                self._attribution[owner] += 1
+            self._samples += 1
+    
+    def _summary(self) -> Dict:
+        total = max(1, self._samples)
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self._stacks.items():
+            self_counts[stack[-1]] += count
+            for label in set(stack[1:]):
+                if not label.startswith('['):
+                    total_counts[label] += count
+        
+        def row(name: str) -> Dict:
+            return {
+                'function': name,
+                'self_samples': self_counts[name],
+                'self_pct': self_counts[name] / total * 100,
+                'total_samples': total_counts[name],
+                'total_pct': total_counts[name] / total * 100
+            }
+        
+        components: Dict[Tuple[str, str], Counter] = {}
+        for (kind, owner, symbol), count in self._attribution.items():
+            components.setdefault((kind, owner), Counter())[symbol] += count
+        attribution = [
+            {
+                'kind': kind,
+                'id': owner,
+                'samples': sum(symbols.values()),
+                'est_seconds': sum(symbols.values()) * self.interval,
+                'symbols': [
+                    {'symbol': s, 'samples': c, 'est_seconds': c * self.interval}
+                    for s, c in symbols.most_common(self.top)
+                ]
+            }
+            for (kind, owner), symbols in components.items()
+        ]
+        attribution.sort(key=lambda c: c['samples'], reverse=True)
+        
+        return {
+            'started': self._started_at.isoformat() if self._started_at else None,
+            'interval': self.interval,
+            'samples': self._samples,
+            'ticks': self._ticks,
+            'executor': settings.engine_executor,
+            'shards': settings.engine_shards,
+            'self_hotspots': [row(name) for name, _ in self_counts.most_common(self.top)],
+            'total_hotspots': [row(name) for name, _ in total_counts.most_common(self.top)],
+            'attribution': attribution[:self.top],
+            'attribution_note': (
+                "Panel scanners are attributed per scanner only; their vectorized "
+                f"pass is reported under the symbol {PANEL_SYMBOL}"
+            )
+        }
+    
+    def _write_report(self) -> Dict:
+        os.makedirs(settings.profiler_output_dir, exist_ok=True)
+        stamp = (self._started_at or datetime.utcnow()).strftime('%Y%m%dT%H%M%S')
+        base = os.path.join(settings.profiler_output_dir, f"profile-{stamp}")
+        
+        with open(f"{base}.collapsed", 'w') as f:
+            for stack, count in self._stacks.most_common():
+                # Semicolons separate frames in the collapsed format
+                f.write(";".join(label.replace(';', ',') for label in stack) + f" {count}\n")
+        
+        report = {
+            **self._summary(),
+            'collapsed_file': f"{base}.collapsed",
+            'summary_file': f"{base}.json"
+        }
+        with open(f"{base}.json", 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+    
+    def get_status(self) -> Dict:
+        """Get arm state and where the last report was written."""
+        return {
+            'armed': self.armed,
+            'ticks_remaining': self.ticks_remaining,
+            'ticks_profiled': len(self._ticks),
+            'samples': self._samples,
+            'interval': self.interval,
+            'last_report': self.last_report['summary_file'] if self.last_report else None
+        }
+
+
+# Global profiler instance
+profiler = SamplingProfiler()
@@ -0,0 +1,171 @@
+"""
+Sharded evaluation of the symbol universe in worker processes.
+"""
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+from utils.candle_store import CANDLE_DTYPE, OHLCV_COLUMNS, to_records
+from utils.panel import Panel
+from core.bar_tracker import bar_tracker
+
+
+class SharedCandleBlock:
+    """
+    Candles for the whole universe packed into one shared memory segment.
+    
+    The parent writes every symbol's bars as ``CANDLE_DTYPE`` records back
+    to back and sends workers only this small descriptor (segment name and
+    each symbol's record span). Workers attach and read their own shard's
+    symbols straight from the shared buffer instead of unpickling frames.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        length: int,
+        spans: Dict[str, Tuple[int, int, Optional[str]]],
+        interval: str
+    ):
+        self.name = name
+        self.length = length
+        self.spans = spans  # symbol -> (start, stop, tz)
+        self.interval = interval
+        self._shm: Optional[shared_memory.SharedMemory] = None
+    
+    @classmethod
+    def create(cls, frames: Dict[str, pd.DataFrame], interval: str) -> "SharedCandleBlock":
+        """
+        Copy OHLCV frames into a new shared memory segment.
+        
+        The caller owns the segment and must ``unlink`` it once workers are done.
+        """
+        records = {}
+        spans = {}
+        offset = 0
+        for symbol, df in frames.items():
+            data = to_records(df)
+            if len(data) == 0:
+                continue
+            records[symbol] = data
+            tz = getattr(df.index, 'tz', None)
+            spans[symbol] = (offset, offset + len(data), str(tz) if tz is not None else None)
+            offset += len(data)
+        
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1) * CANDLE_DTYPE.itemsize)
+        buffer = np.ndarray(offset, dtype=CANDLE_DTYPE, buffer=shm.buf)
+        for symbol, data in records.items():
+            start, stop, _ = spans[symbol]
+            buffer[start:stop] = data
+        del buffer
+        
+        block = cls(shm.name, offset, spans, interval)
+        block._shm = shm
+        return block
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_shm'] = None
+        return state
+    
+    def read(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Read symbols' bars back as OHLCV DataFrames.
+        
+        Returns:
+            Dict mapping symbol to DataFrame for symbols present in the block
+        """
+        shm = self._shm or shared_memory.SharedMemory(name=self.name)
+        try:
+            buffer = np.ndarray(self.length, dtype=CANDLE_DTYPE, buffer=shm.buf)
+            frames = {}
+            for symbol in symbols:
+                if symbol not in self.spans:
+                    continue
+                start, stop, tz = self.spans[symbol]
+                chunk = np.array(buffer[start:stop])
+                
+                index = pd.to_datetime(chunk['ts'], unit='ns', utc=True)
+                if tz is not None:
+                    index = index.tz_convert(tz)
+                df = pd.DataFrame({col: chunk[col] for col in OHLCV_COLUMNS}, index=index)
+                df.attrs.update(symbol=symbol, interval=self.interval)
+                frames[symbol] = df
+            del buffer
+        finally:
+            if shm is not self._shm:
+                shm.close()
+        return frames
+    
+    def unlink(self):
+        """Release the segment (owner only)."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def shard_symbols(symbols: List[str], shards: int) -> List[List[str]]:
+    """
+    Split symbols into interleaved shards of near-equal size.
+    
+    Returns:
+        Non-empty shards, at most ``shards`` of them
+    """
+    shards = max(1, min(shards, len(symbols)))
+    return [symbols[i::shards] for i in range(shards) if symbols[i::shards]]
+
+
+def evaluate_shard(
+    block: SharedCandleBlock,
+    symbols: List[str],
+    scanners: List,
+    bots: List,
+    entry_prices: Dict[str, float],
+    bar_entries: Optional[Dict] = None
+) -> Dict[str, Dict]:
+    """
+    Run scanners and bots over one shard in a worker process.
+    
+    Nothing is written here: scanners return signal dicts and bots return
+    order intents, which the parent records and applies as the single
+    writer of signals, portfolio and risk state.
+    
+    Args:
+        block: Shared candles for the universe
+        symbols: Symbols in this shard
+        scanners: Scanner instances to evaluate
+        bots: Bot instances to evaluate
+        entry_prices: Entry price of each open position by symbol
+        bar_entries: The parent's processed bars for these scanners, bots
+            and symbols (``BarTracker.export_entries``)
+    
+    Returns:
+        {'signals': {scanner_id: {symbol: signal dict}},
+         'intents': {bot_id: [order intent, ...]},
+         'bar_counts': evaluated/skipped counts for the parent's bar tracker,
+         'bar_entries': processed bars after this tick, for the parent}
+    """
+    # Pool workers are picked arbitrarily, so processed bars live in the
+    # parent and travel with each task
+    bar_tracker.end_tick()
+    bar_tracker.import_entries(bar_entries or {}, replace=True)
+    frames = block.read(symbols)
+    
+    panel = None
+    if any(s.supports_panel for s in scanners):
+        panel = Panel.from_frames(frames)
+    
+    return {
+        'signals': {
+            s.scanner_id: s.evaluate(symbols=symbols, panel=panel, frames=frames)
+            for s in scanners
+        },
+        'intents': {
+            b.bot_id: b.evaluate(frames, entry_prices)
+            for b in bots
+        },
+        'bar_counts': bar_tracker.end_tick(),
+        'bar_entries': bar_tracker.export_entries(
+            [s.scanner_id for s in scanners] + [b.bot_id for b in bots], symbols)
+    }
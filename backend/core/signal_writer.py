@@ -0,0 +1,87 @@
+"""
+Write-behind buffer for persisting scanner signals in bulk.
+"""
+import threading
+from typing import Dict, List
+from models.signal import Signal
+from models.database import SessionLocal
+
+
+class SignalWriter:
+    """
+    Buffers signals and writes them with one bulk insert per flush.
+    
+    Scanners add signals as they find them and the engine flushes once per
+    tick (and on shutdown), so a tick costs one SQLite transaction instead
+    of one per signal. A flush is all-or-nothing: on failure the batch is
+    rolled back and stays at the head of the buffer to be retried on the
+    next flush, so rows are neither lost nor written twice.
+    """
+    
+    COLUMNS = (
+        'timestamp', 'scanner_id', 'scanner_name', 'symbol', 'signal_type',
+        'confidence', 'price', 'indicators', 'condition'
+    )
+    
+    def __init__(self):
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.rows_written = 0
+        self.failed_flushes = 0
+    
+    def add(self, signals: List[Signal]):
+        """Queue signals for the next flush."""
+        rows = [{col: getattr(sig, col) for col in self.COLUMNS} for sig in signals]
+        with self._lock:
+            self._pending.extend(rows)
+    
+    def pending(self) -> int:
+        """Number of rows waiting to be written."""
+        with self._lock:
+            return len(self._pending)
+    
+    def flush(self) -> int:
+        """
+        Write all buffered signals in a single transaction.
+        
+        Returns:
+            Number of rows written (0 if the buffer was empty or the write failed)
+        """
+        # One flush at a time, so a retried batch can't be written twice
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = []
+            
+            if not batch:
+                return 0
+            
+            db = SessionLocal()
+            try:
+                db.bulk_insert_mappings(Signal, batch)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.failed_flushes += 1
+                print(f"Error writing {len(batch)} signals, will retry: {e}")
+                with self._lock:
+                    self._pending = batch + self._pending
+                return 0
+            finally:
+                db.close()
+            
+            self.rows_written += len(batch)
+            return len(batch)
+    
+    def get_stats(self) -> Dict:
+        """Get writer statistics."""
+        return {
+            'pending': self.pending(),
+            'rows_written': self.rows_written,
+            'failed_flushes': self.failed_flushes
+        }
+
+
+# Global signal writer instance
+signal_writer = SignalWriter()
@@ -0,0 +1,189 @@
+"""
+Compact in-memory ledger of closed trades.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from models.database import SessionLocal
+from models.trade import Trade
+
+
+class TradeLedger:
+    """
+    Columnar ring buffer of the most recent closed trades.
+    
+    Each trade is a row across preallocated NumPy columns (pnl, quantity,
+    prices, close time and trades-table id), with symbols and bot ids
+    interned to small integers, so a trade costs 56 bytes instead of a
+    full ORM object. Every trade is already written to the ``trades``
+    table when it closes; once more than ``capacity`` trades have been
+    recorded the oldest rows are overwritten and remain in the database
+    only.
+    """
+    
+    def __init__(self, capacity: int = 10000):
+        self.capacity = max(1, capacity)
+        self.pnl = np.zeros(self.capacity, dtype=np.float64)
+        self.quantity = np.zeros(self.capacity, dtype=np.float64)
+        self.entry_price = np.zeros(self.capacity, dtype=np.float64)
+        self.exit_price = np.zeros(self.capacity, dtype=np.float64)
+        self.closed_at = np.zeros(self.capacity, dtype='datetime64[us]')
+        self.trade_id = np.zeros(self.capacity, dtype=np.int64)
+        self.symbol = np.zeros(self.capacity, dtype=np.int32)
+        self.bot = np.zeros(self.capacity, dtype=np.int32)  # -1 for no bot
+        
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._next = 0
+        self.total = 0
+        self.first_id: Optional[int] = None
+    
+    def _intern(self, name: Optional[str]) -> int:
+        if name is None:
+            return -1
+        index = self._ids.get(name)
+        if index is None:
+            index = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return index
+    
+    def _name(self, index: int) -> Optional[str]:
+        return self._names[index] if index >= 0 else None
+    
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+    
+    @property
+    def evicted(self) -> int:
+        """Number of trades that only remain in the database."""
+        return self.total - len(self)
+    
+    def append(
+        self,
+        symbol: str,
+        quantity: float,
+        entry_price: float,
+        exit_price: float,
+        pnl: float,
+        bot_id: Optional[str] = None,
+        trade_id: int = 0,
+        closed_at: Optional[datetime] = None
+    ):
+        """Record a closed trade, overwriting the oldest one when full."""
+        i = self._next
+        self.pnl[i] = pnl
+        self.quantity[i] = quantity
+        self.entry_price[i] = entry_price
+        self.exit_price[i] = exit_price
+        self.closed_at[i] = np.datetime64(closed_at or datetime.utcnow(), 'us')
+        self.trade_id[i] = trade_id
+        self.symbol[i] = self._intern(symbol)
+        self.bot[i] = self._intern(bot_id)
+        
+        if self.first_id is None:
+            self.first_id = trade_id
+        self._next = (i + 1) % self.capacity
+        self.total += 1
+    
+    def add_trade(self, trade: Trade):
+        """Record a committed ``Trade`` row."""
+        self.append(
+            trade.symbol,
+            trade.quantity,
+            trade.entry_price,
+            trade.exit_price,
+            trade.realized_pnl,
+            bot_id=trade.bot_id,
+            trade_id=trade.id or 0,
+            closed_at=trade.timestamp
+        )
+    
+    def restore(self, trades: List[Trade], total: int, first_id: Optional[int]):
+        """
+        Refill the ledger after a restart.
+        
+        Args:
+            trades: Most recent committed trades, oldest first
+            total: Number of trades in the whole history
+            first_id: Id of the oldest trade in the history
+        """
+        self._next = 0
+        self.total = 0
+        for trade in trades[-self.capacity:]:
+            self.add_trade(trade)
+        self.total = max(total, self.total)
+        self.first_id = first_id
+    
+    @property
+    def last_id(self) -> int:
+        """Id of the most recent trade (0 if none)."""
+        return int(self.trade_id[self._next - 1]) if self.total else 0
+    
+    def column(self, name: str) -> np.ndarray:
+        """Get a column for the trades in memory, oldest first."""
+        values = getattr(self, name)
+        if self.total <= self.capacity:
+            return values[:self.total]
+        return np.concatenate((values[self._next:], values[:self._next]))
+    
+    def all_pnl(self) -> np.ndarray:
+        """
+        Get the pnl of every recorded trade, oldest first.
+        
+        Trades no longer in memory are read back from the ``trades`` table.
+        """
+        pnl = self.column('pnl')
+        if not self.evicted:
+            return pnl
+        
+        oldest_id = int(self.column('trade_id')[0])
+        db = SessionLocal()
+        try:
+            rows = db.query(Trade.realized_pnl).filter(
+                Trade.id >= self.first_id,
+                Trade.id < oldest_id
+            ).order_by(Trade.id).all()
+        finally:
+            db.close()
+        return np.concatenate((np.array([r[0] for r in rows], dtype=np.float64), pnl))
+    
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Get the most recent trades in memory, newest first."""
+        n = min(limit, len(self))
+        rows = []
+        for k in range(1, n + 1):
+            i = (self._next - k) % self.capacity
+            rows.append({
+                'id': int(self.trade_id[i]),
+                'symbol': self._name(int(self.symbol[i])),
+                'bot_id': self._name(int(self.bot[i])),
+                'quantity': float(self.quantity[i]),
+                'entry_price': float(self.entry_price[i]),
+                'exit_price': float(self.exit_price[i]),
+                'realized_pnl': float(self.pnl[i]),
+                'timestamp': self.closed_at[i].astype(datetime).isoformat()
+            })
+        return rows
+    
+    def nbytes(self) -> int:
+        """Bytes held by the columns."""
+        return sum(
+            getattr(self, name).nbytes
+            for name in ('pnl', 'quantity', 'entry_price', 'exit_price', 'closed_at', 'trade_id', 'symbol', 'bot')
+        )
+    
+    def get_stats(self) -> Dict:
+        """Get ledger size and statistics of the trades in memory."""
+        pnl = self.column('pnl')
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        return {
+            'in_memory': len(self),
+            'capacity': self.capacity,
+            'total': self.total,
+            'evicted': self.evicted,
+            'bytes': self.nbytes(),
+            'window_pnl': float(pnl.sum()),
+            'window_win_rate': float(len(wins) / len(pnl) * 100) if len(pnl) else 0.0,
+            'window_profit_factor': float(wins.sum() / -losses.sum()) if len(losses) else None
+        }
@@ -1,9 +1,9 @@
 import logging
 import os
-import asyncio
 import uvicorn
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 
 # Configure logging
@@ -20,9 +20,12 @@ logger = logging.getLogger("api")
 from config.settings import settings
 from models.database import init_db
 from core.engine import engine
+from utils.notifications import notifier
+from utils.google_sheets import sheets_sync
+from utils.metrics import metrics
 
 # Import API routers
-from api import dashboard, scanners, bots, governance, logs
+from api import dashboard, scanners, bots, governance, logs, admin
 
 
 @asynccontextmanager
@@ -35,15 +38,13 @@ async def lifespan(app: FastAPI):
     print("Starting trading engine...")
     engine.start()
     
-    # Start engine loop in background
-    engine_task = asyncio.create_task(engine.main_loop())
-    
     yield
     
     # Shutdown
     print("Stopping trading engine...")
-    engine.stop()
-    engine_task.cancel()
+    await engine.stop()
+    await notifier.stop()
+    await sheets_sync.stop()
 
 
 # Create FastAPI app
@@ -69,6 +70,7 @@ app.include_router(scanners.router, prefix="/api/scanners", tags=["scanners"])
 app.include_router(bots.router, prefix="/api/bots", tags=["bots"])
 app.include_router(governance.router, prefix="/api/governance", tags=["governance"])
 app.include_router(logs.router, prefix="/api/logs", tags=["logs"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 
 @app.get("/")
@@ -90,6 +92,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus metrics (text exposition format 0.0.4)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
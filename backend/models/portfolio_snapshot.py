@@ -0,0 +1,34 @@
+"""
+Portfolio snapshot model for fast restarts.
+"""
+from sqlalchemy import Column, Integer, Float, DateTime
+from datetime import datetime
+from models.database import Base
+
+
+class PortfolioSnapshot(Base):
+    """Portfolio aggregates as of a trade, replayed forward on startup."""
+    __tablename__ = "portfolio_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Last trade included in the aggregates (0 if none)
+    last_trade_id = Column(Integer, nullable=False, default=0)
+    
+    # Realized P&L and risk
+    total_pnl = Column(Float, nullable=False, default=0.0)
+    peak_value = Column(Float, nullable=False)
+    max_drawdown = Column(Float, nullable=False, default=0.0)
+    
+    # Trade return statistics (Welford state)
+    winning_trades = Column(Integer, nullable=False, default=0)
+    return_count = Column(Integer, nullable=False, default=0)
+    return_mean = Column(Float, nullable=False, default=0.0)
+    return_m2 = Column(Float, nullable=False, default=0.0)
+    downside_count = Column(Integer, nullable=False, default=0)
+    downside_mean = Column(Float, nullable=False, default=0.0)
+    downside_m2 = Column(Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f"<PortfolioSnapshot {self.timestamp} trade={self.last_trade_id}>"
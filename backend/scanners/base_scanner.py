@@ -4,11 +4,15 @@ Base scanner class for market analysis.
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
 from datetime import datetime
+import threading
 import pandas as pd
 from utils.market_data import market_data
 from utils.indicators import *
+from utils.panel import Panel
 from models.signal import Signal
-from models.database import SessionLocal
+from core.signal_writer import signal_writer
+from core.bar_tracker import bar_tracker, bar_key
+from config.settings import settings
 
 
 class BaseScanner(ABC):
@@ -44,59 +48,191 @@ class BaseScanner(ABC):
         """
         pass
     
-    def scan(self) -> List[Signal]:
+    def analyze_panel(self, panel: Panel) -> Dict[str, Dict]:
         """
-        Scan all symbols and generate signals.
+        Analyze every symbol of a panel in one vectorized pass.
+        
+        Scanners that override this are run through it by ``scan`` instead of
+        calling ``analyze`` once per symbol. Results must match ``analyze``.
+        
+        Args:
+            panel: Aligned OHLCV matrices for the universe
         
         Returns:
-            List of Signal objects
+            Dict mapping symbol to signal dict (same shape as ``analyze``)
+            for symbols that produced a signal
         """
-        if not self.active:
-            return []
+        raise NotImplementedError
+    
+    @property
+    def supports_panel(self) -> bool:
+        """Whether this scanner implements ``analyze_panel``."""
+        return type(self).analyze_panel is not BaseScanner.analyze_panel
+    
+    def _analyze_changed(self, panel: Panel, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Run ``analyze_panel`` on only the symbols whose latest bar changed.
         
-        signals = []
+        Results for symbols whose bar was already processed are reused from
+        ``bar_tracker``.
+        """
+        keys = dict(zip(panel.symbols, panel.bar_keys()))
+        results = {}
+        changed = []
+        for symbol in symbols:
+            if symbol not in keys:
+                continue
+            hit, signal_data = bar_tracker.lookup(self.scanner_id, symbol, settings.engine_interval, keys[symbol])
+            if hit:
+                results[symbol] = signal_data
+            else:
+                changed.append(symbol)
+        
+        if changed:
+            fresh = self.analyze_panel(panel if len(changed) == len(panel) else panel.select(changed))
+            for symbol in changed:
+                results[symbol] = fresh.get(symbol)
+                bar_tracker.store(self.scanner_id, symbol, settings.engine_interval, keys[symbol], results[symbol])
+        
+        return results
+    
+    def evaluate(
+        self,
+        symbols: Optional[List[str]] = None,
+        panel: Optional[Panel] = None,
+        frames: Optional[Dict[str, pd.DataFrame]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Dict[str, Dict]:
+        """
+        Analyze symbols without recording anything.
+        
+        Args:
+            symbols: Restrict the scan to these symbols (default: all)
+            panel: Prebuilt panel covering the symbols
+            frames: Prefetched OHLCV frames by symbol; when given, nothing is
+                fetched from market data (used by shard workers)
+            cancel_event: Stops the scan at the next symbol once set
+        
+        Returns:
+            Dict mapping symbol to signal dict, in ``self.symbols`` order
+        """
+        if symbols is None:
+            symbols = self.symbols
+        else:
+            wanted = set(symbols)
+            symbols = [s for s in self.symbols if s in wanted]
         
-        for symbol in self.symbols:
+        results = {}
+        
+        panel_results = None
+        if self.supports_panel:
             try:
-                # Fetch market data
-                df = market_data.get_historical_data(symbol, period="1mo", interval="1h")
-                
-                if df.empty:
-                    continue
-                
-                # Analyze
-                signal_data = self.analyze(symbol, df)
-                
-                if signal_data:
-                    # Create signal object
-                    signal = Signal(
-                        scanner_id=self.scanner_id,
-                        scanner_name=self.name,
-                        symbol=symbol,
-                        signal_type=signal_data['signal_type'],
-                        confidence=signal_data['confidence'],
-                        price=signal_data['price'],
-                        indicators=str(signal_data.get('indicators', {})),
-                        condition=signal_data.get('condition', '')
-                    )
+                if panel is None:
+                    if frames is None:
+                        frames = market_data.get_historical_data_many(symbols, period="1mo", interval=settings.engine_interval)
+                    panel = Panel.from_frames({s: frames[s] for s in symbols if s in frames})
+                panel_results = self._analyze_changed(panel, symbols)
+            except Exception as e:
+                print(f"Error panel scanning with {self.name}, falling back to per-symbol scan: {e}")
+        
+        for symbol in symbols:
+            if cancel_event is not None and cancel_event.is_set():
+                print(f"{self.name} scan cancelled")
+                break
+            
+            try:
+                if panel_results is not None:
+                    signal_data = panel_results.get(symbol)
+                else:
+                    # Fetch market data
+                    if frames is not None:
+                        df = frames.get(symbol)
+                    else:
+                        df = market_data.get_historical_data(symbol, period="1mo", interval=settings.engine_interval)
                     
-                    signals.append(signal)
-                    self.signals_generated += 1
+                    if df is None or df.empty:
+                        continue
                     
-                    # Save to database
-                    db = SessionLocal()
-                    try:
-                        db.add(signal)
-                        db.commit()
-                    finally:
-                        db.close()
+                    # Analyze, unless this bar was already processed
+                    key = bar_key(df)
+                    hit, signal_data = bar_tracker.lookup(self.scanner_id, symbol, settings.engine_interval, key)
+                    if not hit:
+                        signal_data = self.analyze(symbol, df)
+                        bar_tracker.store(self.scanner_id, symbol, settings.engine_interval, key, signal_data)
+                
+                if signal_data:
+                    results[symbol] = signal_data
                     
             except Exception as e:
                 print(f"Error scanning {symbol} with {self.name}: {e}")
         
-        self.last_scan_time = datetime.utcnow()
+        return results
+    
+    def record_signals(self, results: Dict[str, Dict]) -> List[Signal]:
+        """
+        Turn analysis results into Signal objects and queue them for saving.
+        
+        Rows are written in bulk by ``signal_writer.flush``, which the engine
+        calls once per tick.
+        
+        Args:
+            results: Dict mapping symbol to signal dict, as from ``evaluate``
+        
+        Returns:
+            List of Signal objects
+        """
+        signals = []
+        now = datetime.utcnow()
+        
+        for symbol, signal_data in results.items():
+            try:
+                # Create signal object
+                signal = Signal(
+                    timestamp=now,
+                    scanner_id=self.scanner_id,
+                    scanner_name=self.name,
+                    symbol=symbol,
+                    signal_type=signal_data['signal_type'],
+                    confidence=signal_data['confidence'],
+                    price=signal_data['price'],
+                    indicators=str(signal_data.get('indicators', {})),
+                    condition=signal_data.get('condition', '')
+                )
+                
+                signals.append(signal)
+                self.signals_generated += 1
+                    
+            except Exception as e:
+                print(f"Error creating {symbol} signal from {self.name}: {e}")
+        
+        # Buffer for the next bulk write
+        signal_writer.add(signals)
+        
+        self.last_scan_time = now
         return signals
     
+    def scan(
+        self,
+        panel: Optional[Panel] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> List[Signal]:
+        """
+        Scan all symbols and generate signals.
+        
+        Args:
+            panel: Prebuilt panel for the universe, shared between scanners
+                by the engine (built here if omitted)
+            cancel_event: Stops the scan at the next symbol once set
+        
+        Returns:
+            List of Signal objects
+        """
+        if not self.active:
+            return []
+        
+        results = self.evaluate(panel=panel, cancel_event=cancel_event)
+        return self.record_signals(results)
+    
     def toggle(self):
         """Toggle scanner active state."""
         self.active = not self.active
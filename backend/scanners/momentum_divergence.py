@@ -1,21 +1,33 @@
 """
-Momentum Divergence Scanner - RSI < 30 & MACD Bullish
+Momentum Divergence Scanner - RSI oversold/overbought & MACD confirmation
 """
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 from scanners.base_scanner import BaseScanner
 from utils.indicators import calculate_rsi, calculate_macd
+from utils.panel import Panel, panel_rsi, panel_macd
+from config.settings import settings
 
 
 class MomentumDivergenceScanner(BaseScanner):
     """Detects momentum divergence using RSI and MACD."""
     
-    def __init__(self, symbols: List[str]):
+    def __init__(
+        self,
+        symbols: List[str],
+        rsi_oversold: Optional[float] = None,
+        rsi_overbought: Optional[float] = None,
+        macd_histogram_min: Optional[float] = None
+    ):
         super().__init__(
             scanner_id="momentum_divergence",
             name="Momentum Divergence",
             symbols=symbols
         )
+        self.rsi_oversold = settings.momentum_rsi_oversold if rsi_oversold is None else rsi_oversold
+        self.rsi_overbought = settings.momentum_rsi_overbought if rsi_overbought is None else rsi_overbought
+        self.macd_histogram_min = settings.momentum_macd_histogram_min if macd_histogram_min is None else macd_histogram_min
     
     def analyze(self, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
         """Analyze momentum divergence."""
@@ -37,28 +49,28 @@ class MomentumDivergenceScanner(BaseScanner):
         current_price = df['Close'].iloc[-1]
         
         # Detect oversold with bullish MACD
-        oversold = current_rsi < 30
-        macd_bullish = current_histogram > 0 and current_macd > current_signal
+        oversold = current_rsi < self.rsi_oversold
+        macd_bullish = current_histogram > self.macd_histogram_min and current_macd > current_signal
         
         # Detect overbought with bearish MACD
-        overbought = current_rsi > 70
-        macd_bearish = current_histogram < 0 and current_macd < current_signal
+        overbought = current_rsi > self.rsi_overbought
+        macd_bearish = current_histogram < -self.macd_histogram_min and current_macd < current_signal
         
         if oversold and macd_bullish:
             signal_type = "OVERSOLD"
             # Confidence based on how oversold and MACD strength
-            rsi_strength = (30 - current_rsi) / 30 * 100
+            rsi_strength = (self.rsi_oversold - current_rsi) / self.rsi_oversold * 100
             macd_strength = min(100, abs(current_histogram) * 10)
             confidence = self.calculate_confidence(rsi_strength, macd_strength)
-            condition = f"RSI {current_rsi:.1f} < 30 & MACD Bullish"
+            condition = f"RSI {current_rsi:.1f} < {self.rsi_oversold:g} & MACD Bullish"
             
         elif overbought and macd_bearish:
             signal_type = "OVERBOUGHT"
             # Confidence based on how overbought and MACD strength
-            rsi_strength = (current_rsi - 70) / 30 * 100
+            rsi_strength = (current_rsi - self.rsi_overbought) / (100 - self.rsi_overbought) * 100
             macd_strength = min(100, abs(current_histogram) * 10)
             confidence = self.calculate_confidence(rsi_strength, macd_strength)
-            condition = f"RSI {current_rsi:.1f} > 70 & MACD Bearish"
+            condition = f"RSI {current_rsi:.1f} > {self.rsi_overbought:g} & MACD Bearish"
             
         else:
             return None
@@ -75,3 +87,58 @@ class MomentumDivergenceScanner(BaseScanner):
             },
             'condition': condition
         }
+    
+    def analyze_panel(self, panel: Panel) -> Dict[str, Dict]:
+        """Analyze momentum divergence for every symbol at once."""
+        close = panel.frame('Close')
+        rsi = panel_rsi(close, period=14).to_numpy()[-1]
+        macd_data = panel_macd(close)
+        current_macd = macd_data['macd'].to_numpy()[-1]
+        current_signal = macd_data['signal'].to_numpy()[-1]
+        current_histogram = macd_data['histogram'].to_numpy()[-1]
+        current_price = panel.last('Close')
+        
+        enough_data = panel.lengths >= 50
+        
+        # Detect oversold with bullish MACD, overbought with bearish MACD
+        oversold = (
+            enough_data & (rsi < self.rsi_oversold)
+            & (current_histogram > self.macd_histogram_min) & (current_macd > current_signal)
+        )
+        overbought = (
+            enough_data & (rsi > self.rsi_overbought)
+            & (current_histogram < -self.macd_histogram_min) & (current_macd < current_signal)
+        )
+        
+        # Confidence based on RSI extremity and MACD strength
+        rsi_strength = np.where(
+            oversold,
+            (self.rsi_oversold - rsi) / self.rsi_oversold * 100,
+            (rsi - self.rsi_overbought) / (100 - self.rsi_overbought) * 100
+        )
+        macd_strength = np.minimum(100, np.abs(current_histogram) * 10)
+        confidence = (rsi_strength + macd_strength) / 2
+        
+        results = {}
+        for i in np.flatnonzero(oversold | overbought):
+            if oversold[i]:
+                signal_type = "OVERSOLD"
+                condition = f"RSI {rsi[i]:.1f} < {self.rsi_oversold:g} & MACD Bullish"
+            else:
+                signal_type = "OVERBOUGHT"
+                condition = f"RSI {rsi[i]:.1f} > {self.rsi_overbought:g} & MACD Bearish"
+            
+            results[panel.symbols[i]] = {
+                'signal_type': signal_type,
+                'confidence': min(78, float(confidence[i])),
+                'price': float(current_price[i]),
+                'indicators': {
+                    'rsi': float(rsi[i]),
+                    'macd': float(current_macd[i]),
+                    'macd_signal': float(current_signal[i]),
+                    'macd_histogram': float(current_histogram[i])
+                },
+                'condition': condition
+            }
+        
+        return results
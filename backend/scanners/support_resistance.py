@@ -2,9 +2,11 @@
 Support/Resistance Scanner - Price crosses key levels
 """
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 from scanners.base_scanner import BaseScanner
 from utils.indicators import calculate_support_resistance
+from utils.panel import Panel, panel_support_resistance
 
 
 class SupportResistanceScanner(BaseScanner):
@@ -34,6 +36,17 @@ class SupportResistanceScanner(BaseScanner):
         current_volume = df['Volume'].iloc[-1]
         avg_volume = df['Volume'].rolling(window=20).mean().iloc[-1]
         
+        return self._check_levels(levels, current_price, prev_price, current_volume, avg_volume)
+    
+    def _check_levels(
+        self,
+        levels: Dict[str, List[float]],
+        current_price: float,
+        prev_price: float,
+        current_volume: float,
+        avg_volume: float
+    ) -> Optional[Dict]:
+        """Check the latest bar against support and resistance levels."""
         # Check for resistance break (bullish)
         for resistance in levels['resistance']:
             if prev_price < resistance <= current_price:
@@ -85,3 +98,22 @@ class SupportResistanceScanner(BaseScanner):
                 }
         
         return None
+    
+    def analyze_panel(self, panel: Panel) -> Dict[str, Dict]:
+        """Analyze support/resistance breaks for every symbol at once."""
+        all_levels = panel_support_resistance(panel, window=20)
+        current_price = panel.last('Close')
+        prev_price = panel.last('Close', offset=2)
+        current_volume = panel.last('Volume')
+        avg_volume = panel.frame('Volume').rolling(window=20).mean().to_numpy()[-1]
+        
+        results = {}
+        for i in np.flatnonzero(panel.lengths >= 50):
+            levels = all_levels[i]
+            signal_data = self._check_levels(
+                levels, current_price[i], prev_price[i], current_volume[i], avg_volume[i]
+            )
+            if signal_data:
+                results[panel.symbols[i]] = signal_data
+        
+        return results
@@ -2,9 +2,11 @@
 Trend Alignment Scanner - EMA 20 > EMA 50 > EMA 200
 """
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 from scanners.base_scanner import BaseScanner
 from utils.indicators import calculate_ema, detect_trend
+from utils.panel import Panel, panel_ema
 
 
 class TrendAlignmentScanner(BaseScanner):
@@ -67,3 +69,39 @@ class TrendAlignmentScanner(BaseScanner):
             },
             'condition': f"EMA 20 {'>' if bullish_alignment else '<'} EMA 50 {'>' if bullish_alignment else '<'} EMA 200"
         }
+    
+    def analyze_panel(self, panel: Panel) -> Dict[str, Dict]:
+        """Analyze trend alignment for every symbol at once."""
+        close = panel.frame('Close')
+        ema_20 = panel_ema(close, 20).to_numpy()[-1]
+        ema_50 = panel_ema(close, 50).to_numpy()[-1]
+        ema_200 = panel_ema(close, 200).to_numpy()[-1]
+        current_price = panel.last('Close')
+        
+        # Check alignment
+        enough_data = panel.lengths >= 200
+        bullish_alignment = enough_data & (ema_20 > ema_50) & (ema_50 > ema_200)
+        bearish_alignment = enough_data & (ema_20 < ema_50) & (ema_50 < ema_200)
+        
+        # Confidence based on separation (more separation = higher confidence)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            separation_50_200 = np.where(bullish_alignment, ema_50 - ema_200, ema_200 - ema_50) / ema_200 * 100
+            separation_20_50 = np.where(bullish_alignment, ema_20 - ema_50, ema_50 - ema_20) / ema_50 * 100
+        confidence = np.minimum(94, 70 + (separation_50_200 * 10) + (separation_20_50 * 10))
+        
+        results = {}
+        for i in np.flatnonzero(bullish_alignment | bearish_alignment):
+            bullish = bool(bullish_alignment[i])
+            results[panel.symbols[i]] = {
+                'signal_type': "BULLISH" if bullish else "BEARISH",
+                'confidence': float(confidence[i]),
+                'price': float(current_price[i]),
+                'indicators': {
+                    'ema_20': float(ema_20[i]),
+                    'ema_50': float(ema_50[i]),
+                    'ema_200': float(ema_200[i])
+                },
+                'condition': f"EMA 20 {'>' if bullish else '<'} EMA 50 {'>' if bullish else '<'} EMA 200"
+            }
+        
+        return results
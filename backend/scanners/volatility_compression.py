@@ -2,20 +2,24 @@
 Volatility Compression Scanner - Bollinger Band Squeeze
 """
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 from scanners.base_scanner import BaseScanner
 from utils.indicators import calculate_bollinger_bands, calculate_atr
+from utils.panel import Panel, panel_bollinger_bands, panel_atr
+from config.settings import settings
 
 
 class VolatilityCompressionScanner(BaseScanner):
     """Detects volatility compression (Bollinger Band squeeze)."""
     
-    def __init__(self, symbols: List[str]):
+    def __init__(self, symbols: List[str], squeeze_ratio: Optional[float] = None):
         super().__init__(
             scanner_id="volatility_compression",
             name="Volatility Compression",
             symbols=symbols
         )
+        self.squeeze_ratio = settings.volatility_squeeze_ratio if squeeze_ratio is None else squeeze_ratio
     
     def analyze(self, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
         """Analyze volatility compression."""
@@ -40,8 +44,8 @@ class VolatilityCompressionScanner(BaseScanner):
         # Detect squeeze (width is significantly below average)
         width_ratio = current_width / avg_width if avg_width > 0 else 1.0
         
-        # Squeeze detected if width is less than 70% of average
-        if width_ratio > 0.7:
+        # Squeeze detected if width is below squeeze_ratio (70%) of average
+        if width_ratio > self.squeeze_ratio:
             return None
         
         # Determine direction based on price position in bands
@@ -73,3 +77,46 @@ class VolatilityCompressionScanner(BaseScanner):
             },
             'condition': f"BB Squeeze detected (width {width_ratio:.2f}x avg), potential {direction_hint} breakout"
         }
+    
+    def analyze_panel(self, panel: Panel) -> Dict[str, Dict]:
+        """Analyze volatility compression for every symbol at once."""
+        bb = panel_bollinger_bands(panel.frame('Close'), period=20, std=2)
+        current_width = bb['width'].to_numpy()[-1]
+        avg_width = bb['width'].rolling(window=50).mean().to_numpy()[-1]
+        bb_pct = bb['pct'].to_numpy()[-1]
+        current_atr = panel_atr(panel, period=14).to_numpy()[-1]
+        current_price = panel.last('Close')
+        
+        # Detect squeeze (width is significantly below average)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            width_ratio = np.where(avg_width > 0, current_width / avg_width, 1.0)
+        
+        # Squeeze detected if width is below squeeze_ratio (70%) of average
+        squeezed = (panel.lengths >= 50) & ~(width_ratio > self.squeeze_ratio)
+        
+        # Confidence based on how tight the squeeze is
+        confidence = np.minimum(87, 60 + (1 - width_ratio) * 100 * 0.5)
+        
+        results = {}
+        for i in np.flatnonzero(squeezed):
+            if bb_pct[i] > 0.8:
+                direction_hint = "upward"
+            elif bb_pct[i] < 0.2:
+                direction_hint = "downward"
+            else:
+                direction_hint = "pending"
+            
+            results[panel.symbols[i]] = {
+                'signal_type': "READY",
+                'confidence': float(confidence[i]),
+                'price': float(current_price[i]),
+                'indicators': {
+                    'bb_width': float(current_width[i]),
+                    'bb_width_ratio': float(width_ratio[i]),
+                    'atr': float(current_atr[i]),
+                    'bb_pct': float(bb_pct[i])
+                },
+                'condition': f"BB Squeeze detected (width {width_ratio[i]:.2f}x avg), potential {direction_hint} breakout"
+            }
+        
+        return results
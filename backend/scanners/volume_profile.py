@@ -2,9 +2,11 @@
 Volume Profile Scanner - POC crossing detected
 """
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 from scanners.base_scanner import BaseScanner
 from utils.indicators import calculate_volume_profile, calculate_vwap
+from utils.panel import Panel, panel_volume_profile, panel_vwap
 
 
 class VolumeProfileScanner(BaseScanner):
@@ -77,3 +79,50 @@ class VolumeProfileScanner(BaseScanner):
             },
             'condition': f"Price {position}, {vwap_position} VWAP"
         }
+    
+    def analyze_panel(self, panel: Panel) -> Dict[str, Dict]:
+        """Analyze volume profile for every symbol at once."""
+        vp = panel_volume_profile(panel, bins=50)
+        current_vwap = panel_vwap(panel).to_numpy()[-1]
+        current_price = panel.last('Close')
+        poc, vah, val = vp['poc'], vp['vah'], vp['val']
+        
+        # Position relative to value area
+        above = current_price > vah
+        below = ~above & (current_price < val)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            at_poc = ~above & ~below & (np.abs(current_price - poc) / poc < 0.005)
+            vwap_distance = np.abs((current_price - current_vwap) / current_vwap) * 100
+        
+        # VWAP position for additional confirmation
+        above_vwap = current_price > current_vwap
+        confirmed = (above & above_vwap) | (below & ~above_vwap)
+        
+        confidence = np.select([above | below, at_poc], [65, 71], default=60) + np.where(confirmed, 6, 0)
+        
+        results = {}
+        for i in np.flatnonzero(panel.lengths >= 50):
+            if above[i]:
+                position, signal_type = "above value area", "BULLISH"
+            elif below[i]:
+                position, signal_type = "below value area", "BEARISH"
+            elif at_poc[i]:
+                position, signal_type = "at POC", "NEUTRAL"
+            else:
+                position, signal_type = "in value area", "NEUTRAL"
+            
+            results[panel.symbols[i]] = {
+                'signal_type': signal_type,
+                'confidence': min(int(confidence[i]), 75),
+                'price': float(current_price[i]),
+                'indicators': {
+                    'poc': float(poc[i]),
+                    'vah': float(vah[i]),
+                    'val': float(val[i]),
+                    'vwap': float(current_vwap[i]),
+                    'vwap_distance_pct': float(vwap_distance[i])
+                },
+                'condition': f"Price {position}, {'above' if above_vwap[i] else 'below'} VWAP"
+            }
+        
+        return results
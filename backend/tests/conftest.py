@@ -0,0 +1,28 @@
+"""
+Test setup: run from ``backend/`` against a throwaway database and store.
+"""
+import os
+import sys
+import tempfile
+import pytest
+
+# Settings are read when the backend is first imported
+_tmp = tempfile.mkdtemp(prefix="scantrade-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'test.db')}")
+os.environ.setdefault("ENABLE_CANDLE_STORE", "false")
+os.environ.setdefault("CANDLE_STORE_DIR", os.path.join(_tmp, "candles"))
+os.environ.setdefault("GOOGLE_SHEET_ID", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def database():
+    """Empty tables for tests that write positions, trades, signals and snapshots."""
+    from models.database import Base, engine
+    import models.position, models.trade, models.signal, models.portfolio_snapshot  # noqa: F401 (tables)
+    
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+
@@ -0,0 +1,139 @@
+"""
+Async market data client tests: timeouts, retries and the concurrency bound.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+import pandas as pd
+import pytest
+from benchmarks.synthetic import SyntheticProvider
+from utils.async_market_data import AsyncMarketDataClient
+from utils.data_providers import MarketDataProvider
+
+SYMBOLS = [f"SYM{i}" for i in range(6)]
+
+
+class ScriptedProvider(MarketDataProvider):
+    """
+    Wraps a provider; each symbol first plays its scripted failures.
+    
+    ``'hang'`` blocks until released (longer than the client timeout) and
+    ``'raise'`` fails at once. Every call also takes ``delay`` seconds so
+    concurrent calls overlap, and the peak concurrency is recorded.
+    """
+    
+    name = "scripted"
+    
+    def __init__(self, inner: MarketDataProvider, script: Optional[Dict[str, List[str]]] = None, delay: float = 0.0):
+        self.inner = inner
+        self.script = {symbol: list(steps) for symbol, steps in (script or {}).items()}
+        self.delay = delay
+        self.released = threading.Event()
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+    
+    def history(
+        self,
+        symbol: str,
+        period: Optional[str] = None,
+        interval: str = "1h",
+        start: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            steps = self.script.get(symbol)
+            step = steps.pop(0) if steps else None
+        try:
+            time.sleep(self.delay)
+            if step == 'hang':
+                self.released.wait(5.0)
+                raise ConnectionError(f"{symbol}: connection dropped")
+            if step == 'raise':
+                raise ConnectionError(f"{symbol}: connection reset")
+            return self.inner.history(symbol, period=period, interval=interval, start=start)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def inner():
+    return SyntheticProvider(SYMBOLS, bars=200)
+
+
+def _run_releasing(provider: ScriptedProvider, coro):
+    """Run a coroutine, then release hung calls so their threads can exit."""
+    async def run():
+        try:
+            return await coro
+        finally:
+            provider.released.set()
+    
+    return asyncio.run(run())
+
+
+def _client(provider: MarketDataProvider, **kwargs) -> AsyncMarketDataClient:
+    options = {'rate': 1000.0, 'timeout': 0.2, 'max_retries': 2, 'backoff_base': 0.01}
+    options.update(kwargs)
+    return AsyncMarketDataClient(provider, **options)
+
+
+def test_history_many_tags_frames(inner):
+    client = _client(inner)
+    
+    frames = asyncio.run(client.get_history_many(SYMBOLS))
+    
+    assert list(frames) == SYMBOLS
+    for symbol, df in frames.items():
+        assert df.attrs['symbol'] == symbol
+        pd.testing.assert_frame_equal(df, inner.history(symbol, period="1mo"), check_freq=False)
+    assert client.stats == {'requests': len(SYMBOLS), 'retries': 0, 'timeouts': 0, 'failures': 0}
+
+
+def test_hung_call_times_out_and_is_retried(inner):
+    provider = ScriptedProvider(inner, {"SYM0": ['hang', 'raise']})
+    client = _client(provider)
+    
+    df = _run_releasing(provider, client.get_history("SYM0"))
+    
+    pd.testing.assert_frame_equal(df, inner.history("SYM0", period="1mo"), check_freq=False)
+    assert client.stats == {'requests': 3, 'retries': 2, 'timeouts': 1, 'failures': 0}
+
+
+def test_symbols_failing_every_attempt_are_left_out(inner):
+    provider = ScriptedProvider(inner, {"SYM1": ['hang', 'raise', 'raise'], "SYM2": ['raise']})
+    client = _client(provider)
+    
+    frames = _run_releasing(provider, client.get_history_many(SYMBOLS))
+    
+    assert list(frames) == [s for s in SYMBOLS if s != "SYM1"]
+    assert client.stats['failures'] == 1
+    assert client.stats['timeouts'] == 1
+    assert client.stats['retries'] == 3
+
+
+def test_last_error_is_raised_after_all_retries(inner):
+    provider = ScriptedProvider(inner, {"SYM0": ['raise'] * 3})
+    client = _client(provider)
+    
+    with pytest.raises(ConnectionError, match="connection reset"):
+        asyncio.run(client.get_history("SYM0"))
+    assert provider.calls == 3
+
+
+def test_concurrency_is_bounded(inner):
+    provider = ScriptedProvider(inner, delay=0.05)
+    client = _client(provider, max_concurrency=2)
+    
+    started = time.perf_counter()
+    frames = asyncio.run(client.get_history_many(SYMBOLS))
+    elapsed = time.perf_counter() - started
+    
+    assert len(frames) == len(SYMBOLS)
+    assert provider.peak == 2
+    assert elapsed >= 0.05 * len(SYMBOLS) / 2
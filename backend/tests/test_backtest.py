@@ -0,0 +1,64 @@
+"""
+Backtester tests.
+"""
+import pandas as pd
+import pytest
+from benchmarks.synthetic import synthetic_frame
+from bots.trend_following import TrendFollowingBot
+from core.backtest import Backtester, _ReplaySignals, _VectorSignals
+from core.engine import TradingEngine
+
+SYMBOLS = ["AAA", "BBB", "CCC"]
+
+# Bots whose vector_signals must reproduce should_enter/should_exit
+VECTOR_BOTS = [type(bot) for bot in TradingEngine().bots if bot.cacheable_decisions]
+
+
+def _frames(unit: str):
+    frames = {}
+    for i, symbol in enumerate(SYMBOLS):
+        df = synthetic_frame(2000, seed=i)
+        df.index = df.index.as_unit(unit)
+        frames[symbol] = df
+    return frames
+
+
+@pytest.mark.parametrize("unit", ["s", "ms", "us"])
+def test_timestamps_do_not_depend_on_index_unit(unit):
+    expected = Backtester().run(TrendFollowingBot(SYMBOLS), _frames("ns"))
+    result = Backtester().run(TrendFollowingBot(SYMBOLS), _frames(unit))
+    
+    assert result.trades, "the fixture should produce trades"
+    assert result.trades == expected.trades
+    assert result.equity.index.equals(expected.equity.index)
+    assert result.equity.index[0] == pd.Timestamp("2024-01-01", tz="UTC")
+    assert all(t['entry_time'].startswith("2024-") for t in result.trades)
+
+
+def test_start_on_non_ns_index():
+    start = pd.Timestamp("2024-02-01", tz="UTC")
+    result = Backtester().run(TrendFollowingBot(SYMBOLS), _frames("us"), start=start)
+    
+    assert result.equity.index[0] == start
+    assert len(result.equity) == 2000 - 31 * 24
+    assert result.trades
+    assert all(pd.Timestamp(t['entry_time']) >= start for t in result.trades)
+
+
+@pytest.mark.parametrize("bot_class", VECTOR_BOTS, ids=lambda cls: cls.__name__)
+def test_vector_signals_match_replay(bot_class, monkeypatch):
+    symbols = [f"SYM{i}" for i in range(6)]
+    frames = {symbol: synthetic_frame(300, seed=i) for i, symbol in enumerate(symbols)}
+    bot = bot_class(symbols)
+    
+    assert isinstance(Backtester.signal_source(bot, symbols[0], frames[symbols[0]]), _VectorSignals)
+    vector = Backtester().run(bot, frames)
+    
+    # Without vector_signals the backtester replays the live methods bar by bar
+    monkeypatch.setattr(bot, 'vector_signals', lambda symbol, df: None)
+    assert isinstance(Backtester.signal_source(bot, symbols[0], frames[symbols[0]]), _ReplaySignals)
+    replay = Backtester().run(bot, frames)
+    
+    assert vector.trades == replay.trades
+    assert vector.open_trades == replay.open_trades
+    assert vector.equity.equals(replay.equity)
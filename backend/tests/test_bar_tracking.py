@@ -0,0 +1,66 @@
+"""
+Bar tracking tests: decisions are reused only while the latest bar is unchanged.
+"""
+import pytest
+from benchmarks.synthetic import synthetic_frame
+from bots.base_bot import BaseBot
+from core.bar_tracker import bar_tracker
+from utils.indicators import calculate_rsi, indicator_cache
+
+
+class RSIBot(BaseBot):
+    """Enters when RSI is over 70 and records every RSI it saw."""
+    
+    def __init__(self):
+        super().__init__("rsi_test", "RSI Test", "test", "LOW", ["TEST"])
+        self.seen = []
+    
+    def should_enter(self, symbol, df):
+        rsi = calculate_rsi(df).iloc[-1]
+        self.seen.append(rsi)
+        return rsi > 70, 100.0, f"RSI {rsi:.2f}"
+    
+    def should_exit(self, symbol, df, entry_price):
+        return False, ""
+
+
+@pytest.fixture
+def frame():
+    indicator_cache.clear()
+    bar_tracker.clear()
+    df = synthetic_frame(200, seed=5)
+    df.attrs.update(symbol="TEST", interval="1h")
+    return df
+
+
+def test_unchanged_bar_reuses_decision(frame):
+    bot = RSIBot()
+    first = bot.decide_cached("TEST", frame, None, "1h")
+    second = bot.decide_cached("TEST", frame.copy(), None, "1h")
+    
+    assert first == second
+    assert len(bot.seen) == 1
+
+
+def test_forming_bar_change_reevaluates_with_fresh_indicators(frame):
+    bot = RSIBot()
+    bot.decide_cached("TEST", frame, None, "1h")
+    
+    moved = frame.copy()
+    moved.iloc[-1, moved.columns.get_loc('Close')] *= 1.2
+    moved.iloc[-1, moved.columns.get_loc('High')] = moved['Close'].iat[-1]
+    moved.attrs.update(frame.attrs)
+    intent = bot.decide_cached("TEST", moved, None, "1h")
+    
+    assert len(bot.seen) == 2
+    assert bot.seen[1] == pytest.approx(calculate_rsi.__wrapped__(moved).iloc[-1])
+    assert bot.seen[1] != pytest.approx(bot.seen[0])
+    assert intent is not None and intent['action'] == 'open'
+
+
+def test_interval_separates_decisions(frame):
+    bot = RSIBot()
+    bot.decide_cached("TEST", frame, None, "1h")
+    bot.decide_cached("TEST", frame, None, "4h")
+    
+    assert len(bot.seen) == 2
@@ -0,0 +1,33 @@
+"""
+Benchmark suite tests: per-case memory and comparing reports.
+"""
+import numpy as np
+from benchmarks.suite import compare, peak_alloc_mb, summarize
+
+
+def test_peak_alloc_is_measured_per_case():
+    large = peak_alloc_mb(lambda: np.ones(5_000_000))
+    small = peak_alloc_mb(lambda: np.ones(1000))
+    
+    assert large >= 5_000_000 * 8 / (1024 * 1024) * 0.95
+    assert small < 1.0
+
+
+def _report(*results) -> dict:
+    return {'meta': {}, 'results': list(results)}
+
+
+def test_compare_reads_reports_without_allocation_peaks():
+    old = summarize('indicators', 'calculate_rsi', 1000, [0.010, 0.010, 0.010], 1000, 'bars')
+    del old['peak_alloc_mb']
+    old['peak_rss_mb'] = 150.0  # per-case field of earlier reports
+    new = summarize('indicators', 'calculate_rsi', 1000, [0.020, 0.020, 0.020], 1000, 'bars', alloc_mb=0.1)
+    
+    (latency,) = compare(_report(old), _report(new))
+    (memory,) = compare(_report(old), _report(new), metric='peak_alloc_mb')
+    (same,) = compare(_report(new), _report(new), metric='peak_alloc_mb')
+    
+    assert latency['status'] == 'regression'
+    assert latency['change'] == 1.0
+    assert memory['status'] == 'new' and memory['current'] == 0.1
+    assert same['status'] == 'ok'
@@ -0,0 +1,107 @@
+"""
+Candle store tests: frame shape round-trips and writes under concurrent readers.
+"""
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import synthetic_frame
+from utils.candle_store import CANDLE_DTYPE, CandleStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path))
+
+
+def _exchange_frame(bars: int, seed: int = 0) -> pd.DataFrame:
+    """Bars shaped like a yfinance history: exchange timezone and action columns."""
+    df = synthetic_frame(bars, seed=seed)
+    df.index = df.index.tz_convert('America/New_York')
+    df['Dividends'] = 0.0
+    df['Stock Splits'] = 0.0
+    df.iloc[10, df.columns.get_loc('Dividends')] = 0.24
+    df.iloc[20, df.columns.get_loc('Stock Splits')] = 2.0
+    return df
+
+
+def test_read_keeps_timezone_and_action_columns(store):
+    df = _exchange_frame(100)
+    store.append("AAA", "1h", df)
+    
+    out = store.read("AAA", "1h")
+    
+    assert list(out.columns) == list(df.columns)
+    assert str(out.index.tz) == 'America/New_York'
+    pd.testing.assert_frame_equal(out, df, check_freq=False, check_index_type=False)
+
+
+def test_naive_and_plain_frames_read_back_as_utc_ohlcv(store):
+    df = synthetic_frame(50)
+    df.index = df.index.tz_localize(None)
+    store.append("AAA", "1h", df)
+    
+    out = store.read("AAA", "1h")
+    
+    assert list(out.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert str(out.index.tz) == 'UTC'
+    np.testing.assert_array_equal(out['Close'].to_numpy(), df['Close'].to_numpy())
+
+
+def test_append_overwrites_the_forming_bar(store):
+    df = _exchange_frame(100)
+    store.append("AAA", "1h", df.iloc[:60])
+    
+    forming = df.iloc[59:].copy()
+    forming.iloc[0, forming.columns.get_loc('Close')] += 1.0
+    store.append("AAA", "1h", forming)
+    
+    out = store.read("AAA", "1h")
+    assert len(out) == 100
+    assert out['Close'].iat[59] == df['Close'].iat[59] + 1.0
+    pd.testing.assert_frame_equal(out.iloc[60:], df.iloc[60:], check_freq=False, check_index_type=False)
+
+
+def test_shrinking_writes_leave_open_mappings_intact(store):
+    df = _exchange_frame(100)
+    store.append("AAA", "1h", df)
+    mapped = np.memmap(store._path("AAA", "1h"), dtype=CANDLE_DTYPE, mode='r')
+    before = np.array(mapped)
+    
+    # Both rewrite the file shorter than the reader's mapping
+    store.append("AAA", "1h", df.iloc[10:20])
+    assert len(store.read("AAA", "1h")) == 20
+    store.replace("AAA", "1h", df.iloc[:5])
+    assert len(store.read("AAA", "1h")) == 5
+    
+    np.testing.assert_array_equal(np.array(mapped), before)
+    del mapped
+
+
+def test_concurrent_appends_and_reads_stay_consistent(store):
+    df = _exchange_frame(400)
+    store.append("AAA", "1h", df.iloc[:100])
+    errors = []
+    
+    def writer():
+        for stop in range(101, 401):
+            store.append("AAA", "1h", df.iloc[stop - 2:stop])
+    
+    def reader():
+        try:
+            for _ in range(300):
+                out = store.read("AAA", "1h")
+                assert out.index.is_monotonic_increasing
+                expected = df.loc[out.index, 'Close'].to_numpy()
+                np.testing.assert_array_equal(out['Close'].to_numpy(), expected)
+        except AssertionError as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert not errors
+    assert len(store.read("AAA", "1h")) == 400
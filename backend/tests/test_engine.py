@@ -0,0 +1,225 @@
+"""
+Engine lifecycle and executor tests.
+"""
+import asyncio
+import time
+import pytest
+from benchmarks.suite import install_provider, restore_provider
+from benchmarks.synthetic import SyntheticProvider
+from config.settings import settings
+from core import engine as engine_module
+from core.bar_tracker import bar_tracker
+from core.engine import TradingEngine
+from core.executor import TaskExecutor
+from utils.indicators import indicator_cache
+from utils.market_data import market_data
+
+
+def test_executor_refuses_work_after_shutdown():
+    executor = TaskExecutor(max_workers=2)
+    
+    async def run():
+        assert await executor.run_blocking(sum, [1, 2]) == 3
+        executor.shutdown()
+        with pytest.raises(RuntimeError):
+            await executor.run_blocking(sum, [1, 2])
+        with pytest.raises(RuntimeError):
+            await executor.run_tasks([("task", sum, ([1, 2],))])
+    
+    asyncio.run(run())
+    assert executor._thread_pool is None
+
+
+def test_stop_cancels_the_loop_before_closing_pools(monkeypatch):
+    monkeypatch.setattr(engine_module.portfolio, 'restore', lambda: None)
+    monkeypatch.setattr(engine_module.portfolio, 'save_snapshot', lambda: None)
+    monkeypatch.setattr(engine_module.signal_writer, 'flush', lambda: None)
+    monkeypatch.setattr(engine_module.notifier, 'start', lambda: None)
+    monkeypatch.setattr(engine_module.sheets_sync, 'start', lambda: None)
+    engine = TradingEngine()
+    errors = []
+    
+    async def busy_tick():
+        while True:
+            try:
+                await engine.executor.run_blocking(time.sleep, 0.01)
+            except RuntimeError as e:
+                errors.append(e)
+                raise
+    
+    engine.tick = busy_tick
+    shutdown = engine.executor.shutdown
+    loop_done_at_shutdown = []
+    
+    def recording_shutdown():
+        loop_done_at_shutdown.append(engine._loop_task is None)
+        shutdown()
+    
+    monkeypatch.setattr(engine.executor, 'shutdown', recording_shutdown)
+    
+    async def run():
+        engine.start()
+        task = engine._loop_task
+        await asyncio.sleep(0.05)
+        await engine.stop()
+        return task
+    
+    task = asyncio.run(run())
+    
+    assert task.cancelled()
+    assert loop_done_at_shutdown == [True]
+    assert not errors
+
+
+@pytest.fixture
+def synthetic_universe(monkeypatch):
+    symbols = [f"SYM{i}" for i in range(12)]
+    monkeypatch.setattr(settings, 'market_symbols', ",".join(symbols))
+    previous = install_provider(SyntheticProvider(symbols, bars=720))
+    market_data.clear_cache()
+    yield symbols
+    restore_provider(previous)
+    market_data.clear_cache()
+
+
+def _scan(mode: str):
+    indicator_cache.clear()
+    bar_tracker.clear()
+    engine = TradingEngine()
+    engine.executor.mode = mode
+    try:
+        signals = asyncio.run(engine.run_scanners())
+    finally:
+        engine.executor.shutdown()
+    return sorted((s.scanner_id, s.symbol, s.signal_type, round(s.confidence, 9)) for s in signals)
+
+
+def test_process_scanners_match_thread_scanners(synthetic_universe):
+    expected = _scan("thread")
+    
+    assert expected, "the fixture should produce signals"
+    assert _scan("process") == expected
+
+
+
+def _trade_ticks(symbols, ticks: int = 6):
+    """Run bot ticks over a fresh copy of the universe."""
+    from bots.base_bot import BotStatus
+    
+    indicator_cache.clear()
+    bar_tracker.clear()
+    provider = SyntheticProvider(symbols, bars=720, ahead=ticks)
+    previous = install_provider(provider)
+    engine = TradingEngine()
+    for bot in engine.bots:
+        bot.status = BotStatus.ACTIVE
+    
+    async def run():
+        for _ in range(ticks):
+            provider.advance()
+            market_data.clear_cache()
+            await engine.update_market_data()
+            await engine.run_bots()
+    
+    try:
+        asyncio.run(run())
+    finally:
+        engine.executor.shutdown()
+        restore_provider(previous)
+        market_data.clear_cache()
+
+
+def test_multi_bot_ticks_are_deterministic(synthetic_universe, database, monkeypatch):
+    from core.portfolio import Portfolio
+    from models.database import Base
+    import bots.base_bot, governance.risk_manager
+    
+    outcomes = []
+    for _ in range(4):
+        Base.metadata.drop_all(bind=database)
+        Base.metadata.create_all(bind=database)
+        portfolio = Portfolio()
+        for module in (bots.base_bot, engine_module, governance.risk_manager):
+            monkeypatch.setattr(module, 'portfolio', portfolio)
+        
+        _trade_ticks(synthetic_universe)
+        outcomes.append((
+            {s: (p.bot_id, p.entry_price, p.quantity) for s, p in portfolio.positions.items()},
+            list(portfolio.trades.all_pnl()),
+            portfolio.cash
+        ))
+    
+    positions, trades, _ = outcomes[0]
+    assert positions and trades, "the fixture should open and close positions"
+    assert all(outcome == outcomes[0] for outcome in outcomes[1:])
+
+
+@pytest.mark.parametrize("mode", ["shards", "process"])
+def test_unchanged_bars_are_skipped_in_worker_processes(synthetic_universe, monkeypatch, mode):
+    if mode == "shards":
+        monkeypatch.setattr(settings, 'engine_shards', 3)
+    indicator_cache.clear()
+    bar_tracker.clear()
+    engine = TradingEngine()
+    engine.executor.mode = "process"
+    
+    async def run():
+        # Scanners only: bots are inactive until switched on
+        if mode == "shards":
+            await engine.run_shards()
+        else:
+            await engine.run_scanners()
+        return bar_tracker.end_tick()
+    
+    try:
+        bar_tracker.end_tick()
+        first = asyncio.run(run())
+        second = asyncio.run(run())
+    finally:
+        engine.executor.shutdown()
+    
+    scanned = len(engine.scanners) * len(synthetic_universe)
+    assert sum(c['evaluated'] for c in first.values()) == scanned
+    assert sum(c['skipped'] for c in second.values()) == scanned
+    assert sum(c['evaluated'] for c in second.values()) == 0
+
+
+def test_armed_tick_attributes_bot_time_per_symbol(synthetic_universe, database, monkeypatch, tmp_path):
+    from bots.base_bot import BotStatus
+    from core.portfolio import Portfolio
+    from core.profiler import profiler
+    import bots.base_bot, governance.risk_manager
+    
+    portfolio = Portfolio()
+    for module in (bots.base_bot, engine_module, governance.risk_manager):
+        monkeypatch.setattr(module, 'portfolio', portfolio)
+    monkeypatch.setattr(settings, 'profiler_output_dir', str(tmp_path))
+    monkeypatch.setattr(engine_module.sheets_sync, 'sync_scanners', lambda *args: None)
+    monkeypatch.setattr(engine_module.sheets_sync, 'sync_signals', lambda *args: None)
+    monkeypatch.setattr(engine_module.notifier, 'enqueue_signal', lambda *args: None)
+    indicator_cache.clear()
+    bar_tracker.clear()
+    engine = TradingEngine()
+    for bot in engine.bots:
+        bot.status = BotStatus.ACTIVE
+    
+    async def run():
+        profiler.tick_started()
+        try:
+            await engine.tick()
+        finally:
+            profiler.tick_finished()
+    
+    profiler.arm(1, interval=0.0005)
+    try:
+        asyncio.run(run())
+    finally:
+        engine.executor.shutdown()
+        profiler.disarm()
+    
+    report = profiler.last_report
+    with open(report['collapsed_file']) as f:
+        frames = {frame for line in f for frame in line.rsplit(" ", 1)[0].split(";")}
+    bot_frames = {frame for frame in frames if frame.startswith("[bot ")}
+    assert any(frame.split()[-1].rstrip("]") in synthetic_universe for frame in bot_frames), bot_frames
+    assert any(entry['kind'] == 'bot' for entry in report['attribution'])
@@ -0,0 +1,135 @@
+"""
+Google Sheets sync tests against a fake Sheets API service.
+"""
+import time
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from utils.google_sheets import SCANNER_HEADER, SIGNAL_HEADER, GoogleSheetsSync
+
+
+class FakeRequest:
+    def __init__(self, result):
+        self.result = result
+    
+    def execute(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class FakeService:
+    """Chains like ``service.spreadsheets().values()`` and records every call."""
+    
+    def __init__(self, existing_signal_rows: int = 0):
+        self.existing_signal_rows = existing_signal_rows
+        self.gets = []
+        self.updates = []
+        self.errors = []  # raised by the next batchUpdate calls, in order
+    
+    def spreadsheets(self):
+        return self
+    
+    def values(self):
+        return self
+    
+    def get(self, spreadsheetId, range):
+        self.gets.append(range)
+        return FakeRequest({'values': [["x"]] * self.existing_signal_rows})
+    
+    def batchUpdate(self, spreadsheetId, body):
+        if self.errors:
+            return FakeRequest(self.errors.pop(0))
+        self.updates.append(body['data'])
+        return FakeRequest({})
+
+
+@pytest.fixture
+def service():
+    return FakeService(existing_signal_rows=5)
+
+
+@pytest.fixture
+def sync(service):
+    sheets = GoogleSheetsSync()
+    sheets.spreadsheet_id = "sheet"
+    sheets.service = service
+    return sheets
+
+
+def _scanner(scanner_id: str, signals: int) -> dict:
+    return {'id': scanner_id, 'name': scanner_id.title(), 'active': True, 'last_scan': None, 'signals_generated': signals}
+
+
+def _signal(symbol: str) -> dict:
+    return {
+        'timestamp': "2024-01-01T00:00:00", 'symbol': symbol, 'signal_type': "BULLISH",
+        'confidence': 70.0, 'price': 100.0, 'condition': "test"
+    }
+
+
+def test_unchanged_scanner_rows_are_not_resent(sync, service):
+    sync.sync_scanners([_scanner("trend", 1), _scanner("volume", 2)])
+    assert sync.flush() == 3
+    
+    sync.sync_scanners([_scanner("trend", 1), _scanner("volume", 3)])
+    assert sync.flush() == 1
+    sync.sync_scanners([_scanner("trend", 1), _scanner("volume", 3)])
+    assert sync.flush() == 0
+    
+    first, second = service.updates
+    assert first == [
+        {'range': 'Scanners!A1:E1', 'values': [SCANNER_HEADER]},
+        {'range': 'Scanners!A2:E2', 'values': [["trend", "Trend", "Active", None, 1]]},
+        {'range': 'Scanners!A3:E3', 'values': [["volume", "Volume", "Active", None, 2]]}
+    ]
+    assert second == [{'range': 'Scanners!A3:E3', 'values': [["volume", "Volume", "Active", None, 3]]}]
+
+
+def test_signal_ranges_continue_from_the_last_written_row(sync, service):
+    sync.sync_signals([_signal("AAA"), _signal("BBB")])
+    sync.flush()
+    sync.sync_signals([_signal("CCC")])
+    sync.flush()
+    
+    assert service.gets == ['Signals!A:A']
+    ranges = [data[0]['range'] for data in service.updates]
+    assert ranges == ['Signals!A6:F7', 'Signals!A8:F8']
+    assert service.updates[1][0]['values'][0][1] == "CCC"
+    assert sync._signals_next_row == 9
+
+
+def test_empty_signals_tab_gets_a_header():
+    sheets = GoogleSheetsSync()
+    sheets.spreadsheet_id = "sheet"
+    sheets.service = FakeService()
+    sheets.sync_signals([_signal("AAA")])
+    sheets.flush()
+    
+    (data,) = sheets.service.updates
+    assert data[0]['range'] == 'Signals!A1:F2'
+    assert data[0]['values'][0] == SIGNAL_HEADER
+
+
+def test_quota_error_keeps_rows_staged_and_backs_off(sync, service):
+    service.errors.append(HttpError(httplib2.Response({'status': 429}), b'quota exceeded'))
+    sync.sync_scanners([_scanner("trend", 1)])
+    sync.sync_signals([_signal("AAA")])
+    
+    before = time.monotonic()
+    assert sync.flush() == 0
+    assert sync._retry_at > before
+    assert sync.stats['failed_flushes'] == 1
+    assert sync.get_stats()['pending_rows'] == 3
+    
+    # Nothing is sent while backing off, and rows staged meanwhile queue behind
+    sync.sync_signals([_signal("BBB")])
+    assert sync.flush() == 0
+    assert not service.updates
+    
+    sync._retry_at = 0.0
+    assert sync.flush() == 4
+    (data,) = service.updates
+    assert [row[1] for row in data[-1]['values']] == ["AAA", "BBB"]
+    assert data[-1]['range'] == 'Signals!A6:F7'
+    assert sync.get_stats()['pending_rows'] == 0
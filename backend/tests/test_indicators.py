@@ -0,0 +1,50 @@
+"""
+Indicator cache tests.
+"""
+import pandas as pd
+import pytest
+from benchmarks.synthetic import synthetic_frame
+from utils.indicators import calculate_rsi, calculate_support_resistance, indicator_cache
+
+
+@pytest.fixture
+def frame():
+    indicator_cache.clear()
+    df = synthetic_frame(200, seed=3)
+    df.attrs.update(symbol="TEST", interval="1h")
+    return df
+
+
+def test_cache_reuses_result_for_same_frame(frame):
+    first = calculate_rsi(frame)
+    second = calculate_rsi(frame.copy())
+    
+    pd.testing.assert_series_equal(first, second)
+    assert indicator_cache.hits == 1
+
+
+def test_forming_bar_change_recomputes(frame):
+    before = calculate_rsi(frame).iloc[-1]
+    
+    # The forming bar keeps its timestamp but its close jumps
+    moved = frame.copy()
+    moved.iloc[-1, moved.columns.get_loc('Close')] *= 1.2
+    moved.iloc[-1, moved.columns.get_loc('High')] = moved['Close'].iat[-1]
+    moved.attrs.update(frame.attrs)
+    after = calculate_rsi(moved).iloc[-1]
+    
+    uncached = calculate_rsi.__wrapped__(moved).iloc[-1]
+    assert after == pytest.approx(uncached)
+    assert after != pytest.approx(before)
+
+
+def test_mutating_a_result_does_not_change_the_cache(frame):
+    first = calculate_rsi(frame)
+    first.iloc[-1] = -1.0
+    levels = calculate_support_resistance(frame)
+    levels['support'].append(-1.0)
+    levels['resistance'] = []
+    
+    assert calculate_rsi(frame).iloc[-1] == pytest.approx(calculate_rsi.__wrapped__(frame).iloc[-1])
+    assert calculate_support_resistance(frame) == calculate_support_resistance.__wrapped__(frame)
+    assert indicator_cache.hits == 2
@@ -0,0 +1,94 @@
+"""
+Market data fetcher tests: request coalescing and cache accounting.
+"""
+import threading
+import time
+import pytest
+from benchmarks.synthetic import SyntheticProvider
+from config.settings import settings
+from utils.candle_store import CandleStore
+from utils.market_data import FrameCache, MarketDataFetcher
+
+SYMBOLS = ["AAA", "BBB"]
+
+
+@pytest.fixture
+def fetcher():
+    return MarketDataFetcher(SyntheticProvider(SYMBOLS, bars=300))
+
+
+def test_failed_download_planning_releases_claimed_keys(fetcher, tmp_path, monkeypatch):
+    fetcher.store = CandleStore(str(tmp_path))
+    
+    def broken(*args):
+        raise OSError("corrupt candle file")
+    
+    monkeypatch.setattr(fetcher, '_refresh_start', broken)
+    # 'max' reads the whole store; synthetic bars are older than a month
+    frames = fetcher.get_historical_data_many(SYMBOLS, period="max")
+    
+    # Falls back to a full download, and nobody is left holding the keys
+    assert set(frames) == set(SYMBOLS)
+    assert not any(fetcher._flights.in_flight(f"{s}_max_1h") for s in SYMBOLS)
+
+
+def test_claimed_keys_are_released_when_the_fetch_raises(fetcher, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("provider down")
+    
+    monkeypatch.setattr(fetcher.provider, 'download', broken)
+    fetcher.get_historical_data_many(SYMBOLS)
+    
+    assert not any(fetcher._flights.in_flight(f"{s}_1mo_1h") for s in SYMBOLS)
+    # Later callers fetch for themselves instead of waiting forever
+    monkeypatch.undo()
+    assert not fetcher.get_historical_data("AAA").empty
+
+
+def test_waiters_time_out_on_a_stuck_fetch(fetcher, monkeypatch):
+    monkeypatch.setattr(settings, 'data_flight_timeout', 0.2)
+    assert fetcher._flights.begin("AAA_1mo_1h") is None  # a fetch that never finishes
+    
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        fetcher.get_historical_data("AAA")
+    frames = fetcher.get_historical_data_many(SYMBOLS)
+    
+    assert time.monotonic() - started < 2
+    assert set(frames) == {"BBB"}
+
+
+def test_concurrent_callers_share_one_fetch(fetcher, monkeypatch):
+    calls = []
+    history = fetcher.provider.history
+    
+    def slow_history(*args, **kwargs):
+        calls.append(args)
+        time.sleep(0.2)
+        return history(*args, **kwargs)
+    
+    monkeypatch.setattr(fetcher.provider, 'history', slow_history)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetcher.get_historical_data("AAA"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert all(df is results[0] for df in results)
+
+
+def test_stale_entries_count_as_misses():
+    cache = FrameCache(ttl=0.05)
+    cache.put("k", SyntheticProvider(["A"], bars=10).history("A"))
+    
+    assert cache.get_fresh("k") is not None
+    time.sleep(0.06)
+    assert cache.get_fresh("k") is None
+    assert cache.get("missing") is None
+    assert cache.get("k") is not None
+    
+    stats = cache.get_stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 2
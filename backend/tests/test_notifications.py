@@ -0,0 +1,193 @@
+"""
+Notification dispatcher tests against a local stub HTTP server.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from config.settings import settings
+from utils.notifications import DiscordChannel, NotificationManager, TelegramChannel
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Records posted JSON and answers with the server's scripted responses."""
+    
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((time.monotonic(), self.path, body))
+        status, headers, payload = self.server.responses.pop(0) if self.server.responses else (200, {}, b'{"ok": true}')
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.requests = []
+    server.responses = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fast_settings(monkeypatch):
+    monkeypatch.setattr(settings, 'notify_coalesce_window', 0.2)
+    monkeypatch.setattr(settings, 'notify_backoff_base', 0.05)
+    monkeypatch.setattr(settings, 'notify_max_retries', 3)
+    monkeypatch.setattr(settings, 'notify_discord_rate', 1000.0)
+    monkeypatch.setattr(settings, 'notify_telegram_rate', 1000.0)
+
+
+def _signal(i: int, condition: str = "Breakout above resistance") -> dict:
+    return {
+        'symbol': f"SYM{i}",
+        'signal_type': "BULLISH" if i % 2 else "BEARISH",
+        'confidence': 70 + i,
+        'price': 100.0 + i,
+        'condition': condition
+    }
+
+
+def _manager(*channels) -> NotificationManager:
+    manager = NotificationManager()
+    manager.channels = list(channels)
+    return manager
+
+
+def _dispatch(manager: NotificationManager, signals):
+    async def run():
+        manager.start()
+        for signal in signals:
+            assert manager.enqueue_signal(signal)
+        await manager.stop()
+    
+    asyncio.run(run())
+
+
+def test_burst_is_sent_as_one_digest(stub):
+    manager = _manager(DiscordChannel(f"{stub.url}/webhook"))
+    _dispatch(manager, [_signal(i) for i in range(5)])
+    
+    assert len(stub.requests) == 1
+    content = stub.requests[0][2]['content']
+    assert "5 signals" in content
+    assert all(f"SYM{i}" in content for i in range(5))
+    assert manager.stats['sent'] == 1
+    assert manager.stats['queued'] == 5
+
+
+def test_single_signal_is_sent_alone(stub, monkeypatch):
+    monkeypatch.setattr(settings, 'telegram_api_url', stub.url)
+    manager = _manager(TelegramChannel("TOKEN", "42"))
+    _dispatch(manager, [_signal(1)])
+    
+    assert len(stub.requests) == 1
+    _, path, body = stub.requests[0]
+    assert path == "/botTOKEN/sendMessage"
+    assert body['chat_id'] == "42"
+    assert "SYM1" in body['text'] and "DIGEST" not in body['text']
+
+
+def test_429_waits_for_retry_after(stub):
+    stub.responses = [(429, {'Retry-After': '0.3'}, b'rate limited')]
+    manager = _manager(DiscordChannel(f"{stub.url}/webhook"))
+    _dispatch(manager, [_signal(1)])
+    
+    assert len(stub.requests) == 2
+    assert stub.requests[1][0] - stub.requests[0][0] >= 0.3
+    assert manager.stats['retries'] == 1
+    assert manager.stats['sent'] == 1
+
+
+def test_429_prefers_retry_after_in_body(stub):
+    stub.responses = [(429, {'Retry-After': '5'}, b'{"retry_after": 0.2}')]
+    manager = _manager(DiscordChannel(f"{stub.url}/webhook"))
+    started = time.monotonic()
+    _dispatch(manager, [_signal(1)])
+    
+    assert len(stub.requests) == 2
+    assert time.monotonic() - started < 3
+
+
+def test_server_errors_retry_with_backoff(stub):
+    stub.responses = [(500, {}, b''), (503, {}, b'')]
+    manager = _manager(DiscordChannel(f"{stub.url}/webhook"))
+    _dispatch(manager, [_signal(1)])
+    
+    times = [t for t, _, _ in stub.requests]
+    assert len(times) == 3
+    # Backoff doubles per attempt: at least base, then 2 * base
+    assert times[1] - times[0] >= settings.notify_backoff_base
+    assert times[2] - times[1] >= 2 * settings.notify_backoff_base
+    assert manager.stats['retries'] == 2
+    assert manager.stats['sent'] == 1
+    assert manager.stats['failed'] == 0
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.responses = [(500, {}, b'')] * 10
+    manager = _manager(DiscordChannel(f"{stub.url}/webhook"))
+    _dispatch(manager, [_signal(1)])
+    
+    assert len(stub.requests) == settings.notify_max_retries + 1
+    assert manager.stats['failed'] == 1
+    assert manager.stats['sent'] == 0
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.responses = [(400, {}, b'{"message": "bad"}')]
+    manager = _manager(DiscordChannel(f"{stub.url}/webhook"))
+    _dispatch(manager, [_signal(1)])
+    
+    assert len(stub.requests) == 1
+    assert manager.stats['failed'] == 1
+
+
+def test_digest_is_split_and_truncated_at_max_length(stub):
+    channel = DiscordChannel(f"{stub.url}/webhook")
+    channel.max_length = 300
+    manager = _manager(channel)
+    signals = [_signal(i) for i in range(8)] + [_signal(99, condition="x" * 1000)]
+    _dispatch(manager, signals)
+    
+    contents = [body['content'] for _, _, body in stub.requests]
+    assert len(contents) > 1
+    assert all(len(content) <= 300 for content in contents)
+    joined = "".join(contents)
+    assert all(f"SYM{i}" in joined for i in list(range(8)) + [99])
+
+
+def test_single_message_is_truncated_at_max_length(stub):
+    channel = DiscordChannel(f"{stub.url}/webhook")
+    channel.max_length = 120
+    manager = _manager(channel)
+    _dispatch(manager, [_signal(1, condition="y" * 500)])
+    
+    assert len(stub.requests) == 1
+    assert len(stub.requests[0][2]['content']) == 120
+
+
+def test_limiters_are_created_on_the_dispatcher_loop(stub):
+    channel = DiscordChannel(f"{stub.url}/webhook")
+    assert channel.limiter is None
+    manager = _manager(channel)
+    
+    # Two separate event loops, as after a restart
+    _dispatch(manager, [_signal(1)])
+    _dispatch(manager, [_signal(2)])
+    
+    assert len(stub.requests) == 2
+    assert manager.stats['sent'] == 2
@@ -0,0 +1,88 @@
+"""
+Optimizer tests: parameter grids, walk-forward windows, ranking, and sweeps
+matching direct backtests.
+"""
+import pandas as pd
+import pytest
+from benchmarks.synthetic import synthetic_frame
+from bots.range_scalper import RangeScalperBot
+from core.backtest import Backtester
+from core.optimizer import Optimizer, _finite, grid, load_results, rank_results, walk_forward_windows
+
+
+def test_grid_covers_every_combination_in_order():
+    assert grid({'lookback': [24, 48], 'band': [0.1, 0.2, 0.3]}) == [
+        {'lookback': 24, 'band': 0.1},
+        {'lookback': 24, 'band': 0.2},
+        {'lookback': 24, 'band': 0.3},
+        {'lookback': 48, 'band': 0.1},
+        {'lookback': 48, 'band': 0.2},
+        {'lookback': 48, 'band': 0.3}
+    ]
+    assert grid({}) == [{}]
+
+
+def test_walk_forward_windows_tile_the_history():
+    index = pd.date_range("2024-01-01", periods=100, freq="1h", tz="UTC")
+    
+    windows = walk_forward_windows(index, train_bars=40, test_bars=20)
+    
+    assert windows == [
+        (index[0], index[40], index[60]),
+        (index[20], index[60], index[80]),
+        (index[40], index[80], None)
+    ]
+
+
+def test_walk_forward_windows_with_step_and_short_history():
+    index = pd.date_range("2024-01-01", periods=100, freq="1h", tz="UTC")
+    
+    windows = walk_forward_windows(index, train_bars=50, test_bars=10, step=15)
+    
+    assert [(index.get_loc(a), index.get_loc(b)) for a, b, _ in windows] == [(0, 50), (15, 65), (30, 80)]
+    assert windows[-1][2] == index[90]
+    assert walk_forward_windows(index, train_bars=90, test_bars=20) == []
+
+
+def _result(**stats) -> dict:
+    return {'params': {}, 'stats': stats}
+
+
+def test_rank_results_orders_by_metric_direction():
+    results = [
+        _result(sharpe_ratio=0.5, max_drawdown=12.0),
+        _result(sharpe_ratio=None, max_drawdown=None),
+        _result(sharpe_ratio=1.5, max_drawdown=20.0),
+        _result(sharpe_ratio=-0.2, max_drawdown=3.0)
+    ]
+    
+    by_sharpe = rank_results(results)
+    by_drawdown = rank_results(results, 'max_drawdown')
+    
+    assert [r['stats']['sharpe_ratio'] for r in by_sharpe] == [1.5, 0.5, -0.2, None]
+    assert [r['stats']['max_drawdown'] for r in by_drawdown] == [3.0, 12.0, 20.0, None]
+    assert rank_results(results, top=1) == [results[2]]
+    with pytest.raises(ValueError):
+        rank_results(results, 'profit')
+
+
+@pytest.fixture
+def frames():
+    return {f"SYM{i}": synthetic_frame(500, seed=i) for i in range(3)}
+
+
+def test_sweep_matches_direct_backtests(frames, tmp_path):
+    optimizer = Optimizer(RangeScalperBot, frames, workers=2, results_file=str(tmp_path / "results.jsonl"))
+    candidates = grid({'lookback': [24, 48]})
+    start = optimizer.index[100]
+    end = optimizer.index[400]
+    
+    records = optimizer.sweep(candidates, start=start, end=end)
+    
+    window = {s: df[df.index < end] for s, df in frames.items()}
+    for params, record in zip(candidates, records):
+        expected = Backtester().run(RangeScalperBot(list(frames), **params), window, start).stats
+        assert record['params'] == params
+        assert record['stats'] == _finite(expected)
+    assert records[0]['stats'] != records[1]['stats']
+    assert load_results(optimizer.results_file, run_id=optimizer.run_id) == records
@@ -0,0 +1,64 @@
+"""
+Panel scanner tests: ``analyze_panel`` agrees with per-symbol ``analyze``.
+"""
+import math
+import pytest
+from benchmarks.synthetic import synthetic_frame
+from core.bar_tracker import bar_tracker
+from scanners.momentum_divergence import MomentumDivergenceScanner
+from scanners.support_resistance import SupportResistanceScanner
+from scanners.trend_alignment import TrendAlignmentScanner
+from scanners.volatility_compression import VolatilityCompressionScanner
+from scanners.volume_profile import VolumeProfileScanner
+from utils.indicators import indicator_cache
+
+SCANNERS = [
+    TrendAlignmentScanner,
+    VolatilityCompressionScanner,
+    MomentumDivergenceScanner,
+    SupportResistanceScanner,
+    VolumeProfileScanner
+]
+SYMBOLS = [f"SYM{i}" for i in range(40)]
+
+
+def _assert_close(actual, expected, path="result"):
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and actual.keys() == expected.keys(), path
+        for key in expected:
+            _assert_close(actual[key], expected[key], f"{path}[{key!r}]")
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            _assert_close(a, e, f"{path}[{i}]")
+    elif isinstance(expected, float) and not isinstance(expected, bool):
+        assert math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9) or (
+            math.isnan(actual) and math.isnan(expected)), f"{path}: {actual} != {expected}"
+    else:
+        assert actual == expected, path
+
+
+@pytest.mark.parametrize("bars", [120, 400, 720])
+@pytest.mark.parametrize("scanner_class", SCANNERS, ids=lambda cls: cls.__name__)
+def test_panel_path_matches_per_symbol_analysis(scanner_class, bars, monkeypatch):
+    scanner = scanner_class(SYMBOLS)
+    assert scanner.supports_panel
+    frames = {}
+    for i, symbol in enumerate(SYMBOLS):
+        # Uneven lengths exercise the panel's padding
+        df = synthetic_frame(bars - i % 7, seed=i)
+        df.attrs.update(symbol=symbol, interval="1h")
+        frames[symbol] = df
+    
+    indicator_cache.clear()
+    bar_tracker.clear()
+    panel_results = scanner.evaluate(frames=frames)
+    if bars == 720:
+        assert panel_results, "the universe should produce signals"
+    
+    indicator_cache.clear()
+    bar_tracker.clear()
+    monkeypatch.setattr(scanner_class, 'supports_panel', False)
+    symbol_results = scanner.evaluate(frames=frames)
+    
+    _assert_close(panel_results, symbol_results)
@@ -0,0 +1,59 @@
+"""
+Portfolio tests: running totals, the trade ledger and snapshot restore.
+"""
+import pytest
+from config.settings import settings
+from core.portfolio import Portfolio
+
+STATS = [
+    'cash', 'portfolio_value', 'total_pnl', 'total_pnl_pct', 'max_drawdown', 'sharpe_ratio',
+    'sortino_ratio', 'win_rate', 'total_trades', 'open_positions', 'exposure_pct'
+]
+
+
+@pytest.fixture
+def small_ledger(monkeypatch):
+    # Two trades in memory, so later ones evict earlier ones to the database
+    monkeypatch.setattr(settings, 'trade_ledger_window', 2)
+
+
+def _stats(portfolio: Portfolio) -> dict:
+    stats = portfolio.get_stats()
+    return {name: stats[name] for name in STATS}
+
+
+def test_restore_matches_the_portfolio_before_restart(database, small_ledger):
+    portfolio = Portfolio()
+    for symbol, price in (("AAA", 100.0), ("BBB", 50.0), ("CCC", 20.0), ("DDD", 10.0)):
+        assert portfolio.open_position(symbol, 4000.0 / price, price, bot_id="test")
+    portfolio.update_positions({"AAA": 104.0, "BBB": 47.0, "CCC": 21.0, "DDD": 9.5})
+    portfolio.close_position("AAA", 104.0, "take profit")
+    portfolio.close_position("BBB", 47.0, "stop loss")
+    portfolio.save_snapshot()
+    portfolio.close_position("CCC", 22.0, "take profit")
+    
+    restored = Portfolio()
+    restored.restore()
+    
+    assert _stats(restored) == pytest.approx(_stats(portfolio))
+    assert restored.positions["DDD"].current_price == 9.5
+    assert restored.trades.evicted == portfolio.trades.evicted == 1
+    assert restored.verify_totals()
+    assert portfolio.verify_totals()
+
+
+def test_restart_does_not_raise_drawdown(database):
+    portfolio = Portfolio()
+    portfolio.open_position("AAA", 40.0, 100.0, bot_id="test")
+    portfolio.update_positions({"AAA": 110.0})
+    portfolio.close_position("AAA", 105.0, "take profit")
+    portfolio.open_position("BBB", 40.0, 100.0, bot_id="test")
+    portfolio.update_positions({"BBB": 120.0})
+    portfolio.save_snapshot()
+    assert portfolio.max_drawdown == 0.0
+    
+    restored = Portfolio()
+    restored.restore()
+    
+    assert restored.max_drawdown == 0.0
+    assert restored.get_portfolio_value() == pytest.approx(portfolio.get_portfolio_value())
@@ -0,0 +1,51 @@
+"""
+Signal writer tests: a failed flush is retried without losing or duplicating rows.
+"""
+from datetime import datetime
+from sqlalchemy.orm import Session
+from core.signal_writer import SignalWriter
+from models.database import SessionLocal
+from models.signal import Signal
+
+
+def _signals(symbols):
+    return [
+        Signal(
+            timestamp=datetime(2024, 1, 1), scanner_id="test", scanner_name="Test", symbol=symbol,
+            signal_type="BULLISH", confidence=50.0, price=100.0, indicators="{}", condition="test"
+        )
+        for symbol in symbols
+    ]
+
+
+def test_failed_flush_writes_every_row_once_on_retry(database, monkeypatch):
+    writer = SignalWriter()
+    insert = Session.bulk_insert_mappings
+    calls = []
+    
+    def insert_then_fail(self, mapper, mappings, *args, **kwargs):
+        # The rows reach the transaction before the failure, so rollback must undo them
+        insert(self, mapper, mappings, *args, **kwargs)
+        calls.append(len(mappings))
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+    
+    monkeypatch.setattr(Session, 'bulk_insert_mappings', insert_then_fail)
+    writer.add(_signals(["AAA", "BBB"]))
+    
+    assert writer.flush() == 0
+    assert writer.pending() == 2
+    assert writer.failed_flushes == 1
+    
+    writer.add(_signals(["CCC"]))
+    assert writer.flush() == 3
+    
+    db = SessionLocal()
+    try:
+        symbols = sorted(symbol for (symbol,) in db.query(Signal.symbol))
+    finally:
+        db.close()
+    assert symbols == ["AAA", "BBB", "CCC"]
+    assert writer.pending() == 0
+    assert writer.rows_written == 3
+    assert calls == [2, 3]
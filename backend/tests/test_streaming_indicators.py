@@ -0,0 +1,149 @@
+"""
+Streaming indicators must match the batch ``calculate_*`` functions.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import synthetic_frame
+from utils import indicators
+from utils.streaming_indicators import (
+    StreamingADX,
+    StreamingATR,
+    StreamingBollingerBands,
+    StreamingEMA,
+    StreamingIndicatorBank,
+    StreamingMACD,
+    StreamingRSI,
+    StreamingSMA,
+    StreamingVWAP,
+    default_indicators
+)
+
+BARS = 600
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# (streaming factory, batch function, batch kwargs)
+CASES = {
+    'ema': (lambda: StreamingEMA(20), indicators.calculate_ema, {'period': 20}),
+    'sma': (lambda: StreamingSMA(20), indicators.calculate_sma, {'period': 20}),
+    'rsi': (lambda: StreamingRSI(14), indicators.calculate_rsi, {}),
+    'macd': (lambda: StreamingMACD(12, 26, 9), indicators.calculate_macd, {}),
+    'bollinger': (lambda: StreamingBollingerBands(20, 2), indicators.calculate_bollinger_bands, {}),
+    'atr': (lambda: StreamingATR(14), indicators.calculate_atr, {}),
+    'adx': (lambda: StreamingADX(14), indicators.calculate_adx, {}),
+    'vwap': (lambda: StreamingVWAP(), indicators.calculate_vwap, {})
+}
+
+# Batch name and kwargs for each ``default_indicators`` entry
+DEFAULTS = {
+    'ema_20': ('calculate_ema', {'period': 20}),
+    'ema_50': ('calculate_ema', {'period': 50}),
+    'ema_200': ('calculate_ema', {'period': 200}),
+    'sma_20': ('calculate_sma', {'period': 20}),
+    'rsi': ('calculate_rsi', {}),
+    'macd': ('calculate_macd', {}),
+    'bollinger': ('calculate_bollinger_bands', {}),
+    'atr': ('calculate_atr', {}),
+    'adx': ('calculate_adx', {}),
+    'vwap': ('calculate_vwap', {})
+}
+
+
+def _bars(df: pd.DataFrame):
+    return [dict(zip(COLUMNS, row)) for row in df[COLUMNS].to_numpy(dtype=float)]
+
+
+def _assert_matches(streamed, batch, rows=None):
+    """Compare streamed values (floats or dicts) against a batch series/dict of series."""
+    if isinstance(batch, dict):
+        for key, series in batch.items():
+            _assert_matches([v[key] for v in streamed], series, rows)
+        return
+    expected = batch.to_numpy(dtype=float)
+    if rows is not None:
+        expected = expected[rows]
+    np.testing.assert_allclose(np.asarray(streamed, dtype=float), expected, rtol=1e-9, atol=1e-8, equal_nan=True)
+
+
+@pytest.fixture(scope="module")
+def frame():
+    # Untagged frames bypass the indicator cache
+    return synthetic_frame(BARS, seed=11)
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_streaming_matches_batch(frame, name):
+    factory, batch, kwargs = CASES[name]
+    indicator = factory()
+    streamed = [indicator.update(bar) for bar in _bars(frame)]
+    
+    _assert_matches(streamed, batch(frame, **kwargs))
+
+
+def test_zero_volume_window_matches_batch():
+    df = synthetic_frame(200, seed=2)
+    df.iloc[50:80, df.columns.get_loc('Volume')] = 0.0
+    indicator = StreamingVWAP()
+    streamed = [indicator.update(bar) for bar in _bars(df)]
+    
+    _assert_matches(streamed, indicators.calculate_vwap(df))
+
+
+def _assert_bank_matches(values, df):
+    for name, (function, kwargs) in DEFAULTS.items():
+        batch = getattr(indicators, function)(df, **kwargs)
+        _assert_matches([values[name]], batch, rows=[-1])
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_rollback_undoes_one_update(frame, name):
+    factory, batch, kwargs = CASES[name]
+    indicator = factory()
+    streamed = []
+    for bar in _bars(frame):
+        # Every bar first arrives in a different shape, including across window reseeds
+        indicator.checkpoint()
+        indicator.update({column: value * 1.03 for column, value in bar.items()})
+        indicator.rollback()
+        streamed.append(indicator.update(bar))
+    
+    _assert_matches(streamed, batch(frame, **kwargs))
+
+
+def test_bank_sync_feeds_only_new_bars(frame):
+    bank = StreamingIndicatorBank()
+    bank.sync("TEST", frame.iloc[:400])
+    values = bank.sync("TEST", frame)
+    
+    _assert_bank_matches(values, frame)
+    assert bank.latest("TEST") is values
+
+
+def test_bank_reapplies_forming_bar(frame):
+    bank = StreamingIndicatorBank()
+    bank.sync("TEST", frame.iloc[:-1])
+    
+    # The last bar arrives three times as it forms; only the final version counts
+    forming = frame.copy()
+    for scale in (0.97, 1.04, 1.01):
+        close = frame['Close'].iat[-1] * scale
+        forming.iloc[-1, forming.columns.get_loc('Close')] = close
+        forming.iloc[-1, forming.columns.get_loc('High')] = max(frame['High'].iat[-1], close)
+        forming.iloc[-1, forming.columns.get_loc('Low')] = min(frame['Low'].iat[-1], close)
+        forming.iloc[-1, forming.columns.get_loc('Volume')] = frame['Volume'].iat[-1] * scale
+        values = bank.sync("TEST", forming)
+    
+    _assert_bank_matches(values, forming)
+
+
+def test_bank_ignores_older_bars(frame):
+    bank = StreamingIndicatorBank()
+    values = bank.sync("TEST", frame)
+    stale = dict(zip(COLUMNS, frame[COLUMNS].iloc[0].to_numpy(dtype=float)))
+    
+    assert bank.update("TEST", frame.index[0], stale) is values
+
+
+def test_default_set_covers_every_streaming_class():
+    kinds = {type(indicator) for indicator in default_indicators().values()}
+    assert kinds == {type(factory()) for factory, _, _ in CASES.values()}
@@ -0,0 +1,72 @@
+"""
+Volume profile tests against the row-by-row implementation it replaced.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.suite import _volume_profile_iterrows
+from benchmarks.synthetic import synthetic_frame
+from utils.indicators import calculate_volume_profile
+
+
+def _expand(histogram: np.ndarray, poc: int, pct: float) -> tuple:
+    """Plain-loop value area: grow toward the larger neighbour, upper on ties."""
+    low = high = poc
+    held = histogram[poc]
+    while held < histogram.sum() * pct and (low > 0 or high < len(histogram) - 1):
+        below = histogram[low - 1] if low > 0 else -1.0
+        above = histogram[high + 1] if high < len(histogram) - 1 else -1.0
+        if above >= below:
+            high += 1
+            held += above
+        else:
+            low -= 1
+            held += below
+    return low, high
+
+
+@pytest.mark.parametrize("bars,seed", [(50, 0), (200, 1), (720, 2), (5000, 3)])
+def test_poc_and_distribution_match_reference(bars, seed):
+    df = synthetic_frame(bars, seed=seed)
+    expected = _volume_profile_iterrows(df)
+    
+    result = calculate_volume_profile.__wrapped__(df)
+    
+    assert result['poc'] == pytest.approx(expected['poc'])
+    assert result['volume_distribution'].keys() == expected['volume_distribution'].keys()
+    for price_bin, volume in expected['volume_distribution'].items():
+        assert result['volume_distribution'][price_bin] == pytest.approx(volume)
+
+
+@pytest.mark.parametrize("bars,seed", [(50, 0), (200, 1), (720, 2), (5000, 3)])
+def test_value_area_expands_from_poc(bars, seed):
+    df = synthetic_frame(bars, seed=seed)
+    result = calculate_volume_profile.__wrapped__(df)
+    
+    histogram = np.zeros(51)
+    for price_bin, volume in result['volume_distribution'].items():
+        histogram[price_bin] = volume
+    price_min = df['Low'].min()
+    bin_size = (df['High'].max() - price_min) / 50
+    low, high = _expand(histogram, int(np.argmax(histogram)), 0.7)
+    
+    assert result['val'] == pytest.approx(price_min + low * bin_size)
+    assert result['vah'] == pytest.approx(price_min + high * bin_size)
+    assert histogram[low:high + 1].sum() >= 0.7 * histogram.sum()
+
+
+def test_single_peak_value_area_matches_reference():
+    # Volume falls off on both sides of the POC, so the highest-volume bins
+    # are also the contiguous ones and both definitions agree
+    close = np.linspace(90.0, 110.0, 201)
+    volume = np.exp(-((close - 101.0) / 3.0) ** 2) * 1e6
+    df = pd.DataFrame(
+        {'Open': close, 'High': close + 0.05, 'Low': close - 0.05, 'Close': close, 'Volume': volume},
+        index=pd.date_range("2024-01-01", periods=len(close), freq="1h", tz="UTC")
+    )
+    expected = _volume_profile_iterrows(df)
+    
+    result = calculate_volume_profile.__wrapped__(df)
+    
+    for field in ('poc', 'val', 'vah'):
+        assert result[field] == pytest.approx(expected[field])
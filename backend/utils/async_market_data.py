@@ -0,0 +1,128 @@
+"""
+Async access to market data providers.
+"""
+import asyncio
+import random
+from typing import Dict, List, Optional
+import pandas as pd
+from utils.data_providers import MarketDataProvider
+from utils.rate_limiter import RateLimiter
+
+
+class AsyncMarketDataClient:
+    """
+    Awaitable market data access that never blocks the event loop.
+    
+    Provider calls run in worker threads under a concurrency bound and the
+    provider's rate limit. Each attempt has a timeout, and failed attempts
+    are retried with exponential backoff and jitter.
+    """
+    
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        max_concurrency: int = 8,
+        rate: float = 5.0,
+        timeout: float = 20.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5
+    ):
+        self.provider = provider
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.limiter = RateLimiter(rate, burst=max_concurrency)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats = {'requests': 0, 'retries': 0, 'timeouts': 0, 'failures': 0}
+    
+    async def _call(self, func, *args, **kwargs):
+        """Run a blocking provider call with concurrency, rate, timeout and retry limits."""
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                await self.limiter.acquire()
+                self.stats['requests'] += 1
+                try:
+                    # The worker thread can't be interrupted; a timed-out call is abandoned
+                    return await asyncio.wait_for(asyncio.to_thread(func, *args, **kwargs), self.timeout)
+                except asyncio.TimeoutError as e:
+                    self.stats['timeouts'] += 1
+                    error = e
+                except Exception as e:
+                    error = e
+            
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.backoff_base * 2 ** attempt * (1 + random.random()))
+        
+        self.stats['failures'] += 1
+        raise error
+    
+    async def get_history(
+        self,
+        symbol: str,
+        period: Optional[str] = "1mo",
+        interval: str = "1h",
+        start: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """Get OHLCV bars for one symbol (see ``MarketDataProvider.history``)."""
+        df = await self._call(self.provider.history, symbol, period=period, interval=interval, start=start)
+        df.attrs.update(symbol=symbol, interval=interval)
+        return df
+    
+    async def get_history_many(
+        self,
+        symbols: List[str],
+        period: Optional[str] = "1mo",
+        interval: str = "1h"
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Get OHLCV bars for many symbols concurrently.
+        
+        Returns:
+            Dict mapping symbol to DataFrame; symbols that failed after all
+            retries are reported and left out
+        """
+        results = await asyncio.gather(
+            *(self.get_history(s, period=period, interval=interval) for s in symbols),
+            return_exceptions=True
+        )
+        frames = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching history for {symbol}: {result}")
+            else:
+                frames[symbol] = result
+        return frames
+    
+    async def get_realtime_data(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get intraday snapshots for multiple symbols concurrently.
+        
+        Returns:
+            Dict mapping symbol to data dict with price, volume, etc.
+            (None for symbols that failed)
+        """
+        results = await asyncio.gather(
+            *(self._call(self.provider.history, s, period="1d", interval="1m") for s in symbols),
+            return_exceptions=True
+        )
+        
+        data = {}
+        for symbol, hist in zip(symbols, results):
+            if isinstance(hist, Exception):
+                print(f"Error fetching realtime data for {symbol}: {hist}")
+                data[symbol] = None
+            elif not hist.empty:
+                data[symbol] = {
+                    'price': float(hist['Close'].iloc[-1]),
+                    'volume': float(hist['Volume'].iloc[-1]),
+                    'open': float(hist['Open'].iloc[0]),
+                    'high': float(hist['High'].max()),
+                    'low': float(hist['Low'].min()),
+                    'change_pct': ((hist['Close'].iloc[-1] - hist['Open'].iloc[0]) / hist['Open'].iloc[0]) * 100
+                }
+        return data
+    
+    def get_stats(self) -> Dict:
+        """Get request statistics."""
+        return {'provider': self.provider.name, **self.stats}
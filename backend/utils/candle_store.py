@@ -0,0 +1,270 @@
+"""
+On-disk candle store backed by memory-mapped NumPy record files.
+"""
+import json
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from datetime import datetime, timedelta
+
+
+# One fixed-size record per bar; timestamps are UTC epoch nanoseconds.
+# Corporate action columns are zero when the source frame has none.
+CANDLE_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('Open', '<f8'),
+    ('High', '<f8'),
+    ('Low', '<f8'),
+    ('Close', '<f8'),
+    ('Volume', '<f8'),
+    ('Dividends', '<f8'),
+    ('Stock Splits', '<f8'),
+    ('Capital Gains', '<f8')
+])
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+ACTION_COLUMNS = ['Dividends', 'Stock Splits', 'Capital Gains']
+
+# Bumped when CANDLE_DTYPE changes; files of other versions are ignored
+STORE_VERSION = 2
+
+# Approximate lookback for yfinance period strings
+PERIOD_DAYS = {
+    '1d': 1,
+    '5d': 5,
+    '1mo': 30,
+    '3mo': 91,
+    '6mo': 182,
+    '1y': 365,
+    '2y': 730,
+    '5y': 1826,
+    '10y': 3652
+}
+
+
+def period_start(period: str) -> Optional[pd.Timestamp]:
+    """
+    Get the UTC start of the window covered by a yfinance period string.
+    
+    Returns:
+        Timestamp, or None for 'max' and unknown periods (no lower bound)
+    """
+    now = pd.Timestamp(datetime.utcnow(), tz='UTC')
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1, tz='UTC')
+    days = PERIOD_DAYS.get(period)
+    if days is None:
+        return None
+    return now - timedelta(days=days)
+
+
+class CandleStore:
+    """
+    Append-only OHLCV store keyed by (symbol, interval).
+    
+    Each key is a flat binary file of ``CANDLE_DTYPE`` records sorted by
+    timestamp. Reads memory-map the file and slice it with a binary search,
+    and refreshes append only the bars newer than the last stored one. A
+    small JSON sidecar keeps the source frame's timezone and which corporate
+    action columns it had, so reads return frames shaped like the provider's.
+    
+    Access to a key is serialized per file within the process. Appends
+    overwrite the tail in place only when the file does not shrink; anything
+    that would shrink it (a shorter rewrite, ``replace``) writes a new file
+    and swaps it in with ``os.replace``, so a mapping held elsewhere never
+    loses pages underneath it.
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+    
+    def _path(self, symbol: str, interval: str) -> str:
+        safe_symbol = symbol.replace(os.sep, '_').replace('/', '_')
+        return os.path.join(self.root, interval, f"{safe_symbol}.v{STORE_VERSION}.bin")
+    
+    def _meta_path(self, symbol: str, interval: str) -> str:
+        return self._path(symbol, interval)[:-len('.bin')] + '.json'
+    
+    def _lock(self, path: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(path)
+            if lock is None:
+                lock = self._locks[path] = threading.Lock()
+            return lock
+    
+    def _read_meta(self, symbol: str, interval: str) -> Dict:
+        try:
+            with open(self._meta_path(symbol, interval)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'tz': None, 'actions': []}
+    
+    def _write_meta(self, symbol: str, interval: str, df: pd.DataFrame):
+        tz = getattr(df.index, 'tz', None)
+        meta = {
+            'tz': str(tz) if tz is not None else None,
+            'actions': [col for col in ACTION_COLUMNS if col in df.columns]
+        }
+        if meta != self._read_meta(symbol, interval):
+            _write_atomic(self._meta_path(symbol, interval), json.dumps(meta).encode())
+    
+    def _open(self, symbol: str, interval: str) -> Optional[np.memmap]:
+        path = self._path(symbol, interval)
+        if not os.path.exists(path) or os.path.getsize(path) < CANDLE_DTYPE.itemsize:
+            return None
+        return np.memmap(path, dtype=CANDLE_DTYPE, mode='r')
+    
+    def first_timestamp(self, symbol: str, interval: str) -> Optional[pd.Timestamp]:
+        """Get the timestamp of the oldest stored bar."""
+        records = self._open(symbol, interval)
+        if records is None:
+            return None
+        return pd.Timestamp(int(records['ts'][0]), unit='ns', tz='UTC')
+    
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[pd.Timestamp]:
+        """Get the timestamp of the newest stored bar."""
+        records = self._open(symbol, interval)
+        if records is None:
+            return None
+        return pd.Timestamp(int(records['ts'][-1]), unit='ns', tz='UTC')
+    
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """
+        Read stored bars as an OHLCV DataFrame.
+        
+        Args:
+            symbol: Stock symbol
+            interval: Bar interval
+            start: Only return bars at or after this timestamp
+        
+        Returns:
+            DataFrame with OHLCV columns plus any corporate action columns
+            the source had, indexed in the source's timezone (UTC if it was
+            naive); empty if nothing is stored
+        """
+        meta = self._read_meta(symbol, interval)
+        columns = OHLCV_COLUMNS + meta['actions']
+        with self._lock(self._path(symbol, interval)):
+            records = self._open(symbol, interval)
+            if records is None:
+                return pd.DataFrame(columns=columns)
+            
+            offset = 0
+            if start is not None:
+                offset = int(np.searchsorted(records['ts'], _to_ns(start)))
+            chunk = np.array(records[offset:])
+            del records
+        
+        index = pd.to_datetime(chunk['ts'], unit='ns', utc=True)
+        if meta['tz'] is not None:
+            index = index.tz_convert(meta['tz'])
+        return pd.DataFrame({col: chunk[col] for col in columns}, index=index)
+    
+    def append(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Append bars, overwriting any stored bars at or after the first new one.
+        
+        The last stored bar is usually still forming when it is written, so
+        the overlapping tail is truncated and replaced by the fresh values.
+        
+        Returns:
+            Number of bars written
+        """
+        new_records = to_records(df)
+        if len(new_records) == 0:
+            return 0
+        
+        path = self._path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        with self._lock(path):
+            keep = 0
+            stored = 0
+            records = self._open(symbol, interval)
+            if records is not None:
+                stored = len(records)
+                keep = int(np.searchsorted(records['ts'], new_records['ts'][0]))
+                kept = np.array(records[:keep]) if keep + len(new_records) < stored else None
+                del records
+            
+            if keep + len(new_records) >= stored:
+                # Only the tail changes and the file never shrinks
+                with open(path, 'r+b' if stored else 'wb') as f:
+                    f.seek(keep * CANDLE_DTYPE.itemsize)
+                    f.write(new_records.tobytes())
+            else:
+                _write_atomic(path, np.concatenate([kept, new_records]).tobytes())
+            self._write_meta(symbol, interval, df)
+        
+        return len(new_records)
+    
+    def replace(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """Replace everything stored for a key with the given bars."""
+        new_records = to_records(df)
+        path = self._path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock(path):
+            _write_atomic(path, new_records.tobytes())
+            self._write_meta(symbol, interval, df)
+        return len(new_records)
+    
+    def clear(self, symbol: str, interval: str):
+        """Delete stored bars for a key."""
+        path = self._path(symbol, interval)
+        with self._lock(path):
+            for target in (path, self._meta_path(symbol, interval)):
+                if os.path.exists(target):
+                    os.remove(target)
+
+
+def _write_atomic(path: str, data: bytes):
+    """Write a file next to ``path`` and swap it in, so readers see old or new contents."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _to_ns(ts: pd.Timestamp) -> int:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return int(ts.tz_convert('UTC').as_unit('ns').value)
+
+
+def to_records(df: pd.DataFrame) -> np.ndarray:
+    """Convert an OHLCV DataFrame into sorted, de-duplicated candle records."""
+    if df is None or df.empty:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    
+    df = df.dropna(subset=['Close'])
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    ts = index.tz_convert('UTC').as_unit('ns').asi8
+    
+    records = np.zeros(len(df), dtype=CANDLE_DTYPE)
+    records['ts'] = ts
+    for col in OHLCV_COLUMNS:
+        records[col] = df[col].to_numpy(dtype='f8')
+    for col in ACTION_COLUMNS:
+        if col in df.columns:
+            records[col] = df[col].fillna(0.0).to_numpy(dtype='f8')
+    
+    records = records[np.argsort(records['ts'], kind='stable')]
+    # Keep the last occurrence of any repeated timestamp
+    _, last = np.unique(records['ts'][::-1], return_index=True)
+    return records[len(records) - 1 - last]
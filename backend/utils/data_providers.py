@@ -0,0 +1,211 @@
+"""
+Pluggable market data providers.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+import pandas as pd
+import yfinance as yf
+from config.settings import settings
+from utils.candle_store import period_start
+
+
+class MarketDataProvider(ABC):
+    """
+    Source of OHLCV bars.
+    
+    Providers are plain blocking callables; caching, request coalescing and
+    async access are layered on top by ``MarketDataFetcher`` and
+    ``AsyncMarketDataClient``, so a provider only has to fetch.
+    """
+    
+    name = "base"
+    local = False  # bars already live on local disk (the candle store is skipped)
+    
+    @abstractmethod
+    def history(
+        self,
+        symbol: str,
+        period: Optional[str] = None,
+        interval: str = "1h",
+        start: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """
+        Get OHLCV bars for one symbol.
+        
+        Args:
+            symbol: Stock symbol
+            period: Lookback period (yfinance period string); ignored if
+                ``start`` is given
+            interval: Bar interval
+            start: Only return bars at or after this timestamp
+        
+        Returns:
+            DataFrame with Open/High/Low/Close/Volume columns (empty if none)
+        """
+        pass
+    
+    def download(
+        self,
+        symbols: List[str],
+        period: Optional[str] = None,
+        interval: str = "1h",
+        start: Optional[pd.Timestamp] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Get OHLCV bars for many symbols (one request where the source allows).
+        
+        Returns:
+            Dict mapping symbol to DataFrame; symbols without data may be missing
+        """
+        return {
+            symbol: self.history(symbol, period=period, interval=interval, start=start)
+            for symbol in symbols
+        }
+    
+    def quotes(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Get the latest trade price for many symbols in one request.
+        
+        The default takes the last close of today's 1-minute bars from a
+        single ``download``; providers with a real quote endpoint can
+        override it.
+        
+        Returns:
+            Dict mapping symbol to price; symbols without a usable price are
+            left out
+        """
+        prices = {}
+        for symbol, df in self.download(symbols, period="1d", interval="1m").items():
+            if df is None or df.empty or 'Close' not in df:
+                continue
+            close = df['Close'].dropna()
+            if not close.empty:
+                prices[symbol] = float(close.iloc[-1])
+        return prices
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance through yfinance."""
+    
+    name = "yfinance"
+    
+    def history(
+        self,
+        symbol: str,
+        period: Optional[str] = None,
+        interval: str = "1h",
+        start: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, interval=interval)
+        return ticker.history(period=period or "1mo", interval=interval)
+    
+    def download(
+        self,
+        symbols: List[str],
+        period: Optional[str] = None,
+        interval: str = "1h",
+        start: Optional[pd.Timestamp] = None
+    ) -> Dict[str, pd.DataFrame]:
+        window = {'start': start} if start is not None else {'period': period or "1mo"}
+        data = yf.download(
+            tickers=symbols,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=True,
+            actions=True,
+            threads=True,
+            progress=False,
+            **window
+        )
+        if data is None or data.empty:
+            return {}
+        return {symbol: self._extract_symbol_frame(data, symbol) for symbol in symbols}
+    
+    @staticmethod
+    def _extract_symbol_frame(data: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        """Pull one symbol's OHLCV columns out of a grouped ``yf.download`` result."""
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                return pd.DataFrame()
+            df = data[symbol]
+        else:
+            df = data
+        
+        # Rows only exist for other symbols' timestamps when calendars differ
+        return df.dropna(how="all").copy()
+
+
+class FileProvider(MarketDataProvider):
+    """
+    Replays bars from CSV files, for tests, benchmarks and offline runs.
+    
+    Bars are read from ``{root}/{interval}/{symbol}.csv`` with a timestamp
+    first column and Open/High/Low/Close/Volume columns. Periods are
+    measured back from the file's last bar rather than from now, so a
+    fixture returns the same window whenever it is read.
+    """
+    
+    name = "file"
+    local = True
+    
+    def __init__(self, root: str):
+        self.root = root
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+    
+    def _load(self, symbol: str, interval: str) -> pd.DataFrame:
+        path = os.path.join(self.root, interval, f"{symbol}.csv")
+        with self._lock:
+            if path not in self._frames:
+                if os.path.exists(path):
+                    df = pd.read_csv(path, index_col=0)
+                    df.index = pd.to_datetime(df.index, utc=True)
+                    df = df.sort_index()
+                else:
+                    df = pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+                self._frames[path] = df
+            return self._frames[path]
+    
+    def history(
+        self,
+        symbol: str,
+        period: Optional[str] = None,
+        interval: str = "1h",
+        start: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        df = self._load(symbol, interval)
+        if df.empty:
+            return df.copy()
+        
+        if start is not None:
+            start = pd.Timestamp(start)
+            if start.tzinfo is None:
+                start = start.tz_localize('UTC')
+            return df[df.index >= start].copy()
+        
+        window_start = period_start(period or "1mo")
+        if window_start is None:
+            return df.copy()
+        lookback = pd.Timestamp(datetime.utcnow(), tz='UTC') - window_start
+        return df[df.index >= df.index[-1] - lookback].copy()
+
+
+def get_provider(name: Optional[str] = None) -> MarketDataProvider:
+    """
+    Create the configured market data provider.
+    
+    Args:
+        name: Provider name ('yfinance' or 'file'); defaults to
+            ``settings.market_data_provider``
+    """
+    name = name or settings.market_data_provider
+    if name == "file":
+        return FileProvider(settings.market_data_dir)
+    if name == "yfinance":
+        return YFinanceProvider()
+    raise ValueError(f"Unknown market data provider: {name}")
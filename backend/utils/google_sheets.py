@@ -1,28 +1,63 @@
 import os
+import asyncio
 import logging
+import threading
+import time
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from config.settings import settings
-from typing import List, Dict
+from utils.metrics import component_seconds
+from typing import List, Dict, Optional
 
 logger = logging.getLogger("google_sheets")
 
+SCANNER_HEADER = ["ID", "Name", "Status", "Last Scan", "Signals Generated"]
+SIGNAL_HEADER = ["Time", "Symbol", "Type", "Confidence", "Price", "Condition"]
+
+# Quota and transient server errors worth backing off on
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
 class GoogleSheetsSync:
+    """
+    Delta sync of scanners and signals to a Google Sheet.
+    
+    ``sync_scanners`` and ``sync_signals`` only stage changes in memory and
+    never touch the network. A background worker flushes everything staged
+    since the last flush as a single ``values.batchUpdate``: scanner rows
+    that changed since they were last written, and new signal rows placed
+    after the last written one. Failed flushes keep their changes staged
+    and back off exponentially.
+    """
+
     def __init__(self):
         self.spreadsheet_id = settings.google_sheet_id
         self.creds_file = settings.google_sheets_credentials_file
         self.service = None
         self._authenticate()
+        
+        self._lock = threading.Lock()
+        self._scanner_rows: Dict[str, int] = {}  # scanner id -> sheet row
+        self._written_scanners: Dict[int, list] = {}  # sheet row -> values last written
+        self._pending_scanners: Dict[int, list] = {}
+        self._pending_signals: List[list] = []
+        self._signals_next_row: Optional[int] = None
+        
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'flushes': 0, 'api_calls': 0, 'rows_written': 0, 'failed_flushes': 0, 'dropped_rows': 0}
 
     def _authenticate(self):
         if not self.spreadsheet_id:
             logger.warning("GOOGLE_SHEET_ID not set. Google Sheets sync disabled.")
             return
-
+        
         if not os.path.exists(self.creds_file):
             logger.warning(f"Credentials file {self.creds_file} not found. Google Sheets sync disabled.")
             return
-
+        
         try:
             scopes = ['https://www.googleapis.com/auth/spreadsheets']
             creds = service_account.Credentials.from_service_account_file(
@@ -33,39 +68,36 @@ class GoogleSheetsSync:
             logger.error(f"Failed to authenticate with Google Sheets: {e}")
 
     def sync_scanners(self, scanners: List[Dict]):
+        """Stage scanner rows that differ from what the sheet already has."""
         if not self.service:
             return
-
-        try:
-            values = [["ID", "Name", "Status", "Last Scan", "Signals Generated"]]
+        
+        with self._lock:
+            if 1 not in self._written_scanners:
+                self._pending_scanners[1] = SCANNER_HEADER
+            
             for s in scanners:
-                values.append([
+                row = self._scanner_rows.setdefault(s.get('id'), len(self._scanner_rows) + 2)
+                values = [
                     s.get('id'),
                     s.get('name'),
                     'Active' if s.get('active') else 'Inactive',
                     s.get('last_scan'),
                     s.get('signals_generated')
-                ])
-
-            body = {'values': values}
-            range_name = 'Scanners!A1'
-            
-            # Ensure the sheet exists or handle error
-            self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id, range=range_name,
-                valueInputOption='RAW', body=body).execute()
-            logger.info("Synced scanners to Google Sheets")
-        except Exception as e:
-            logger.error(f"Error syncing scanners: {e}")
+                ]
+                if self._written_scanners.get(row) != values:
+                    self._pending_scanners[row] = values
+                else:
+                    self._pending_scanners.pop(row, None)
 
     def sync_signals(self, signals: List[Dict]):
+        """Stage new signal rows to be appended below the written ones."""
         if not self.service:
             return
-
-        try:
-            values = [["Time", "Symbol", "Type", "Confidence", "Price", "Condition"]]
+        
+        with self._lock:
             for s in signals:
-                values.append([
+                self._pending_signals.append([
                     s.get('timestamp'),
                     s.get('symbol'),
                     s.get('signal_type'),
@@ -73,17 +105,123 @@ class GoogleSheetsSync:
                     s.get('price'),
                     s.get('condition')
                 ])
+            
+            overflow = len(self._pending_signals) - settings.sheets_max_pending_rows
+            if overflow > 0:
+                del self._pending_signals[:overflow]
+                self.stats['dropped_rows'] += overflow
+                logger.warning(f"Sheets sync backlog full, dropped {overflow} oldest signal rows")
+
+    def _find_signals_next_row(self) -> int:
+        """Find the first empty row of the Signals tab (one API call, first flush only)."""
+        result = self.service.spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id, range='Signals!A:A').execute()
+        self.stats['api_calls'] += 1
+        return len(result.get('values', [])) + 1
 
-            body = {'values': values}
-            # We use Append to keep history for signals
-            range_name = 'Signals!A1'
+    def flush(self) -> int:
+        """
+        Write everything staged in one batchUpdate (blocking).
+        
+        Returns:
+            Number of rows written (0 if nothing was staged, the sync is
+            backing off, or the write failed)
+        """
+        if not self.service or time.monotonic() < self._retry_at:
+            return 0
+        
+        with self._lock:
+            scanners = dict(self._pending_scanners)
+            signals = self._pending_signals
+            self._pending_signals = []
+        if not scanners and not signals:
+            return 0
+        
+        try:
+            data = [
+                {'range': f'Scanners!A{row}:E{row}', 'values': [values]}
+                for row, values in sorted(scanners.items())
+            ]
+            
+            signal_rows = list(signals)
+            if signal_rows:
+                if self._signals_next_row is None:
+                    self._signals_next_row = self._find_signals_next_row()
+                first = self._signals_next_row
+                if first == 1:
+                    signal_rows.insert(0, SIGNAL_HEADER)
+                data.append({
+                    'range': f'Signals!A{first}:F{first + len(signal_rows) - 1}',
+                    'values': signal_rows
+                })
             
-            self.service.spreadsheets().values().append(
-                spreadsheetId=self.spreadsheet_id, range=range_name,
-                valueInputOption='RAW', body=body).execute()
-            logger.info("Synced signals to Google Sheets")
+            with component_seconds.time(component="sheets", name="flush"):
+                self.service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id,
+                    body={'valueInputOption': 'RAW', 'data': data}).execute()
+            self.stats['api_calls'] += 1
         except Exception as e:
-            logger.error(f"Error syncing signals: {e}")
+            self.stats['failed_flushes'] += 1
+            status = e.resp.status if isinstance(e, HttpError) else None
+            # Back off harder on quota errors; anything else retries at the normal interval
+            if status in RETRYABLE_STATUS:
+                self._backoff = min(max(self._backoff * 2, settings.sheets_flush_interval), settings.sheets_max_backoff)
+                self._retry_at = time.monotonic() + self._backoff
+                logger.warning(f"Sheets quota/server error {status}, backing off {self._backoff:.0f}s")
+            else:
+                logger.error(f"Error syncing to Google Sheets: {e}")
+            with self._lock:
+                # Put the unwritten signals back in front of anything staged meanwhile
+                self._pending_signals = signals + self._pending_signals
+            return 0
+        
+        self._backoff = 0.0
+        if signal_rows:
+            self._signals_next_row += len(signal_rows)
+        
+        with self._lock:
+            for row, values in scanners.items():
+                self._written_scanners[row] = values
+                if self._pending_scanners.get(row) == values:
+                    del self._pending_scanners[row]
+        
+        self.stats['flushes'] += 1
+        self.stats['rows_written'] += len(scanners) + len(signals)
+        logger.info(f"Synced {len(scanners)} scanner rows and {len(signals)} signals to Google Sheets")
+        return len(scanners) + len(signals)
+
+    def start(self):
+        """Start the background flush worker on the running event loop."""
+        if self._task is None and self.service:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the worker after a final flush."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._retry_at = 0.0
+        await asyncio.to_thread(self.flush)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(settings.sheets_flush_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"Sheets flush worker error: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get sync statistics."""
+        with self._lock:
+            pending = len(self._pending_scanners) + len(self._pending_signals)
+        return {**self.stats, 'pending_rows': pending, 'backoff': self._backoff}
+
 
 # Global instance
 sheets_sync = GoogleSheetsSync()
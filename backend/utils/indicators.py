@@ -1,32 +1,160 @@
 """
 Technical indicator calculations using pandas and ta library.
 """
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional
 from ta.trend import EMAIndicator, MACD, ADXIndicator
 from ta.momentum import RSIIndicator
 from ta.volatility import BollingerBands, AverageTrueRange
 from ta.volume import VolumeWeightedAveragePrice
+from config.settings import settings
 
 
+class IndicatorCache:
+    """
+    Bounded LRU cache of indicator results shared by scanners and bots.
+    
+    Entries are keyed by (symbol, interval, bar range, latest bar, indicator,
+    params), so each indicator is computed once per bar update and reused by
+    every consumer that asks for it on the same frame.
+    """
+    
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        
+        value = compute()
+        
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+    
+    def clear(self):
+        """Drop all cached results and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+    
+    def get_stats(self) -> Dict:
+        """Get cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / lookups * 100) if lookups else 0.0
+        }
+
+
+# Global indicator cache
+indicator_cache = IndicatorCache(settings.indicator_cache_size)
+
+
+# Columns of the latest bar that take part in a frame's cache key
+BAR_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def _frame_key(df: pd.DataFrame) -> Optional[tuple]:
+    """
+    Identify a frame by its source, bar range and latest bar.
+    
+    Only frames tagged by ``MarketDataFetcher`` (``df.attrs['symbol']``) are
+    cacheable; the first/last timestamps and length keep slices of the same
+    series from colliding. The latest bar's values are part of the key, as
+    in ``bar_key``, so a forming bar that moves between ticks is recomputed
+    instead of served stale.
+    """
+    symbol = df.attrs.get('symbol')
+    if symbol is None or df.empty:
+        return None
+    last_bar = tuple(float(df[col].iat[-1]) for col in BAR_COLUMNS if col in df.columns)
+    return (symbol, df.attrs.get('interval'), df.index[0], df.index[-1], len(df), last_bar)
+
+
+def _copy_result(value: Any) -> Any:
+    """
+    Copy a cached result so callers can't change what the cache holds.
+    
+    Series and arrays are copied (cheap under pandas copy-on-write); dicts
+    are copied together with their container values, such as level lists.
+    """
+    if isinstance(value, (pd.Series, pd.DataFrame, np.ndarray, list)):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy_result(v) for k, v in value.items()}
+    return value
+
+
+def cached_indicator(func: Callable) -> Callable:
+    """
+    Memoize an indicator function in ``indicator_cache``.
+    
+    Every call returns its own copy of the cached result.
+    """
+    signature = inspect.signature(func)
+    
+    @wraps(func)
+    def wrapper(df: pd.DataFrame, *args, **kwargs):
+        frame_key = _frame_key(df)
+        if frame_key is None:
+            return func(df, *args, **kwargs)
+        
+        bound = signature.bind(df, *args, **kwargs)
+        bound.apply_defaults()
+        params = tuple((k, v) for k, v in bound.arguments.items() if k != 'df')
+        key = frame_key + (func.__name__, params)
+        return _copy_result(indicator_cache.get_or_compute(key, lambda: func(df, *args, **kwargs)))
+    
+    return wrapper
+
+
+@cached_indicator
 def calculate_ema(df: pd.DataFrame, period: int, column: str = 'Close') -> pd.Series:
     """Calculate Exponential Moving Average."""
     ema = EMAIndicator(close=df[column], window=period)
     return ema.ema_indicator()
 
 
+@cached_indicator
 def calculate_sma(df: pd.DataFrame, period: int, column: str = 'Close') -> pd.Series:
     """Calculate Simple Moving Average."""
     return df[column].rolling(window=period).mean()
 
 
+@cached_indicator
 def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """Calculate Relative Strength Index."""
     rsi = RSIIndicator(close=df['Close'], window=period)
     return rsi.rsi()
 
 
+@cached_indicator
 def calculate_macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, pd.Series]:
     """Calculate MACD indicator."""
     macd = MACD(close=df['Close'], window_fast=fast, window_slow=slow, window_sign=signal)
@@ -37,6 +165,7 @@ def calculate_macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int
     }
 
 
+@cached_indicator
 def calculate_bollinger_bands(df: pd.DataFrame, period: int = 20, std: int = 2) -> Dict[str, pd.Series]:
     """Calculate Bollinger Bands."""
     bb = BollingerBands(close=df['Close'], window=period, window_dev=std)
@@ -49,12 +178,14 @@ def calculate_bollinger_bands(df: pd.DataFrame, period: int = 20, std: int = 2)
     }
 
 
+@cached_indicator
 def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """Calculate Average True Range."""
     atr = AverageTrueRange(high=df['High'], low=df['Low'], close=df['Close'], window=period)
     return atr.average_true_range()
 
 
+@cached_indicator
 def calculate_adx(df: pd.DataFrame, period: int = 14) -> Dict[str, pd.Series]:
     """Calculate Average Directional Index."""
     adx = ADXIndicator(high=df['High'], low=df['Low'], close=df['Close'], window=period)
@@ -65,6 +196,7 @@ def calculate_adx(df: pd.DataFrame, period: int = 14) -> Dict[str, pd.Series]:
     }
 
 
+@cached_indicator
 def calculate_vwap(df: pd.DataFrame) -> pd.Series:
     """Calculate Volume Weighted Average Price."""
     vwap = VolumeWeightedAveragePrice(
@@ -76,82 +208,195 @@ def calculate_vwap(df: pd.DataFrame) -> pd.Series:
     return vwap.volume_weighted_average_price()
 
 
-def calculate_support_resistance(df: pd.DataFrame, window: int = 20) -> Dict[str, List[float]]:
+@cached_indicator
+def calculate_support_resistance(
+    df: pd.DataFrame,
+    window: int = 20,
+    cluster_pct: float = 0.25
+) -> Dict[str, List[float]]:
     """
     Calculate support and resistance levels using pivot points.
     
+    A pivot high (low) is a bar whose High (Low) is the extreme of the
+    centered window of ``window`` bars on each side. Pivots whose prices are
+    within ``cluster_pct`` percent of each other are merged into one level.
+    
     Returns:
         Dict with 'support' and 'resistance' lists
     """
-    highs = df['High'].rolling(window=window).max()
-    lows = df['Low'].rolling(window=window).min()
-    
-    # Find local maxima and minima
-    resistance_levels = []
-    support_levels = []
+    span = 2 * window + 1
+    if len(df) < span:
+        return {'resistance': [], 'support': []}
     
-    for i in range(window, len(df) - window):
-        if df['High'].iloc[i] == highs.iloc[i]:
-            resistance_levels.append(float(df['High'].iloc[i]))
-        if df['Low'].iloc[i] == lows.iloc[i]:
-            support_levels.append(float(df['Low'].iloc[i]))
+    highs = df['High'].rolling(window=span, center=True).max()
+    lows = df['Low'].rolling(window=span, center=True).min()
     
-    # Remove duplicates and sort
-    resistance_levels = sorted(list(set(resistance_levels)), reverse=True)[:5]
-    support_levels = sorted(list(set(support_levels)))[:5]
+    # Find local maxima and minima
+    resistance_levels = cluster_levels(df['High'][df['High'] == highs].to_numpy(dtype=float), cluster_pct)
+    support_levels = cluster_levels(df['Low'][df['Low'] == lows].to_numpy(dtype=float), cluster_pct)
     
     return {
-        'resistance': resistance_levels,
-        'support': support_levels
+        'resistance': resistance_levels[::-1][:5].tolist(),
+        'support': support_levels[:5].tolist()
     }
 
 
-def calculate_volume_profile(df: pd.DataFrame, bins: int = 50) -> Dict:
+def cluster_levels(prices: np.ndarray, cluster_pct: float) -> np.ndarray:
+    """
+    Merge nearby price levels.
+    
+    Sorted prices start a new cluster wherever the gap to the previous price
+    exceeds ``cluster_pct`` percent of it; each cluster is replaced by its mean.
+    
+    Returns:
+        Ascending array of clustered levels
+    """
+    prices = np.sort(prices[np.isfinite(prices)])
+    if len(prices) == 0:
+        return prices
+    
+    gaps = np.diff(prices) > prices[:-1] * (cluster_pct / 100)
+    cluster_ids = np.concatenate(([0], np.cumsum(gaps)))
+    return np.bincount(cluster_ids, weights=prices) / np.bincount(cluster_ids)
+
+
+@cached_indicator
+def calculate_volume_profile(
+    df: pd.DataFrame,
+    bins: int = 50,
+    distribute: bool = False,
+    value_area_pct: float = 0.7
+) -> Dict:
     """
     Calculate volume profile and Point of Control (POC).
     
+    Args:
+        df: DataFrame with OHLCV data
+        bins: Number of price bins between the lowest Low and highest High
+        distribute: Spread each bar's volume evenly across its High-Low range
+            instead of assigning it all to the Close
+        value_area_pct: Share of total volume the value area must contain,
+            grown outward from the POC (see ``value_area_bins``)
+    
     Returns:
         Dict with POC, value area high/low, and volume distribution
     """
+    low = df['Low'].to_numpy(dtype=float)
+    high = df['High'].to_numpy(dtype=float)
+    close = df['Close'].to_numpy(dtype=float)
+    volume = np.nan_to_num(df['Volume'].to_numpy(dtype=float))
+    
     # Create price bins
-    price_range = df['High'].max() - df['Low'].min()
-    bin_size = price_range / bins
+    price_min = np.nanmin(low)
+    price_range = np.nanmax(high) - price_min
+    bin_size = price_range / bins if price_range > 0 else 1.0
     
-    # Calculate volume at each price level
-    volume_at_price = {}
-    for _, row in df.iterrows():
-        price_bin = int((row['Close'] - df['Low'].min()) / bin_size)
-        if price_bin not in volume_at_price:
-            volume_at_price[price_bin] = 0
-        volume_at_price[price_bin] += row['Volume']
+    # Calculate volume at each price level; closes at the very top of the
+    # range land in one extra bin, as they always have
+    if distribute:
+        volume_at_price = _distributed_volume(low, high, close, volume, price_min, bin_size, bins)
+    else:
+        price_bins = np.clip(((close - price_min) / bin_size).astype(int), 0, bins)
+        volume_at_price = np.bincount(price_bins, weights=volume, minlength=bins + 1)
     
     # Find POC (Point of Control) - price level with highest volume
-    poc_bin = max(volume_at_price, key=volume_at_price.get)
-    poc_price = df['Low'].min() + (poc_bin * bin_size)
+    poc_bin = int(np.argmax(volume_at_price))
+    val_bins, vah_bins = value_area_bins(volume_at_price[None, :], np.array([poc_bin]), value_area_pct)
+    val_bin, vah_bin = int(val_bins[0]), int(vah_bins[0])
     
-    # Calculate value area (70% of volume)
-    total_volume = sum(volume_at_price.values())
-    target_volume = total_volume * 0.7
+    return {
+        'poc': float(price_min + poc_bin * bin_size),
+        'vah': float(price_min + vah_bin * bin_size),  # Value Area High
+        'val': float(price_min + val_bin * bin_size),  # Value Area Low
+        'volume_distribution': {
+            int(i): float(volume_at_price[i]) for i in np.flatnonzero(volume_at_price)
+        }
+    }
+
+
+def _distributed_volume(
+    low: np.ndarray,
+    high: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    price_min: float,
+    bin_size: float,
+    bins: int
+) -> np.ndarray:
+    """
+    Histogram of volume spread uniformly over each bar's High-Low range.
     
-    sorted_bins = sorted(volume_at_price.items(), key=lambda x: x[1], reverse=True)
-    cumulative_volume = 0
-    value_area_bins = []
+    The cumulative volume below each bin edge is a sum of clipped linear
+    ramps, one per bar. It is evaluated at every edge with prefix sums over
+    the bars sorted by Low and by High, so the cost is O(n log n) with no
+    bars x bins matrix.
+    """
+    edges = price_min + bin_size * np.arange(bins + 1)
+    span = high - low
+    ranged = span > 0
     
-    for bin_num, volume in sorted_bins:
-        cumulative_volume += volume
-        value_area_bins.append(bin_num)
-        if cumulative_volume >= target_volume:
-            break
+    # Zero-range bars have no width to spread over; put them at the Close
+    point_bins = np.clip(((close[~ranged] - price_min) / bin_size).astype(int), 0, bins - 1)
+    histogram = np.bincount(point_bins, weights=volume[~ranged], minlength=bins).astype(float)
     
-    vah = df['Low'].min() + (max(value_area_bins) * bin_size)  # Value Area High
-    val = df['Low'].min() + (min(value_area_bins) * bin_size)  # Value Area Low
+    lo, hi, vol = low[ranged], high[ranged], volume[ranged]
+    density = vol / (hi - lo)
     
-    return {
-        'poc': float(poc_price),
-        'vah': float(vah),
-        'val': float(val),
-        'volume_distribution': volume_at_price
-    }
+    def prefix_below(keys: np.ndarray, *weights: np.ndarray, strict: bool) -> List[np.ndarray]:
+        order = np.argsort(keys)
+        counts = np.searchsorted(keys[order], edges, side='left' if strict else 'right')
+        sums = []
+        for w in weights:
+            cumulative = np.concatenate(([0.0], np.cumsum(w[order])))
+            sums.append(cumulative[counts])
+        return sums
+    
+    # Bars that started below the edge, and bars that already ended below it
+    started_density, started_offset = prefix_below(lo, density, density * lo, strict=True)
+    ended_volume, ended_density, ended_offset = prefix_below(hi, vol, density, density * lo, strict=False)
+    
+    below_edge = ended_volume + edges * (started_density - ended_density) - (started_offset - ended_offset)
+    histogram += np.clip(np.diff(below_edge), 0.0, None)
+    return histogram
+
+
+def value_area_bins(histograms: np.ndarray, poc_bins: np.ndarray, value_area_pct: float) -> tuple:
+    """
+    Expand the value area outward from the POC, one bin at a time.
+    
+    Each step adds whichever neighbouring bin (just above or just below the
+    current range) holds more volume, preferring the upper one on ties,
+    until the range holds ``value_area_pct`` of the volume. Rows of
+    ``histograms`` are expanded side by side.
+    
+    Args:
+        histograms: Volume per bin, one row per profile
+        poc_bins: POC bin of each row
+        value_area_pct: Share of total volume the value area must contain
+    
+    Returns:
+        (low_bins, high_bins) arrays, inclusive
+    """
+    rows, bins = histograms.shape
+    row = np.arange(rows)
+    low = np.asarray(poc_bins, dtype=int).copy()
+    high = low.copy()
+    held = histograms[row, low]
+    target = histograms.sum(axis=1) * value_area_pct
+    
+    for _ in range(bins - 1):
+        growing = (held < target) & ((low > 0) | (high < bins - 1))
+        if not growing.any():
+            break
+        below = np.where(low > 0, histograms[row, np.maximum(low - 1, 0)], -np.inf)
+        above = np.where(high < bins - 1, histograms[row, np.minimum(high + 1, bins - 1)], -np.inf)
+        up = growing & (above >= below)
+        down = growing & ~up
+        high += up
+        low -= down
+        held = held + np.where(up, above, 0.0) + np.where(down, below, 0.0)
+    
+    return low, high
 
 
 def detect_trend(df: pd.DataFrame, short: int = 20, medium: int = 50, long: int = 200) -> str:
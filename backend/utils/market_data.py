@@ -1,21 +1,198 @@
 """
-Market data fetching utilities using yfinance.
+Market data fetching utilities over pluggable providers (yfinance by default).
 """
-import yfinance as yf
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-import asyncio
-from functools import lru_cache
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import settings
+from utils.candle_store import CandleStore, period_start
+from utils.data_providers import MarketDataProvider, get_provider
+from utils.async_market_data import AsyncMarketDataClient
 
 
-class MarketDataFetcher:
-    """Fetches and caches market data from yfinance."""
+class FrameCache:
+    """
+    Thread-safe LRU cache of DataFrames with a TTL and a memory budget.
+    
+    Entries past the TTL are kept (as stale) until evicted, so callers can
+    serve them while a refresh runs. Eviction drops least recently used
+    frames once either the entry count or the total frame size is exceeded.
+    """
+    
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 512 * 1024 * 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (df, stored_at, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[tuple]:
+        """
+        Get a cached frame.
+        
+        Args:
+            key: Cache key
+            max_age: Treat entries older than this many seconds as missing
+        
+        Returns:
+            (df, age_seconds), or None if the key isn't cached (or too old);
+            only returned entries count as hits
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.monotonic() - entry[1] if entry is not None else None
+            if entry is None or (max_age is not None and age >= max_age):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0], age
+    
+    def get_fresh(self, key: str) -> Optional[pd.DataFrame]:
+        """Get a cached frame only if it is within the TTL."""
+        cached = self.get(key, max_age=self.ttl)
+        return cached[0] if cached is not None else None
+    
+    def put(self, key: str, df: pd.DataFrame):
+        """Cache a frame, evicting least recently used ones over the limits."""
+        nbytes = int(df.memory_usage(index=True).sum())
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (df, time.monotonic(), nbytes)
+            self._bytes += nbytes
+            
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class _Flight:
+    """One in-flight fetch that other callers can wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+    
+    def wait(self, timeout: Optional[float] = None):
+        if not self.done.wait(timeout):
+            raise TimeoutError(f"Fetch in flight for over {timeout:.0f}s")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent fetches of the same key into one.
+    
+    The first caller for a key runs the fetch; callers arriving while it is
+    in flight block until it finishes and share its result (or exception).
+    """
     
     def __init__(self):
-        self._cache: Dict[str, pd.DataFrame] = {}
-        self._cache_timeout = 60  # seconds
-        self._last_update: Dict[str, datetime] = {}
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+    
+    def do(self, key: str, func):
+        """Run ``func()`` for ``key`` unless a fetch is already in flight, then return its result."""
+        flight, leader = self._join(key)
+        if not leader:
+            return flight.wait(settings.data_flight_timeout)
+        try:
+            result = func()
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result)
+        return result
+    
+    def begin(self, key: str) -> Optional[_Flight]:
+        """
+        Claim a key for a fetch the caller runs itself.
+        
+        Returns:
+            None if the caller now owns the fetch and must call ``finish``;
+            otherwise the in-flight fetch to wait on
+        """
+        flight, leader = self._join(key)
+        return None if leader else flight
+    
+    def finish(self, key: str, result=None, error: Optional[BaseException] = None):
+        """Publish the result of a claimed fetch to its waiters."""
+        with self._lock:
+            flight = self._flights.pop(key, None)
+        if flight is not None:
+            flight.result = result
+            flight.error = error
+            flight.done.set()
+    
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._flights
+    
+    def _join(self, key: str) -> tuple:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+
+class MarketDataFetcher:
+    """Fetches and caches market data from the configured provider."""
+    
+    def __init__(self, provider: Optional[MarketDataProvider] = None):
+        self.provider = provider or get_provider()
+        self._cache = FrameCache(
+            max_entries=settings.data_cache_max_entries,
+            max_bytes=settings.data_cache_max_mb * 1024 * 1024,
+            ttl=settings.data_cache_ttl
+        )
+        self._flights = SingleFlight()
+        self.fetch_failures = 0
+        self._refresher = ThreadPoolExecutor(
+            max_workers=settings.data_refresh_workers,
+            thread_name_prefix="market-data-refresh"
+        )
+        self.store: Optional[CandleStore] = (
+            CandleStore(settings.candle_store_dir)
+            if settings.enable_candle_store and not self.provider.local else None
+        )
     
     def get_historical_data(
         self,
@@ -26,6 +203,9 @@ class MarketDataFetcher:
         """
         Get historical data for a symbol.
         
+        When the candle store is enabled only bars newer than the last stored
+        one are downloaded, and the requested period is sliced from disk.
+        
         Args:
             symbol: Stock symbol (e.g., 'AAPL')
             period: Data period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
@@ -37,74 +217,262 @@ class MarketDataFetcher:
         cache_key = f"{symbol}_{period}_{interval}"
         
         # Check cache
-        if cache_key in self._cache:
-            last_update = self._last_update.get(cache_key)
-            if last_update and (datetime.now() - last_update).seconds < self._cache_timeout:
-                return self._cache[cache_key]
+        cached = self._cache.get(cache_key, max_age=self._cache.ttl + settings.data_stale_ttl)
+        if cached is not None:
+            df, age = cached
+            if age >= self._cache.ttl:
+                # Stale-while-revalidate: serve the previous frame, refresh in the background
+                self._refresh_in_background(cache_key, symbol, period, interval)
+            return df
+        
+        # Concurrent misses for the same key share one fetch
+        df = self._flights.do(cache_key, lambda: self._fetch_historical(symbol, period, interval))
+        return df if df is not None else pd.DataFrame()
+    
+    def _refresh_in_background(self, cache_key: str, symbol: str, period: str, interval: str):
+        """Schedule a refresh of a stale key unless one is already in flight."""
+        if self._flights.in_flight(cache_key):
+            return
+        try:
+            self._refresher.submit(self._refresh, cache_key, symbol, period, interval)
+        except RuntimeError:
+            pass  # refresher shut down
+    
+    def _refresh(self, cache_key: str, symbol: str, period: str, interval: str):
+        try:
+            self._flights.do(cache_key, lambda: self._fetch_historical(symbol, period, interval))
+        except Exception as e:
+            print(f"Error refreshing {symbol}: {e}")
+            self.fetch_failures += 1
+    
+    def _fetch_historical(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        """Download (or incrementally update) one symbol and cache the result."""
+        cache_key = f"{symbol}_{period}_{interval}"
         
         # Fetch fresh data
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval=interval)
+        if self.store is None:
+            df = self.provider.history(symbol, period=period, interval=interval)
+        else:
+            since = self._refresh_start(symbol, period, interval)
+            if since is None:
+                self.store.replace(symbol, interval, self.provider.history(symbol, period=period, interval=interval))
+            else:
+                self.store.append(symbol, interval, self.provider.history(symbol, interval=interval, start=since))
+            df = self.store.read(symbol, interval, start=period_start(period))
+        
+        # Tag the frame so indicator results can be shared across consumers
+        df.attrs.update(symbol=symbol, interval=interval)
         
         # Cache the data
-        self._cache[cache_key] = df
-        self._last_update[cache_key] = datetime.now()
+        self._cache.put(cache_key, df)
         
         return df
     
+    def get_historical_data_many(
+        self,
+        symbols: List[str],
+        period: str = "1mo",
+        interval: str = "1h"
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Get historical data for many symbols using batched downloads.
+        
+        Symbols that are still fresh in the cache are served from it; the rest
+        are fetched with one provider ``download`` call per chunk of
+        ``settings.data_fetch_batch_size`` symbols and written back into the
+        per-symbol cache, so later ``get_historical_data`` calls are hits.
+        With the candle store enabled, symbols that already have stored bars
+        are downloaded incrementally instead of for the whole period.
+        
+        Args:
+            symbols: List of stock symbols
+            period: Data period (see ``get_historical_data``)
+            interval: Data interval (see ``get_historical_data``)
+        
+        Returns:
+            Dict mapping symbol to DataFrame with OHLCV data
+        """
+        results: Dict[str, pd.DataFrame] = {}
+        full: List[str] = []
+        incremental: Dict[str, pd.Timestamp] = {}
+        waiting: Dict[str, object] = {}
+        claimed: List[str] = []
+        
+        # Every key claimed below is finished in the ``finally``, even if
+        # planning the downloads fails part way
+        try:
+            for symbol in dict.fromkeys(symbols):
+                cache_key = f"{symbol}_{period}_{interval}"
+                df = self._cache.get_fresh(cache_key)
+                if df is not None:
+                    results[symbol] = df
+                    continue
+                
+                # Symbols another caller is already fetching are awaited, not refetched
+                flight = self._flights.begin(cache_key)
+                if flight is not None:
+                    waiting[symbol] = flight
+                    continue
+                claimed.append(symbol)
+                
+                try:
+                    since = self._refresh_start(symbol, period, interval) if self.store else None
+                except Exception as e:
+                    print(f"Error reading stored candles for {symbol}, downloading in full: {e}")
+                    since = None
+                if since is None:
+                    full.append(symbol)
+                else:
+                    incremental[symbol] = since
+            
+            batch_size = max(1, settings.data_fetch_batch_size)
+            batches = [
+                (full[i:i + batch_size], {'period': period})
+                for i in range(0, len(full), batch_size)
+            ]
+            pending = list(incremental)
+            for i in range(0, len(pending), batch_size):
+                chunk = pending[i:i + batch_size]
+                batches.append((chunk, {'start': min(incremental[s] for s in chunk)}))
+            
+            for chunk, window in batches:
+                try:
+                    data = self.provider.download(chunk, interval=interval, **window)
+                except Exception as e:
+                    print(f"Error batch fetching {len(chunk)} symbols: {e}")
+                    self.fetch_failures += 1
+                    continue
+                
+                if not data:
+                    continue
+                
+                for symbol in chunk:
+                    df = data.get(symbol)
+                    if df is None:
+                        df = pd.DataFrame()
+                    if self.store is not None:
+                        if symbol in incremental:
+                            self.store.append(symbol, interval, df)
+                        elif not df.empty:
+                            self.store.replace(symbol, interval, df)
+                        df = self.store.read(symbol, interval, start=period_start(period))
+                    
+                    if df.empty:
+                        continue
+                    
+                    df.attrs.update(symbol=symbol, interval=interval)
+                    self._cache.put(f"{symbol}_{period}_{interval}", df)
+                    results[symbol] = df
+        finally:
+            # Hand results (or nothing) to callers that waited on these keys
+            for symbol in claimed:
+                self._flights.finish(f"{symbol}_{period}_{interval}", results.get(symbol))
+        
+        for symbol, flight in waiting.items():
+            try:
+                df = flight.wait(settings.data_flight_timeout)
+            except Exception:
+                continue
+            if df is not None and not df.empty:
+                results[symbol] = df
+        
+        return {symbol: results[symbol] for symbol in dict.fromkeys(symbols) if symbol in results}
+    
+    def _refresh_start(self, symbol: str, period: str, interval: str) -> Optional[pd.Timestamp]:
+        """
+        Decide how to refresh a stored (symbol, interval) series.
+        
+        Returns:
+            Timestamp to download from for an incremental append, or None when
+            the store does not cover ``period`` and a full download is needed
+        """
+        last_ts = self.store.last_timestamp(symbol, interval)
+        if last_ts is None:
+            return None
+        
+        window_start = period_start(period)
+        if window_start is not None:
+            # Too stale to bridge, or the stored history is shorter than requested
+            if last_ts < window_start:
+                return None
+            if self.store.first_timestamp(symbol, interval) > window_start + timedelta(days=7):
+                return None
+        elif period == "max":
+            return None
+        
+        return last_ts
+    
     def get_current_price(self, symbol: str) -> float:
         """Get current price for a symbol."""
-        ticker = yf.Ticker(symbol)
-        data = ticker.history(period="1d", interval="1m")
+        data = self.provider.history(symbol, period="1d", interval="1m")
         if not data.empty:
             return float(data['Close'].iloc[-1])
         return 0.0
     
     def get_multiple_prices(self, symbols: List[str]) -> Dict[str, float]:
-        """Get current prices for multiple symbols."""
+        """
+        Get current prices for multiple symbols using batched quote requests.
+        
+        One provider ``quotes`` call is made per chunk of
+        ``settings.data_fetch_batch_size`` symbols.
+        
+        Returns:
+            Dict mapping symbol to price; symbols whose quote failed or was
+            not a positive finite number are left out, so callers keep their
+            previous price instead of marking positions at 0.0
+        """
         prices = {}
-        for symbol in symbols:
+        unique = list(dict.fromkeys(symbols))
+        batch_size = max(1, settings.data_fetch_batch_size)
+        for i in range(0, len(unique), batch_size):
+            chunk = unique[i:i + batch_size]
             try:
-                prices[symbol] = self.get_current_price(symbol)
+                quotes = self.provider.quotes(chunk)
             except Exception as e:
-                print(f"Error fetching price for {symbol}: {e}")
-                prices[symbol] = 0.0
+                print(f"Error fetching prices for {len(chunk)} symbols: {e}")
+                self.fetch_failures += 1
+                continue
+            
+            for symbol in chunk:
+                price = quotes.get(symbol)
+                if price is not None and np.isfinite(price) and price > 0:
+                    prices[symbol] = float(price)
         return prices
     
     async def get_realtime_data(self, symbols: List[str]) -> Dict[str, Dict]:
         """
         Get real-time data for multiple symbols asynchronously.
         
+        Symbols are fetched concurrently off the event loop through
+        ``async_market_data``.
+        
         Returns:
             Dict mapping symbol to data dict with price, volume, etc.
         """
-        data = {}
-        for symbol in symbols:
-            try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
-                hist = ticker.history(period="1d", interval="1m")
-                
-                if not hist.empty:
-                    data[symbol] = {
-                        'price': float(hist['Close'].iloc[-1]),
-                        'volume': float(hist['Volume'].iloc[-1]),
-                        'open': float(hist['Open'].iloc[0]),
-                        'high': float(hist['High'].max()),
-                        'low': float(hist['Low'].min()),
-                        'change_pct': ((hist['Close'].iloc[-1] - hist['Open'].iloc[0]) / hist['Open'].iloc[0]) * 100
-                    }
-            except Exception as e:
-                print(f"Error fetching realtime data for {symbol}: {e}")
-                data[symbol] = None
-        
-        return data
+        return await async_market_data.get_realtime_data(symbols)
     
     def clear_cache(self):
         """Clear the data cache."""
         self._cache.clear()
-        self._last_update.clear()
+    
+    def get_cache_stats(self) -> Dict:
+        """Get frame cache and request coalescing statistics."""
+        return {
+            **self._cache.get_stats(),
+            'coalesced_requests': self._flights.coalesced,
+            'fetch_failures': self.fetch_failures
+        }
 
 
 # Global instance
 market_data = MarketDataFetcher()
+
+# Awaitable access for the engine and API, sharing the fetcher's provider
+async_market_data = AsyncMarketDataClient(
+    market_data.provider,
+    max_concurrency=settings.data_max_concurrency,
+    rate=settings.data_rate_limit,
+    timeout=settings.data_request_timeout,
+    max_retries=settings.data_max_retries,
+    backoff_base=settings.data_backoff_base
+)
@@ -1,61 +1,177 @@
+import asyncio
 import logging
+import random
+import time
+from typing import Dict, List, Optional
 import requests
+from requests.adapters import HTTPAdapter
 from config.settings import settings
+from utils.rate_limiter import RateLimiter
+from utils.metrics import component_seconds
 
 logger = logging.getLogger("notifications")
 
+
+class RetryableError(Exception):
+    """Send failure worth retrying (rate limited, server error or network)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class NotificationChannel:
+    """One outgoing channel with its own pooled HTTP session and rate limit."""
+
+    def __init__(self, name: str, url: str, max_length: int, rate: float):
+        self.name = name
+        self.url = url
+        self.max_length = max_length
+        self.rate = rate
+        # Created by the dispatcher on its own event loop
+        self.limiter: Optional[RateLimiter] = None
+        
+        # Keep-alive connections are reused across sends
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+    def payload(self, text: str) -> Dict:
+        raise NotImplementedError
+
+    def render(self, text: str) -> str:
+        """Adapt ScanTrade markup to the channel."""
+        return text
+
+    def send(self, text: str):
+        """
+        Post one message (blocking).
+        
+        Raises:
+            RetryableError: On 429, 5xx and connection errors
+            requests.HTTPError: On other error responses
+        """
+        try:
+            response = self.session.post(self.url, json=self.payload(text), timeout=settings.notify_timeout)
+        except requests.RequestException as e:
+            raise RetryableError(str(e))
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableError(
+                f"{self.name} returned {response.status_code}",
+                retry_after=self._retry_after(response)
+            )
+        response.raise_for_status()
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        try:
+            body = response.json()
+            # Telegram: parameters.retry_after (s); Discord: retry_after (s)
+            value = body.get('parameters', {}).get('retry_after', body.get('retry_after'))
+            if value is not None:
+                return float(value)
+        except ValueError:
+            pass
+        header = response.headers.get('Retry-After')
+        try:
+            return float(header) if header is not None else None
+        except ValueError:
+            return None
+
+    def close(self):
+        self.session.close()
+
+
+class TelegramChannel(NotificationChannel):
+    def __init__(self, token: str, chat_id: str):
+        super().__init__(
+            "telegram",
+            f"{settings.telegram_api_url}/bot{token}/sendMessage",
+            max_length=4096,
+            rate=settings.notify_telegram_rate
+        )
+        self.chat_id = chat_id
+
+    def payload(self, text: str) -> Dict:
+        return {"chat_id": self.chat_id, "text": text, "parse_mode": "Markdown"}
+
+
+class DiscordChannel(NotificationChannel):
+    def __init__(self, webhook_url: str):
+        super().__init__("discord", webhook_url, max_length=2000, rate=settings.notify_discord_rate)
+
+    def payload(self, text: str) -> Dict:
+        return {"content": text}
+
+    def render(self, text: str) -> str:
+        # Simple text for Discord
+        return text.replace("*", "**")
+
+
 class NotificationManager:
-    """Manages outgoing alerts to Telegram and Discord."""
+    """
+    Manages outgoing alerts to Telegram and Discord.
     
+    The engine only enqueues signals. A background dispatcher drains the
+    bounded queue, coalesces bursts into digest messages, and sends them on
+    each channel under its rate limit, retrying with exponential backoff.
+    """
+
     def __init__(self):
         self.telegram_token = settings.telegram_bot_token
         self.telegram_chat_id = settings.telegram_chat_id
         self.discord_url = settings.discord_webhook_url
+        
+        self.channels: List[NotificationChannel] = []
+        if self.telegram_token and self.telegram_chat_id:
+            self.channels.append(TelegramChannel(self.telegram_token, self.telegram_chat_id))
+        if self.discord_url:
+            self.channels.append(DiscordChannel(self.discord_url))
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'queued': 0, 'dropped': 0, 'sent': 0, 'failed': 0, 'retries': 0}
+
+    def _channel(self, name: str) -> Optional[NotificationChannel]:
+        return next((c for c in self.channels if c.name == name), None)
 
     def send_telegram_message(self, text: str):
         """Sends a message via Telegram Bot API."""
-        if not self.telegram_token or not self.telegram_chat_id:
+        channel = self._channel("telegram")
+        if channel is None:
             return
-
-        url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
-        payload = {
-            "chat_id": self.telegram_chat_id,
-            "text": text,
-            "parse_mode": "Markdown"
-        }
         
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
+            channel.send(text)
             logger.info("Telegram message sent successfully")
         except Exception as e:
             logger.error(f"Failed to send Telegram message: {e}")
 
     def send_discord_alert(self, text: str):
         """Sends an alert via Discord Webhook."""
-        if not self.discord_url:
+        channel = self._channel("discord")
+        if channel is None:
             return
-
-        payload = {"content": text}
         
         try:
-            response = requests.post(self.discord_url, json=payload)
-            response.raise_for_status()
+            channel.send(text)
             logger.info("Discord alert sent successfully")
         except Exception as e:
             logger.error(f"Failed to send Discord alert: {e}")
 
-    def broadcast_signal(self, signal_data: dict):
-        """Broadcasts a trading signal to all enabled channels."""
+    @staticmethod
+    def format_signal(signal_data: dict) -> str:
+        """Format one signal as a ScanTrade alert."""
         symbol = signal_data.get('symbol')
         sig_type = signal_data.get('signal_type')
         confidence = signal_data.get('confidence')
         price = signal_data.get('price')
         condition = signal_data.get('condition')
-
+        
         # ScanTrade formatting
         emoji = "🚀" if sig_type == "BULLISH" else "🔻"
-        message = (
+        return (
             f"**SCANTRADE SIGNAL** {emoji}\n\n"
             f"**{symbol}** • {sig_type}\n"
             f"Price: ${price:,.2f}\n"
@@ -63,12 +179,164 @@ class NotificationManager:
             f"Setup: {condition}\n\n"
             f"_ScanTrade Scanner_"
         )
+
+    @staticmethod
+    def format_digest(signals: List[dict], max_length: int, render=lambda text: text) -> List[str]:
+        """
+        Format a burst of signals as digest messages.
         
-        # Simple text for Discord
-        discord_text = message.replace("*", "**") 
+        Args:
+            signals: Signal dicts in the burst
+            max_length: Channel message size limit
+            render: Channel markup applied to every piece before measuring
+        
+        Returns:
+            Messages of at most ``max_length`` characters, one line per signal
+        """
+        header = render(f"**SCANTRADE DIGEST** • {len(signals)} signals\n\n")
+        footer = render("\n_ScanTrade Scanner_")
+        lines = []
+        for sig in signals:
+            emoji = "🚀" if sig.get('signal_type') == "BULLISH" else "🔻"
+            lines.append(render(
+                f"{emoji} **{sig.get('symbol')}** {sig.get('signal_type')} "
+                f"${sig.get('price'):,.2f} ({sig.get('confidence'):.0f}%) {sig.get('condition')}\n"
+            ))
+        
+        messages = []
+        body = header
+        for line in lines:
+            if len(body) + len(line) + len(footer) > max_length and body != header:
+                messages.append(body + footer)
+                body = header
+            body += line[:max_length - len(header) - len(footer)]
+        messages.append(body + footer)
+        return messages
 
+    def broadcast_signal(self, signal_data: dict):
+        """Broadcasts a trading signal to all enabled channels (blocking)."""
+        message = self.format_signal(signal_data)
+        
+        # Simple text for Discord
+        discord_text = message.replace("*", "**")
+        
         self.send_telegram_message(message)
         self.send_discord_alert(discord_text)
 
+    def enqueue_signal(self, signal_data: dict) -> bool:
+        """
+        Queue a signal for the background dispatcher without blocking.
+        
+        Returns:
+            False if the queue is full (or the dispatcher isn't running) and
+            the signal was dropped
+        """
+        if not self.channels:
+            return False
+        if self._queue is None:
+            self.stats['dropped'] += 1
+            return False
+        try:
+            self._queue.put_nowait(signal_data)
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            logger.warning("Notification queue full, dropping signal")
+            return False
+        self.stats['queued'] += 1
+        return True
+
+    def start(self):
+        """Start the dispatcher on the running event loop."""
+        if self._task is not None or not self.channels:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.notify_queue_size)
+        for channel in self.channels:
+            channel.limiter = RateLimiter(channel.rate)
+        self._task = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self, timeout: float = 10.0):
+        """Send what's queued (up to ``timeout`` seconds), then stop the dispatcher."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self._queue.qsize()} queued notifications on shutdown")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+        for channel in self.channels:
+            channel.close()
+
+    async def _dispatch_loop(self):
+        while True:
+            batch = [await self._queue.get()]
+            
+            # Collect the rest of a burst
+            deadline = time.monotonic() + settings.notify_coalesce_window
+            while len(batch) < settings.notify_max_digest:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await asyncio.gather(*(self._deliver(channel, batch) for channel in self.channels))
+            except Exception as e:
+                logger.error(f"Notification dispatch failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, channel: NotificationChannel, batch: List[dict]):
+        if len(batch) == 1:
+            messages = [channel.render(self.format_signal(batch[0]))[:channel.max_length]]
+        else:
+            messages = self.format_digest(batch, channel.max_length, channel.render)
+        
+        for message in messages:
+            await self._send_with_retry(channel, message)
+
+    async def _send_with_retry(self, channel: NotificationChannel, text: str):
+        for attempt in range(settings.notify_max_retries + 1):
+            await channel.limiter.acquire()
+            try:
+                with component_seconds.time(component="notifications", name=channel.name):
+                    await asyncio.to_thread(channel.send, text)
+                self.stats['sent'] += 1
+                return
+            except RetryableError as e:
+                if attempt == settings.notify_max_retries:
+                    break
+                self.stats['retries'] += 1
+                if e.retry_after is not None:
+                    # Server-specified wait applies to the whole channel
+                    logger.warning(f"{channel.name} rate limited, retrying in {e.retry_after:.1f}s")
+                    channel.limiter.pause(e.retry_after)
+                else:
+                    delay = settings.notify_backoff_base * 2 ** attempt * (1 + random.random())
+                    logger.warning(f"{channel.name} send failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f"Failed to send {channel.name} notification: {e}")
+                break
+        self.stats['failed'] += 1
+
+    def get_stats(self) -> Dict:
+        """Get dispatcher statistics."""
+        return {
+            **self.stats,
+            'pending': self._queue.qsize() if self._queue is not None else 0,
+            'channels': [c.name for c in self.channels]
+        }
+
+
 # Global instance
 notifier = NotificationManager()
@@ -0,0 +1,231 @@
+"""
+Universe-wide OHLCV panels and column-wise indicator calculations.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from utils.indicators import cluster_levels, value_area_bins
+
+
+class Panel:
+    """
+    Aligned OHLCV matrices (time x symbols) for a universe of symbols.
+    
+    Rows are aligned on each symbol's most recent bar: the last row holds
+    every symbol's latest candle, and symbols with shorter histories are
+    NaN-padded at the top. Column-wise rolling and exponential calculations
+    therefore see exactly the bars a per-symbol DataFrame would.
+    """
+    
+    FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+    
+    def __init__(
+        self,
+        symbols: List[str],
+        arrays: Dict[str, np.ndarray],
+        lengths: np.ndarray,
+        last_index: Optional[List[pd.Timestamp]] = None
+    ):
+        self.symbols = symbols
+        self.arrays = arrays
+        self.lengths = lengths
+        self.last_index = last_index  # timestamp of each symbol's latest bar
+        self._frames: Dict[str, pd.DataFrame] = {}
+    
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> "Panel":
+        """
+        Build a panel from per-symbol OHLCV DataFrames.
+        
+        Args:
+            frames: Dict mapping symbol to DataFrame; empty frames are skipped
+        
+        Returns:
+            Panel with one column per non-empty symbol
+        """
+        frames = {symbol: df for symbol, df in frames.items() if df is not None and not df.empty}
+        symbols = list(frames)
+        lengths = np.array([len(frames[s]) for s in symbols], dtype=int)
+        last_index = [pd.Timestamp(frames[s].index[-1]) for s in symbols]
+        rows = int(lengths.max()) if len(lengths) else 0
+        
+        arrays = {}
+        for field in cls.FIELDS:
+            matrix = np.full((rows, len(symbols)), np.nan)
+            for col, symbol in enumerate(symbols):
+                values = frames[symbol][field].to_numpy(dtype=float)
+                matrix[rows - len(values):, col] = values
+            arrays[field] = matrix
+        
+        return cls(symbols, arrays, lengths, last_index)
+    
+    def __len__(self) -> int:
+        return len(self.symbols)
+    
+    def select(self, symbols: List[str]) -> "Panel":
+        """
+        Get a panel with only the given symbols' columns.
+        
+        Columns are independent, so results for the kept symbols match the
+        full panel's.
+        """
+        cols = [self.symbols.index(s) for s in symbols]
+        lengths = self.lengths[cols]
+        rows = int(lengths.max()) if len(lengths) else 0
+        arrays = {field: matrix[matrix.shape[0] - rows:, cols] for field, matrix in self.arrays.items()}
+        last_index = [self.last_index[c] for c in cols] if self.last_index is not None else None
+        return Panel([self.symbols[c] for c in cols], arrays, lengths, last_index)
+    
+    def bar_keys(self) -> List[tuple]:
+        """Per-symbol ``bar_key`` fingerprints (length and latest bar), in symbol order."""
+        latest = np.column_stack([self.arrays[field][-1] for field in self.FIELDS]) if len(self) else []
+        return [
+            (int(self.lengths[col]), self.last_index[col], tuple(float(v) for v in latest[col]))
+            for col in range(len(self))
+        ]
+    
+    def frame(self, field: str) -> pd.DataFrame:
+        """Get one OHLCV field as a DataFrame with a column per symbol."""
+        if field not in self._frames:
+            self._frames[field] = pd.DataFrame(self.arrays[field], columns=self.symbols)
+        return self._frames[field]
+    
+    def last(self, field: str, offset: int = 1) -> np.ndarray:
+        """Get a field's value ``offset`` bars back from the latest (1 = latest)."""
+        return self.arrays[field][-offset]
+
+
+def panel_ema(values: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Column-wise ``calculate_ema``."""
+    return values.ewm(span=period, min_periods=period, adjust=False).mean()
+
+
+def panel_rsi(close: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    """Column-wise ``calculate_rsi``."""
+    diff = close.diff()
+    valid = close.notna()
+    # Each symbol's first bar contributes a zero move, as in the batch version
+    up = diff.clip(lower=0).fillna(0.0).where(valid)
+    down = (-diff).clip(lower=0).fillna(0.0).where(valid)
+    emaup = up.ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+    emadn = down.ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+    rsi = 100 - (100 / (1 + emaup / emadn))
+    return rsi.mask(emadn == 0, 100.0)
+
+
+def panel_macd(close: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, pd.DataFrame]:
+    """Column-wise ``calculate_macd``."""
+    macd = panel_ema(close, fast) - panel_ema(close, slow)
+    macd_signal = panel_ema(macd, signal)
+    return {
+        'macd': macd,
+        'signal': macd_signal,
+        'histogram': macd - macd_signal
+    }
+
+
+def panel_bollinger_bands(close: pd.DataFrame, period: int = 20, std: int = 2) -> Dict[str, pd.DataFrame]:
+    """Column-wise ``calculate_bollinger_bands``."""
+    middle = close.rolling(period, min_periods=period).mean()
+    deviation = close.rolling(period, min_periods=period).std(ddof=0)
+    upper = middle + std * deviation
+    lower = middle - std * deviation
+    return {
+        'upper': upper,
+        'middle': middle,
+        'lower': lower,
+        'width': ((upper - lower) / middle) * 100,
+        'pct': (close - lower) / (upper - lower).where(upper != lower, np.nan)
+    }
+
+
+def panel_atr(panel: Panel, period: int = 14) -> pd.DataFrame:
+    """
+    Column-wise ``calculate_atr``.
+    
+    Wilder's recursion is an ``adjust=False`` EWM seeded with the mean of the
+    first ``period`` true ranges, so the seed is written into the series and
+    the EWM starts from it.
+    """
+    high, low, close = panel.frame('High'), panel.frame('Low'), panel.frame('Close')
+    prev_close = close.shift(1)
+    true_range = np.fmax(high - low, np.fmax((high - prev_close).abs(), (low - prev_close).abs()))
+    
+    bars_seen = close.notna().cumsum().where(close.notna())
+    seed = true_range.rolling(period, min_periods=period).mean()
+    seeded = true_range.mask(bars_seen < period).mask(bars_seen == period, seed)
+    return seeded.ewm(alpha=1 / period, adjust=False).mean()
+
+
+def panel_vwap(panel: Panel, window: int = 14) -> pd.DataFrame:
+    """Column-wise ``calculate_vwap``."""
+    high, low, close, volume = (panel.frame(f) for f in ('High', 'Low', 'Close', 'Volume'))
+    typical_price = (high + low + close) / 3.0
+    total_pv = (typical_price * volume).rolling(window, min_periods=window).sum()
+    total_volume = volume.rolling(window, min_periods=window).sum()
+    return total_pv / total_volume
+
+
+def panel_support_resistance(
+    panel: Panel,
+    window: int = 20,
+    cluster_pct: float = 0.25
+) -> List[Dict[str, List[float]]]:
+    """
+    Column-wise ``calculate_support_resistance``.
+    
+    Pivot detection runs on the whole panel at once; only the clustering of
+    each symbol's (variable-length) pivot list is done per column.
+    
+    Returns:
+        List of {'support', 'resistance'} dicts in ``panel.symbols`` order
+    """
+    span = 2 * window + 1
+    high, low = panel.frame('High'), panel.frame('Low')
+    pivot_highs = (high == high.rolling(window=span, center=True).max()).to_numpy()
+    pivot_lows = (low == low.rolling(window=span, center=True).min()).to_numpy()
+    
+    levels = []
+    for col in range(len(panel)):
+        resistance = cluster_levels(panel.arrays['High'][pivot_highs[:, col], col], cluster_pct)
+        support = cluster_levels(panel.arrays['Low'][pivot_lows[:, col], col], cluster_pct)
+        levels.append({
+            'resistance': resistance[::-1][:5].tolist(),
+            'support': support[:5].tolist()
+        })
+    return levels
+
+
+def panel_volume_profile(panel: Panel, bins: int = 50, value_area_pct: float = 0.7) -> Dict[str, np.ndarray]:
+    """
+    Column-wise ``calculate_volume_profile`` (volume assigned to the Close).
+    
+    Every symbol's bins are offset into one flat index so a single bincount
+    builds all histograms, and the value areas of all symbols are expanded
+    side by side.
+    
+    Returns:
+        Dict with 'poc', 'vah' and 'val' arrays in ``panel.symbols`` order
+    """
+    low, high, close = panel.arrays['Low'], panel.arrays['High'], panel.arrays['Close']
+    symbols = len(panel)
+    valid = ~np.isnan(close)
+    volume = np.where(valid, np.nan_to_num(panel.arrays['Volume']), 0.0)
+    
+    price_min = np.nanmin(low, axis=0)
+    price_range = np.nanmax(high, axis=0) - price_min
+    bin_size = np.where(price_range > 0, price_range / bins, 1.0)
+    
+    position = np.where(valid, (close - price_min) / bin_size, 0.0)
+    price_bins = np.clip(position.astype(int), 0, bins) + np.arange(symbols) * (bins + 1)
+    histogram = np.bincount(price_bins.ravel(), weights=volume.ravel(), minlength=symbols * (bins + 1))
+    histogram = histogram.reshape(symbols, bins + 1)
+    
+    poc_bin = np.argmax(histogram, axis=1)
+    val_bin, vah_bin = value_area_bins(histogram, poc_bin, value_area_pct)
+    
+    return {
+        'poc': price_min + poc_bin * bin_size,
+        'vah': price_min + vah_bin * bin_size,
+        'val': price_min + val_bin * bin_size
+    }
@@ -0,0 +1,32 @@
+"""
+Async token-bucket rate limiting for outgoing requests.
+"""
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Token bucket shared by all requests to one provider or channel."""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate  # requests per second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    def pause(self, seconds: float):
+        """Hold off all requests for ``seconds`` (the server asked us to back off)."""
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
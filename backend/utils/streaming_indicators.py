@@ -0,0 +1,453 @@
+"""
+Incremental (streaming) technical indicators.
+
+Each indicator keeps a small running state and is updated in constant time
+per appended candle. Values match the batch ``calculate_*`` functions in
+``utils.indicators`` (which wrap the ``ta`` library), including their warm-up
+behaviour: NaN for EMA/SMA/RSI/MACD/Bollinger/VWAP and 0.0 for ATR/ADX.
+
+The engine does not use these yet. Scanners and bots analyze whole
+one-month hourly frames through the cached batch functions, which suits
+an hourly tick. This module is for consumers that handle every bar as it
+arrives, such as minute bars, where recomputing the history per bar would
+dominate the cost.
+"""
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+import pandas as pd
+
+
+NAN = float('nan')
+
+
+class StreamingIndicator(ABC):
+    """Abstract base class for indicators updated one candle at a time."""
+    
+    @abstractmethod
+    def update(self, bar: Dict[str, float]) -> Any:
+        """
+        Feed one candle and return the indicator value at that candle.
+        
+        Args:
+            bar: Mapping with 'Open', 'High', 'Low', 'Close' and 'Volume'
+        
+        Returns:
+            Float, or dict of floats shaped like the batch function's output
+        """
+        pass
+    
+    def checkpoint(self):
+        """
+        Save the current state so ``rollback`` can undo the next update.
+        
+        The default copies the attributes shallowly and lets the averaging
+        helpers save themselves, so it is O(1) for the built-in indicators.
+        Subclasses that mutate containers in place should override both methods.
+        """
+        self._saved = {name: value for name, value in vars(self).items() if name != '_saved'}
+        for value in self._saved.values():
+            if isinstance(value, (_EWM, _RollingWindow)):
+                value.checkpoint()
+    
+    def rollback(self):
+        """Return to the state saved by the last ``checkpoint``."""
+        vars(self).update(self._saved)
+        for value in self._saved.values():
+            if isinstance(value, (_EWM, _RollingWindow)):
+                value.rollback()
+
+
+class _EWM:
+    """Exponential average with pandas ``adjust=False`` semantics."""
+    
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.count = 0
+        self.value = NAN
+    
+    def update(self, x: float) -> float:
+        if self.count == 0:
+            self.value = x
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+    
+    def checkpoint(self):
+        self._saved = (self.count, self.value)
+    
+    def rollback(self):
+        self.count, self.value = self._saved
+
+
+class _RollingWindow:
+    """
+    Fixed-size window with running mean and population variance.
+    
+    Updates are O(1); the running sums are rebuilt from the window once per
+    ``size`` updates so floating-point drift stays bounded.
+    """
+    
+    def __init__(self, size: int):
+        self.size = size
+        self.values: deque = deque(maxlen=size)
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._updates = 0
+    
+    def push(self, x: float):
+        if len(self.values) < self.size:
+            self.values.append(x)
+            self.total += x
+            delta = x - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.values[0]
+            self.values.append(x)
+            self.total += x - old
+            old_mean = self.mean
+            self.mean += (x - old) / self.size
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        
+        self._updates += 1
+        if self._updates >= self.size:
+            self._reseed()
+    
+    def _reseed(self):
+        self._updates = 0
+        n = len(self.values)
+        self.total = math.fsum(self.values)
+        self.mean = self.total / n
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+    
+    def checkpoint(self):
+        # Only the value a push would evict is needed to undo it
+        head = self.values[0] if self.full else None
+        self._saved = (self.full, head, self.total, self.mean, self.m2, self._updates)
+    
+    def rollback(self):
+        """Undo the single push made since ``checkpoint``."""
+        was_full, head, self.total, self.mean, self.m2, self._updates = self._saved
+        self.values.pop()
+        if was_full:
+            self.values.appendleft(head)
+    
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+    
+    @property
+    def variance(self) -> float:
+        return max(self.m2, 0.0) / len(self.values)
+
+
+class StreamingEMA(StreamingIndicator):
+    """Incremental version of ``calculate_ema``."""
+    
+    def __init__(self, period: int, column: str = 'Close'):
+        self.column = column
+        self._ewm = _EWM(alpha=2 / (period + 1), min_periods=period)
+    
+    def update(self, bar: Dict[str, float]) -> float:
+        return self._ewm.update(bar[self.column])
+
+
+class StreamingSMA(StreamingIndicator):
+    """Incremental version of ``calculate_sma``."""
+    
+    def __init__(self, period: int, column: str = 'Close'):
+        self.column = column
+        self._window = _RollingWindow(period)
+    
+    def update(self, bar: Dict[str, float]) -> float:
+        self._window.push(bar[self.column])
+        if not self._window.full:
+            return NAN
+        return self._window.total / self._window.size
+
+
+class StreamingRSI(StreamingIndicator):
+    """Incremental version of ``calculate_rsi`` (Wilder smoothing)."""
+    
+    def __init__(self, period: int = 14):
+        self._up = _EWM(alpha=1 / period, min_periods=period)
+        self._down = _EWM(alpha=1 / period, min_periods=period)
+        self._prev_close: Optional[float] = None
+    
+    def update(self, bar: Dict[str, float]) -> float:
+        close = bar['Close']
+        diff = 0.0 if self._prev_close is None else close - self._prev_close
+        self._prev_close = close
+        
+        up = self._up.update(max(diff, 0.0))
+        down = self._down.update(max(-diff, 0.0))
+        if math.isnan(down):
+            return NAN
+        if down == 0:
+            return 100.0
+        return 100 - (100 / (1 + up / down))
+
+
+class StreamingMACD(StreamingIndicator):
+    """Incremental version of ``calculate_macd``."""
+    
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = _EWM(alpha=2 / (fast + 1), min_periods=fast)
+        self._slow = _EWM(alpha=2 / (slow + 1), min_periods=slow)
+        self._signal = _EWM(alpha=2 / (signal + 1), min_periods=signal)
+    
+    def update(self, bar: Dict[str, float]) -> Dict[str, float]:
+        close = bar['Close']
+        macd = self._fast.update(close) - self._slow.update(close)
+        # The signal line only starts once the MACD line has a value
+        signal = NAN if math.isnan(macd) else self._signal.update(macd)
+        return {
+            'macd': macd,
+            'signal': signal,
+            'histogram': macd - signal
+        }
+
+
+class StreamingBollingerBands(StreamingIndicator):
+    """Incremental version of ``calculate_bollinger_bands``."""
+    
+    def __init__(self, period: int = 20, std: int = 2):
+        self.std = std
+        self._window = _RollingWindow(period)
+    
+    def update(self, bar: Dict[str, float]) -> Dict[str, float]:
+        close = bar['Close']
+        self._window.push(close)
+        if not self._window.full:
+            return {'upper': NAN, 'middle': NAN, 'lower': NAN, 'width': NAN, 'pct': NAN}
+        
+        middle = self._window.mean
+        deviation = self.std * math.sqrt(self._window.variance)
+        upper = middle + deviation
+        lower = middle - deviation
+        return {
+            'upper': upper,
+            'middle': middle,
+            'lower': lower,
+            'width': ((upper - lower) / middle) * 100 if middle != 0 else NAN,
+            'pct': (close - lower) / (upper - lower) if upper != lower else NAN
+        }
+
+
+class StreamingATR(StreamingIndicator):
+    """Incremental version of ``calculate_atr`` (Wilder smoothing)."""
+    
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._prev_close: Optional[float] = None
+        self._seed_total = 0.0
+        self._count = 0
+        self._atr = 0.0
+    
+    def update(self, bar: Dict[str, float]) -> float:
+        high, low = bar['High'], bar['Low']
+        true_range = high - low
+        if self._prev_close is not None:
+            true_range = max(true_range, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = bar['Close']
+        
+        self._count += 1
+        if self._count < self.period:
+            self._seed_total += true_range
+            return 0.0
+        if self._count == self.period:
+            self._atr = (self._seed_total + true_range) / self.period
+        else:
+            self._atr = (self._atr * (self.period - 1) + true_range) / self.period
+        return self._atr
+
+
+class StreamingADX(StreamingIndicator):
+    """Incremental version of ``calculate_adx`` (Wilder smoothing)."""
+    
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._prev: Optional[Dict[str, float]] = None
+        self._count = 0
+        self._trs = 0.0
+        self._dip = 0.0
+        self._din = 0.0
+        self._dx_seed = 0.0
+        self._adx = 0.0
+    
+    def update(self, bar: Dict[str, float]) -> Dict[str, float]:
+        high, low, close = bar['High'], bar['Low'], bar['Close']
+        prev, self._prev = self._prev, {'High': high, 'Low': low, 'Close': close}
+        index = self._count
+        self._count += 1
+        if prev is None:
+            return {'adx': 0.0, 'adx_pos': 0.0, 'adx_neg': 0.0}
+        
+        true_range = max(high, prev['Close']) - min(low, prev['Close'])
+        diff_up = high - prev['High']
+        diff_down = prev['Low'] - low
+        pos = diff_up if (diff_up > diff_down and diff_up > 0) else 0.0
+        neg = diff_down if (diff_down > diff_up and diff_down > 0) else 0.0
+        
+        w = self.period
+        if index <= w:
+            self._trs += true_range
+            self._dip += pos
+            self._din += neg
+            if index < w:
+                return {'adx': 0.0, 'adx_pos': 0.0, 'adx_neg': 0.0}
+        else:
+            self._trs = self._trs - self._trs / w + true_range
+            self._dip = self._dip - self._dip / w + pos
+            self._din = self._din - self._din / w + neg
+        
+        di_pos = 100 * (self._dip / self._trs) if self._trs != 0 else 0.0
+        di_neg = 100 * (self._din / self._trs) if self._trs != 0 else 0.0
+        dx = 100 * abs((di_pos - di_neg) / (di_pos + di_neg)) if di_pos + di_neg != 0 else 0.0
+        
+        # ADX is seeded with the mean of the first ``period`` DX values
+        step = index - w
+        if step < w - 1:
+            self._dx_seed += dx
+            adx = 0.0
+        elif step == w - 1:
+            self._adx = (self._dx_seed + dx) / w
+            adx = self._adx
+        else:
+            self._adx = (self._adx * (w - 1) + dx) / w
+            adx = self._adx
+        
+        # The batch +DI/-DI series start one bar after the smoothing seed
+        if index == w:
+            di_pos = di_neg = 0.0
+        return {'adx': adx, 'adx_pos': di_pos, 'adx_neg': di_neg}
+
+
+class StreamingVWAP(StreamingIndicator):
+    """Incremental version of ``calculate_vwap`` (rolling 14-bar window)."""
+    
+    def __init__(self, window: int = 14):
+        self._pv = _RollingWindow(window)
+        self._volume = _RollingWindow(window)
+        self._traded_bars = 0  # bars in the window with non-zero volume
+    
+    def update(self, bar: Dict[str, float]) -> float:
+        volume = bar['Volume']
+        if self._volume.full and self._volume.values[0] != 0:
+            self._traded_bars -= 1
+        if volume != 0:
+            self._traded_bars += 1
+        
+        typical_price = (bar['High'] + bar['Low'] + bar['Close']) / 3.0
+        self._pv.push(typical_price * volume)
+        self._volume.push(volume)
+        if not self._volume.full or self._traded_bars == 0:
+            # No volume traded in the window: 0/0, as in the batch version
+            return NAN
+        return self._pv.total / self._volume.total
+
+
+def default_indicators() -> Dict[str, StreamingIndicator]:
+    """Indicator set used by the scanners and bots."""
+    return {
+        'ema_20': StreamingEMA(20),
+        'ema_50': StreamingEMA(50),
+        'ema_200': StreamingEMA(200),
+        'sma_20': StreamingSMA(20),
+        'rsi': StreamingRSI(14),
+        'macd': StreamingMACD(12, 26, 9),
+        'bollinger': StreamingBollingerBands(20, 2),
+        'atr': StreamingATR(14),
+        'adx': StreamingADX(14),
+        'vwap': StreamingVWAP()
+    }
+
+
+class StreamingIndicatorBank:
+    """
+    Per-symbol streaming indicator state.
+    
+    ``sync`` feeds only the candles newer than the last one seen for a
+    (symbol, interval) pair. A candle with the same timestamp as the last
+    one (a bar that is still forming) is re-applied after rolling each
+    indicator back to its checkpoint from before that bar, so refreshing
+    the current bar is also O(1).
+    """
+    
+    def __init__(self, factory: Callable[[], Dict[str, StreamingIndicator]] = default_indicators):
+        self.factory = factory
+        self._states: Dict[tuple, Dict[str, Any]] = {}
+    
+    def update(
+        self,
+        symbol: str,
+        timestamp: pd.Timestamp,
+        bar: Dict[str, float],
+        interval: str = "1h"
+    ) -> Dict[str, Any]:
+        """
+        Feed one candle for a symbol.
+        
+        Returns:
+            Dict mapping indicator name to its current value
+        """
+        key = (symbol, interval)
+        state = self._states.get(key)
+        if state is None:
+            state = {'indicators': self.factory(), 'last_ts': None, 'values': {}}
+            self._states[key] = state
+        
+        if state['last_ts'] is not None and timestamp < state['last_ts']:
+            return state['values']
+        forming = timestamp == state['last_ts']
+        for indicator in state['indicators'].values():
+            if forming:
+                indicator.rollback()
+            else:
+                indicator.checkpoint()
+        
+        state['values'] = {
+            name: indicator.update(bar)
+            for name, indicator in state['indicators'].items()
+        }
+        state['last_ts'] = timestamp
+        return state['values']
+    
+    def sync(self, symbol: str, df: pd.DataFrame, interval: str = "1h") -> Dict[str, Any]:
+        """
+        Bring a symbol's state up to date with an OHLCV DataFrame.
+        
+        Returns:
+            Dict mapping indicator name to its value at the last candle
+        """
+        state = self._states.get((symbol, interval))
+        if state is not None and state['last_ts'] is not None:
+            df = df[df.index >= state['last_ts']]
+        
+        values = state['values'] if state else {}
+        columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        for timestamp, row in zip(df.index, df[columns].to_numpy(dtype=float)):
+            values = self.update(symbol, timestamp, dict(zip(columns, row)), interval)
+        return values
+    
+    def latest(self, symbol: str, interval: str = "1h") -> Dict[str, Any]:
+        """Get the most recent indicator values for a symbol."""
+        state = self._states.get((symbol, interval))
+        return state['values'] if state else {}
+    
+    def reset(self, symbol: Optional[str] = None):
+        """Drop state for one symbol, or for all symbols."""
+        if symbol is None:
+            self._states.clear()
+            return
+        for key in [k for k in self._states if k[0] == symbol]:
+            del self._states[key]
+
+
+# Global streaming indicator state
+streaming_indicators = StreamingIndicatorBank()